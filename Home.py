@@ -1,6 +1,8 @@
 import streamlit as st
+from hub import profiling
 
 st.set_page_config(page_title="TechSolute Hub", page_icon="🚀", layout="wide")
+profiling.start()
 
 # --- CUSTOM CSS ---
 st.markdown("""
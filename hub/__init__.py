@@ -0,0 +1 @@
+"""Shared helpers for the TechSolute Hub pages."""
@@ -0,0 +1,56 @@
+"""
+Access check for operator-only pages (metrics, profiling).
+
+Admin access needs a token, set as ADMIN_TOKEN in Streamlit secrets or
+HUB_ADMIN_TOKEN in the environment. It is accepted from the `?admin=`
+query parameter or a password field, then remembered for the session.
+Without a configured token the admin pages stay disabled.
+"""
+import hmac
+import os
+from typing import Optional
+
+import streamlit as st
+
+
+def admin_token() -> Optional[str]:
+    try:
+        token = st.secrets.get("ADMIN_TOKEN")
+    except (FileNotFoundError, KeyError):
+        token = None
+    return token or os.environ.get("HUB_ADMIN_TOKEN") or None
+
+
+def _matches(supplied: str, token: str) -> bool:
+    # compare_digest only accepts ASCII str, so compare the encoded bytes
+    return hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8"))
+
+
+def is_admin() -> bool:
+    """True if this session has presented the admin token (no UI)."""
+    token = admin_token()
+    if not token:
+        return False
+    if st.session_state.get("hub_admin"):
+        return True
+    supplied = st.query_params.get("admin")
+    if supplied and _matches(supplied, token):
+        st.session_state.hub_admin = True
+        return True
+    return False
+
+
+def require_admin() -> None:
+    """Stop the page unless the session is an admin; asks for the token."""
+    if not admin_token():
+        st.info("Admin pages are disabled. Set ADMIN_TOKEN in Streamlit secrets to enable them.")
+        st.stop()
+    if is_admin():
+        return
+    supplied = st.text_input("Admin token", type="password")
+    if supplied and _matches(supplied, admin_token()):
+        st.session_state.hub_admin = True
+        st.rerun()
+    if supplied:
+        st.error("Wrong token.")
+    st.stop()
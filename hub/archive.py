@@ -0,0 +1,161 @@
+"""
+Dated entries from personal archives, bucketed by period.
+
+A multi-year archive does not fit in one prompt, and its first few files
+say little about the rest. Entries are extracted with a date wherever one
+can be found (tweet timestamps, dated lines, document metadata), grouped
+into years or quarters, and each period gets local stats (volume,
+vocabulary, sentiment) from vectorized pandas plus an evenly spaced sample
+of bounded size to summarize. Pages summarize the periods in parallel and
+then combine the summaries, so every part of the archive is covered.
+
+Extraction is lazy. Each file is a generator of entries that reads pages in
+`spread` order, so any prefix is spread evenly over the document.
+`take_evenly` pulls from the files in turn until the per-file and total
+budgets are full. A 500-page PDF is only parsed until its share of the
+budget has been read.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from hub.importer import parse_date, split_markdown
+from hub.topics import NEGATIVE, POSITIVE
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+PERIOD_CHARS = 12000        # text per period summary call
+EXTRACT_CHARS = 300_000     # text read across all uploads
+FILE_CHARS = 120_000        # text read from any one upload
+YEARLY_AFTER_YEARS = 4      # spans longer than this are bucketed by year, shorter ones by quarter
+UNDATED = "Undated"
+_WORD = r"[a-z']+"
+
+Entry = Dict[str, Any]      # {"date": ISO date or None, "text", "source"}
+
+
+def _tweet_date(value: str) -> Optional[str]:
+    try:
+        return datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y").date().isoformat()
+    except ValueError:
+        return parse_date(value)
+
+
+def tweet_entries(data: Any, source: str) -> List[Entry]:
+    """Entries from a tweet list or a Twitter archive (`[{"tweet": {...}}]`)."""
+    entries = []
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        tweet = item.get("tweet", item)
+        text = str(tweet.get("full_text") or tweet.get("text") or "").strip()
+        if text:
+            entries.append({"date": _tweet_date(str(tweet.get("created_at", ""))), "text": text, "source": source})
+    return entries
+
+
+def text_entries(text: str, source: str, date: Optional[str] = None) -> List[Entry]:
+    """Paragraph entries; a dated heading or line dates what follows it, else `date` (may be None)."""
+    return [{"date": when, "text": thought, "source": source} for when, thought in split_markdown(text, date)]
+
+
+def spread(n: int) -> Iterator[int]:
+    """0..n-1 in coarse-to-fine order (0, n/2, n/4, 3n/4, ...): every prefix covers the range evenly."""
+    seen = set()
+    step = 1 << max(n - 1, 0).bit_length()
+    while step:
+        for i in range(0, n, step):
+            if i not in seen:
+                seen.add(i)
+                yield i
+        step //= 2
+
+
+def take_evenly(
+    sources: List[Iterator[Tuple[tuple, Entry]]], budget: int = EXTRACT_CHARS, per_source: int = FILE_CHARS
+) -> Tuple[List[Entry], bool]:
+    """
+    Pull (position, entry) pairs from each source in turn until every source
+    is exhausted or has used `per_source` characters, or `budget` is used.
+    Returns the entries in source then position order, and whether
+    everything was read.
+    """
+    taken: List[Tuple[int, tuple, Entry]] = []
+    used = [0] * len(sources)
+    active = list(range(len(sources)))
+    total, complete = 0, True
+    while active:
+        for n in list(active):
+            if total >= budget:
+                return [entry for *_, entry in sorted(taken, key=lambda t: t[:2])], False
+            try:
+                position, entry = next(sources[n])
+            except StopIteration:
+                active.remove(n)
+                continue
+            taken.append((n, position, entry))
+            used[n] += len(entry["text"])
+            total += len(entry["text"])
+            if used[n] >= per_source:
+                active.remove(n)
+                complete = False
+    return [entry for *_, entry in sorted(taken, key=lambda t: t[:2])], complete
+
+
+def choose_freq(entries: Iterable[Entry]) -> str:
+    """"Y" for long archives, "Q" for short ones."""
+    years = [int(e["date"][:4]) for e in entries if e["date"]]
+    return "Y" if years and max(years) - min(years) > YEARLY_AFTER_YEARS else "Q"
+
+
+def bucket(entries: List[Entry], freq: str) -> pd.DataFrame:
+    """One row per entry with its period label, oldest first; undated entries come last."""
+    df = pd.DataFrame(entries, columns=["date", "text", "source"])
+    when = pd.to_datetime(df["date"], errors="coerce")
+    df["period"] = when.dt.to_period(freq).astype(str).where(when.notna(), UNDATED)
+    df["_when"] = when
+    return df.sort_values("_when", na_position="last", kind="stable").drop(columns="_when").reset_index(drop=True)
+
+
+def period_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Per period: entries, words, distinct words, type/token ratio and mean lexicon sentiment."""
+    words = df["text"].str.lower().str.findall(_WORD).explode().dropna()
+    periods = df.loc[words.index, "period"]
+    pos = words.isin(POSITIVE).groupby(level=0).sum().reindex(df.index, fill_value=0)
+    neg = words.isin(NEGATIVE).groupby(level=0).sum().reindex(df.index, fill_value=0)
+    entry_sentiment = (pos - neg) / (pos + neg + 1)
+
+    order = list(dict.fromkeys(df["period"]))
+    stats = pd.DataFrame({
+        "entries": df.groupby("period").size(),
+        "words": words.groupby(periods).size(),
+        "vocabulary": words.groupby(periods).nunique(),
+        "sentiment": entry_sentiment.groupby(df["period"]).mean(),
+    }).reindex(order).fillna(0)
+    stats["entries"] = stats["entries"].astype(int)
+    stats["words"] = stats["words"].astype(int)
+    stats["vocabulary"] = stats["vocabulary"].astype(int)
+    stats["variety"] = (stats["vocabulary"] / stats["words"].where(stats["words"] > 0)).fillna(0).round(3)
+    stats["sentiment"] = stats["sentiment"].round(3)
+    return stats
+
+
+def sample(texts: List[str], max_chars: int = PERIOD_CHARS) -> str:
+    """Entries spaced evenly through the list, up to `max_chars`, in their original order."""
+    total = sum(len(t) for t in texts)
+    if total <= max_chars:
+        return "\n\n".join(texts)
+    share = total / len(texts) + 2
+    count = max(1, min(len(texts), int(max_chars / share)))
+    picked, used = [], 0
+    for i in np.unique(np.linspace(0, len(texts) - 1, count).round().astype(int)):
+        text = texts[i][: max_chars - used]
+        picked.append(text)
+        used += len(text) + 2
+        if used >= max_chars:
+            break
+    return "\n\n".join(picked)
@@ -0,0 +1,222 @@
+"""
+On-disk artifact store for generated and processed images.
+
+Images are stored once, keyed by a hash of their content (uploads,
+composites) or of their source URL (Replicate outputs). Pages show a
+downscaled preview (see hub.previews), rendered once per page profile,
+and only read the full-resolution file when a download is clicked, so
+reruns neither re-download from Replicate nor push full-size PNGs over
+the websocket. Storage is capped in size and evicted least-recently-used
+first.
+"""
+import glob
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+import requests
+import streamlit as st
+from PIL import Image
+
+from hub.metrics import record_cache
+from hub.previews import MIME_TYPES, PREVIEW_DIR, PROFILES, encode_preview, preview_src
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+ARTIFACT_DIR = os.environ.get(
+    "HUB_ARTIFACT_DIR",
+    os.path.join(tempfile.gettempdir(), "techsolute_hub", "artifacts"),
+)
+MAX_BYTES = int(float(os.environ.get("HUB_ARTIFACT_MAX_MB", "512")) * 1024 * 1024)
+DOWNLOAD_TIMEOUT = 60
+
+ORIGINAL_SUFFIX = ".bin"
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(b"url:" + url.encode("utf-8")).hexdigest()
+
+
+def derived_key(source_key: str, variant: str) -> str:
+    return hashlib.sha256(f"{source_key}:{variant}".encode("utf-8")).hexdigest()
+
+
+def image_bytes(img: Image.Image, fmt: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@dataclass
+class Artifact:
+    key: str
+    path: str
+    # Recreates the file if it was evicted after this handle was given out
+    rebuild: Optional[Callable[[], "Artifact"]] = field(default=None, repr=False, compare=False)
+
+    def read(self) -> Optional[bytes]:
+        """
+        Full-resolution bytes; meant for download buttons only. None if the
+        file has been evicted and cannot be rebuilt (uploads, composites).
+        """
+        try:
+            with open(self.path, "rb") as fh:
+                return fh.read()
+        except FileNotFoundError:
+            rebuilt = self.rebuild() if self.rebuild is not None else None
+            return rebuilt.read() if rebuilt is not None else None
+
+    def open(self) -> Image.Image:
+        if self.rebuild is not None and not os.path.exists(self.path):
+            rebuilt = self.rebuild()
+            if rebuilt is not None:
+                return rebuilt.open()
+        return Image.open(self.path)
+
+
+# --------------------------------------------------
+# STORE
+# --------------------------------------------------
+class ArtifactStore:
+    """Content-addressed originals + per-profile previews with a size-capped LRU."""
+
+    def __init__(self, root: str = ARTIFACT_DIR, max_bytes: int = MAX_BYTES, preview_dir: str = PREVIEW_DIR):
+        self.root = root
+        self.preview_dir = preview_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = 0
+        for folder in (root, preview_dir):
+            os.makedirs(folder, exist_ok=True)
+            self._total += sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ORIGINAL_SUFFIX)
+
+    def _write(self, target: str, payload: bytes) -> None:
+        # Write to a hidden temp name first so readers (and the preview and
+        # eviction globs, which skip dotfiles) never see partial files
+        folder, name = os.path.split(target)
+        tmp_path = os.path.join(folder, f".{name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            fh.write(payload)
+        # Two sessions can store the same key at once; only the first write
+        # adds to the total, a later one just replaces the file it wrote
+        with self._lock:
+            try:
+                replaced = os.path.getsize(target)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, target)
+            self._total += len(payload) - replaced
+
+    def get(self, key: str) -> Optional[Artifact]:
+        """Return the artifact if present, refreshing its LRU position."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return Artifact(key, path)
+
+    def put(self, key: str, data: bytes) -> Artifact:
+        """Store bytes under `key` (no-op if already stored)."""
+        existing = self.get(key)
+        if existing:
+            return existing
+        path = self._path(key)
+        self._write(path, data)
+        self._evict(keep=key)
+        return Artifact(key, path)
+
+    def put_bytes(self, data: bytes) -> Artifact:
+        return self.put(content_key(data), data)
+
+    def put_image(self, img: Image.Image) -> Artifact:
+        return self.put_bytes(image_bytes(img))
+
+    def fetch_url(self, url: str) -> Artifact:
+        """Download `url` once; later calls (any session) are served from disk."""
+        key = url_key(url)
+        artifact = self.get(key)
+        record_cache("artifacts", hit=artifact is not None, tool="download")
+        if artifact is None:
+            response = requests.get(url, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+            artifact = self.put(key, response.content)
+        artifact.rebuild = lambda: self.fetch_url(url)
+        return artifact
+
+    def derive(
+        self,
+        source: Artifact,
+        variant: str,
+        build: Callable[[Artifact], Union[Image.Image, bytes, None]],
+    ) -> Optional[Artifact]:
+        """
+        Cache an image computed from `source` (mockups, cutouts, composites).
+        `build` runs only the first time and may return an Image or encoded
+        bytes; returning None stores nothing.
+        """
+        key = derived_key(source.key, variant)
+        artifact = self.get(key)
+        record_cache("artifacts", hit=artifact is not None, tool=variant)
+        if artifact is None:
+            result = build(source)
+            if result is None:
+                return None
+            artifact = self.put(key, result if isinstance(result, bytes) else image_bytes(result))
+        artifact.rebuild = lambda: self.derive(source, variant, build)
+        return artifact
+
+    def preview(self, artifact: Artifact, profile: str) -> str:
+        """
+        Image source for a page preview, encoded once per (artifact, profile).
+        Returns a static URL or data URI ready for st.image.
+        """
+        settings = PROFILES[profile]
+        stem = os.path.join(self.preview_dir, f"{artifact.key}.{settings.tag}")
+        existing = next((f"{stem}.{fmt}" for fmt in MIME_TYPES if os.path.exists(f"{stem}.{fmt}")), None)
+        record_cache("previews", hit=existing is not None, tool=profile)
+        if existing:
+            return preview_src(existing)
+        data, fmt = encode_preview(artifact.open(), settings)
+        path = os.path.join(self.preview_dir, f"{artifact.key}.{settings.tag}.{fmt}")
+        self._write(path, data)
+        return preview_src(path)
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            originals = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(ORIGINAL_SUFFIX) and not entry.name.startswith(keep):
+                    originals.append((entry.stat().st_mtime, entry.name[: -len(ORIGINAL_SUFFIX)]))
+            for _, key in sorted(originals):
+                if self._total <= self.max_bytes:
+                    break
+                previews = glob.glob(os.path.join(self.preview_dir, f"{key}.*"))
+                for file_path in [self._path(key), *previews]:
+                    try:
+                        size = os.path.getsize(file_path)
+                        os.remove(file_path)
+                        self._total -= size
+                    except OSError:
+                        pass
+
+
+@st.cache_resource
+def get_store() -> ArtifactStore:
+    """The process-wide store shared by every session."""
+    return ArtifactStore()
@@ -0,0 +1,187 @@
+"""
+Resumable batch generation for catalog-sized inputs.
+
+A batch is a list of input rows identified by a key (a hash of the
+inputs). `run_batch` runs inside a hub.jobs job and calls the row
+function for every row that is not finished yet, through a bounded pool
+and a shared rate limiter. Each finished row is written to SQLite as soon
+as it completes, so:
+
+- the page can offer downloads of whatever is finished while the batch
+  is still running;
+- resubmitting the same file after a cancel, a failure or a server
+  restart only generates the rows that are still missing or failed.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import streamlit as st
+
+from hub.jobs import JOB_DB_PATH, JobContext
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+BATCH_DB_PATH = os.environ.get("HUB_BATCH_DB", os.path.join(os.path.dirname(JOB_DB_PATH), "batches.sqlite3"))
+DEFAULT_WORKERS = int(os.environ.get("HUB_BATCH_WORKERS", "8"))
+DEFAULT_RATE_PER_MINUTE = float(os.environ.get("HUB_BATCH_RATE_PER_MIN", "120"))
+RETENTION_SECONDS = 7 * 24 * 3600
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_rows (
+    batch TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    input TEXT NOT NULL,
+    output TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (batch, idx)
+);
+"""
+
+
+class RateLimiter:
+    """Token bucket shared by the workers of one batch."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.capacity = max(burst, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) / self.interval)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) * self.interval
+            time.sleep(wait_for)
+
+
+# --------------------------------------------------
+# STORE
+# --------------------------------------------------
+class BatchStore:
+    def __init__(self, db_path: str = BATCH_DB_PATH):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute("DELETE FROM batch_rows WHERE updated < ?", (time.time() - RETENTION_SECONDS,))
+
+    def register(self, batch: str, rows: List[Dict[str, Any]]) -> None:
+        """Add the batch's rows as pending, keeping any already finished."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO batch_rows (batch, idx, status, input, updated) VALUES (?, ?, ?, ?, ?)",
+                [(batch, idx, PENDING, json.dumps(row, default=str), now) for idx, row in enumerate(rows)],
+            )
+
+    def save(self, batch: str, idx: int, output: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE batch_rows SET status=?, output=?, error=?, updated=? WHERE batch=? AND idx=?",
+                (FAILED if error else DONE, output, error, time.time(), batch, idx),
+            )
+
+    def todo(self, batch: str) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx FROM batch_rows WHERE batch=? AND status!=? ORDER BY idx", (batch, DONE)
+            ).fetchall()
+        return [idx for (idx,) in rows]
+
+    def counts(self, batch: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM batch_rows WHERE batch=? GROUP BY status", (batch,)
+            ).fetchall()
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def rows(self, batch: str) -> List[Dict[str, Any]]:
+        """Every row in input order: its input fields plus status, output and error."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, status, input, output, error FROM batch_rows WHERE batch=? ORDER BY idx", (batch,)
+            ).fetchall()
+        return [
+            {"idx": idx, **json.loads(data), "status": status, "output": output, "error": error}
+            for idx, status, data, output, error in rows
+        ]
+
+
+@st.cache_resource
+def get_store() -> BatchStore:
+    return BatchStore()
+
+
+# --------------------------------------------------
+# RUNNER
+# --------------------------------------------------
+def run_batch(
+    ctx: JobContext,
+    batch: str,
+    rows: List[Dict[str, Any]],
+    fn: Callable[[Dict[str, Any]], str],
+    workers: int = DEFAULT_WORKERS,
+    per_minute: float = DEFAULT_RATE_PER_MINUTE,
+    store: Optional[BatchStore] = None,
+) -> Dict[str, Any]:
+    """
+    Job function: generate `fn(row)` for every unfinished row of `batch`.
+    Stops submitting new rows on cancel and lets in-flight ones finish.
+    """
+    store = store or get_store()
+    store.register(batch, rows)
+    todo = store.todo(batch)
+    total = len(rows)
+    finished = total - len(todo)
+    limiter = RateLimiter(per_minute, burst=workers)
+    started = time.monotonic()
+
+    def work(idx: int) -> None:
+        limiter.acquire()
+        try:
+            store.save(batch, idx, output=fn(rows[idx]))
+        except Exception as exc:
+            store.save(batch, idx, error=str(exc) or exc.__class__.__name__)
+
+    ctx.set_progress(finished / max(total, 1), f"{finished}/{total} done, resuming..." if finished else "Starting...")
+    pending = set()
+    queue = list(todo)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="hub-batch") as pool:
+        while queue or pending:
+            while queue and len(pending) < workers and not ctx.cancelled:
+                pending.add(pool.submit(work, queue.pop(0)))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            finished += len(done)
+            elapsed = time.monotonic() - started
+            rate = (finished - (total - len(todo))) / elapsed if elapsed else 0
+            eta = f", about {len(queue) / rate:.0f}s left" if rate and queue else ""
+            ctx.set_progress(finished / max(total, 1), f"{finished}/{total} rows{eta}")
+    ctx.check()
+    return {"batch": batch, "total": total, **store.counts(batch)}
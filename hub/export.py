@@ -0,0 +1,260 @@
+"""
+Export generated Markdown as HTML, PDF or DOCX.
+
+Every page hands its Markdown output to `download_buttons`. Rendering is
+cached by content (st.cache_data hashes the Markdown), and the PDF/DOCX
+renders are deferred until a download is actually clicked, so reruns of
+the page script never pay for them.
+"""
+import html
+import io
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import markdown as md_lib
+import streamlit as st
+from markdown.extensions import Extension
+from docx import Document
+from docx.shared import Pt
+from fpdf import FPDF
+from fpdf.fonts import TextStyle
+
+
+# --------------------------------------------------
+# FORMATS
+# --------------------------------------------------
+FORMATS = {
+    "md": ("Markdown", "text/markdown"),
+    "html": ("HTML", "text/html"),
+    "pdf": ("PDF", "application/pdf"),
+    "docx": ("Word", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+}
+
+
+class _EscapeRawHtml(Extension):
+    """Treat raw HTML in the Markdown as text, so model output can't inject tags or scripts."""
+
+    def extendMarkdown(self, md):
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+
+
+# _EscapeRawHtml goes last: "extra" registers its own html_block preprocessor
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "nl2br", _EscapeRawHtml()]
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+    body {{ font-family: Arial, Helvetica, sans-serif; max-width: 820px; margin: 40px auto; padding: 0 20px; line-height: 1.55; color: #222; }}
+    h1.doc-title {{ text-align: center; color: {accent}; }}
+    table {{ border-collapse: collapse; }}
+    th, td {{ border: 1px solid #ccc; padding: 6px 10px; }}
+    pre, code {{ background: #f5f5f5; }}
+    pre {{ padding: 12px; white-space: pre-wrap; }}
+    blockquote {{ border-left: 4px solid #ccc; margin-left: 0; padding-left: 12px; color: #555; }}
+</style>
+</head>
+<body>
+<h1 class="doc-title">{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+# DejaVu ships with most Linux images (Streamlit Cloud installs it via packages.txt).
+# HUB_PDF_FONT_DIR can point at any directory containing the same file names.
+FONT_DIRS = [
+    os.environ.get("HUB_PDF_FONT_DIR", ""),
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+FONT_FILES = {
+    "": "DejaVuSans.ttf",
+    "B": "DejaVuSans-Bold.ttf",
+    "I": "DejaVuSans-Oblique.ttf",
+    "BI": "DejaVuSans-BoldOblique.ttf",
+    "mono": "DejaVuSansMono.ttf",
+}
+FONT_FAMILY = "DejaVu"
+MONO_FAMILY = "DejaVuMono"
+
+
+# --------------------------------------------------
+# RENDERERS
+# --------------------------------------------------
+def markdown_to_html_fragment(text: str) -> str:
+    """Convert Markdown to an HTML fragment (no <html> wrapper)."""
+    return md_lib.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+
+
+def render_html(text: str, title: str, accent: str = "#3498db") -> str:
+    """Render Markdown as a standalone, valid HTML document."""
+    return HTML_TEMPLATE.format(
+        title=html.escape(title),
+        accent=accent,
+        body=markdown_to_html_fragment(text),
+    )
+
+
+@lru_cache(maxsize=1)
+def unicode_font_files() -> Optional[dict]:
+    """
+    Locate the Unicode TTF family once per process.
+    Returns a style -> path mapping, or None if no regular face exists.
+    """
+    for folder in FONT_DIRS:
+        if not folder:
+            continue
+        regular = os.path.join(folder, FONT_FILES[""])
+        if not os.path.isfile(regular):
+            continue
+        files = {}
+        for style, name in FONT_FILES.items():
+            path = os.path.join(folder, name)
+            # Missing variants fall back to the regular face rather than failing <b>/<i>/<code>
+            files[style] = path if os.path.isfile(path) else regular
+        return files
+    return None
+
+
+def render_pdf(text: str, title: str) -> bytes:
+    """Render Markdown to PDF through fpdf2's HTML support."""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    fonts = unicode_font_files()
+    body = markdown_to_html_fragment(text)
+    if fonts:
+        for style, path in fonts.items():
+            if style != "mono":
+                pdf.add_font(FONT_FAMILY, style, path)
+        pdf.add_font(MONO_FAMILY, "", fonts["mono"])
+        family, mono = FONT_FAMILY, MONO_FAMILY
+    else:
+        # Core fonts only cover latin-1
+        family, mono = "helvetica", "courier"
+        title = title.encode("latin-1", "replace").decode("latin-1")
+        body = body.encode("latin-1", "replace").decode("latin-1")
+
+    pdf.set_font(family, "B", 18)
+    pdf.cell(0, 12, title, new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.ln(4)
+    pdf.set_font(family, "", 11)
+    code_style = TextStyle(font_family=mono, font_size_pt=9)
+    pdf.write_html(
+        body,
+        font_family=family,
+        tag_styles={"code": code_style, "pre": code_style},
+        warn_on_tags_not_matching=False,
+    )
+    return bytes(pdf.output())
+
+
+INLINE_PATTERN = re.compile(r"(\*\*[^*]+\*\*|__[^_]+__|\*[^*]+\*|_[^_]+_|`[^`]+`)")
+
+
+def _add_inline_runs(paragraph, text: str) -> None:
+    """Add runs for **bold**, *italic* and `code` spans."""
+    for part in INLINE_PATTERN.split(text):
+        if not part:
+            continue
+        if part[:2] in ("**", "__") and part[-2:] == part[:2] and len(part) > 4:
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part[0] in "*_" and part[-1] == part[0] and len(part) > 2:
+            paragraph.add_run(part[1:-1]).italic = True
+        elif part[0] == "`" and part[-1] == "`" and len(part) > 2:
+            run = paragraph.add_run(part[1:-1])
+            run.font.name = "Courier New"
+        else:
+            paragraph.add_run(part)
+
+
+def render_docx(text: str, title: str) -> bytes:
+    """Render Markdown to a Word document (headings, lists, code, inline emphasis)."""
+    doc = Document()
+    doc.add_heading(title, level=0)
+
+    in_code = False
+    for raw_line in text.splitlines():
+        line = raw_line.rstrip()
+        if line.strip().startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code:
+            run = doc.add_paragraph().add_run(raw_line)
+            run.font.name = "Courier New"
+            run.font.size = Pt(9)
+            continue
+        stripped = line.strip()
+        if not stripped or re.fullmatch(r"[-*_]{3,}", stripped):
+            continue
+
+        heading = re.match(r"^(#{1,6})\s+(.*)$", stripped)
+        bullet = re.match(r"^[-*+]\s+(.*)$", stripped)
+        numbered = re.match(r"^\d+[.)]\s+(.*)$", stripped)
+        if heading:
+            doc.add_heading(heading.group(2).strip("*# "), level=min(len(heading.group(1)), 4))
+        elif bullet:
+            _add_inline_runs(doc.add_paragraph(style="List Bullet"), bullet.group(1))
+        elif numbered:
+            _add_inline_runs(doc.add_paragraph(style="List Number"), numbered.group(1))
+        elif stripped.startswith(">"):
+            _add_inline_runs(doc.add_paragraph(style="Quote"), stripped.lstrip("> "))
+        else:
+            _add_inline_runs(doc.add_paragraph(), stripped)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+# --------------------------------------------------
+# CACHED ENTRY POINT
+# --------------------------------------------------
+@st.cache_data(max_entries=128, show_spinner=False)
+def render(text: str, fmt: str, title: str = "Export", accent: str = "#3498db") -> bytes:
+    """Render Markdown into `fmt`; cached by (content, format, title)."""
+    if fmt == "md":
+        return text.encode("utf-8")
+    if fmt == "html":
+        return render_html(text, title, accent).encode("utf-8")
+    if fmt == "pdf":
+        return render_pdf(text, title)
+    if fmt == "docx":
+        return render_docx(text, title)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def download_buttons(
+    text: str,
+    basename: str,
+    title: str,
+    formats: Iterable[str] = ("md", "html", "pdf", "docx"),
+    accent: str = "#3498db",
+    key: Optional[str] = None,
+) -> None:
+    """
+    Render one download button per format, side by side.
+    Artifacts are produced lazily when a button is clicked, off the script thread.
+    """
+    formats = list(formats)
+    cols = st.columns(len(formats))
+    for col, fmt in zip(cols, formats):
+        label, mime = FORMATS[fmt]
+        with col:
+            st.download_button(
+                f"📥 {label}",
+                data=lambda fmt=fmt: render(text, fmt, title, accent),
+                file_name=f"{basename}.{fmt}",
+                mime=mime,
+                key=f"{key or basename}_{fmt}",
+                use_container_width=True,
+            )
@@ -0,0 +1,214 @@
+"""
+Bulk import of Markdown vaults and journal exports into a NoteLog.
+
+`import_zip` reads a ZIP one member at a time (never extracting it) and
+turns each file into dated thoughts:
+
+- Markdown / text files (Obsidian, Logseq, Bear, plain journals) are split
+  at dated headings ("## 2024-03-02", or a line that is only a date) and
+  then into paragraphs; a date inside ordinary prose is left alone; a thought
+  without a dated heading takes the front-matter `date:`/`created:`, else
+  a date in the file name (daily notes), else the file's ZIP timestamp;
+- Day One style JSON exports ({"entries": [{"creationDate", "text"}]})
+  give one thought per entry.
+
+Thoughts are deduped by a hash of their normalized text, so the same
+thought in two files or two imports is stored once. A manifest next to
+the log remembers each member's CRC-32 (read from the ZIP directory, not
+the data), so re-importing a vault only opens the files that changed.
+A file is only marked imported once its thoughts are safely in the log.
+"""
+import hashlib
+import json
+import os
+import re
+import zipfile
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from hub.notes import NoteLog
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+TEXT_SUFFIXES = (".md", ".markdown", ".txt")
+MIN_THOUGHT_CHARS = 20
+MAX_THOUGHT_CHARS = 2000
+FLUSH_EVERY = 500           # thoughts buffered before one batched append
+MAX_FILE_BYTES = int(float(os.environ.get("HUB_IMPORT_MAX_FILE_MB", "20")) * 1024 * 1024)
+
+_ISO_DATE = re.compile(r"(\d{4})[-_./](\d{2})[-_./](\d{2})")
+_FRONT_MATTER = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+_FRONT_DATE = re.compile(r"^(?:date|created|created_at|day)\s*:\s*[\"']?(.+?)[\"']?\s*$", re.IGNORECASE | re.MULTILINE)
+# "## 2024-03-02", "# Monday 2024-03-02 notes" or a line holding only "2024-03-02"
+_DATED_HEADING = re.compile(r"^\s*(?:#{1,6}\s+[^\n]{0,40}?(\d{4}-\d{2}-\d{2})[^\n]{0,40}|(\d{4}-\d{2}-\d{2}))\s*$")
+_HEADING_ONLY = re.compile(r"^\s*#{1,6}\s")
+
+
+@dataclass
+class ImportStats:
+    files: int = 0
+    unchanged_files: int = 0
+    oversized_files: int = 0
+    thoughts: int = 0
+    duplicates: int = 0
+    added: int = 0
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+def parse_date(text: str) -> Optional[str]:
+    match = _ISO_DATE.search(text)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def _paragraphs(text: str) -> Iterator[str]:
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        lines = [line for line in block.splitlines() if not _HEADING_ONLY.match(line)]
+        block = "\n".join(lines).strip()
+        if len(block) >= MIN_THOUGHT_CHARS:
+            yield block[:MAX_THOUGHT_CHARS]
+
+
+def split_markdown(text: str, fallback: str) -> Iterator[Tuple[str, str]]:
+    """(date, thought) pairs from one Markdown or text file."""
+    front = _FRONT_MATTER.match(text)
+    if front:
+        found = _FRONT_DATE.search(front.group(1))
+        fallback = (found and parse_date(found.group(1))) or fallback
+        text = text[front.end():]
+
+    current, buffer = fallback, []
+    for line in text.splitlines():
+        heading = _DATED_HEADING.match(line)
+        heading_date = parse_date(heading.group(1) or heading.group(2)) if heading else None
+        if heading_date:
+            for thought in _paragraphs("\n".join(buffer)):
+                yield current, thought
+            current, buffer = heading_date, []
+        else:
+            buffer.append(line)
+    for thought in _paragraphs("\n".join(buffer)):
+        yield current, thought
+
+
+def split_journal_json(data: bytes, fallback: str) -> Iterator[Tuple[str, str]]:
+    """(date, thought) pairs from a Day One style JSON export."""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return
+    entries = payload.get("entries", []) if isinstance(payload, dict) else payload
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        text = str(entry.get("text") or entry.get("content") or "").strip()
+        when = parse_date(str(entry.get("creationDate") or entry.get("date") or "")) or fallback
+        if len(text) >= MIN_THOUGHT_CHARS:
+            yield when, text[:MAX_THOUGHT_CHARS]
+
+
+# --------------------------------------------------
+# MANIFEST
+# --------------------------------------------------
+def manifest_path(log: NoteLog) -> str:
+    return f"{os.path.splitext(log.path)[0]}.imports.json"
+
+
+def _load_manifest(log: NoteLog) -> Dict[str, int]:
+    try:
+        with open(manifest_path(log), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(log: NoteLog, manifest: Dict[str, int]) -> None:
+    path = manifest_path(log)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    os.replace(f"{path}.tmp", path)
+
+
+# --------------------------------------------------
+# IMPORT
+# --------------------------------------------------
+def import_zip(
+    log: NoteLog,
+    source: IO[bytes],
+    progress: Optional[Callable[[float, str], None]] = None,
+    check: Callable[[], None] = lambda: None,
+) -> Dict[str, int]:
+    """
+    Import every changed note file in the ZIP `source` into `log` and return
+    ImportStats as a dict. `check` is called between files and may raise to
+    stop; files whose thoughts were already appended stay recorded, and the
+    rest are read again by the next import. Members larger than
+    MAX_FILE_BYTES are skipped.
+    """
+    stats = ImportStats()
+    manifest = _load_manifest(log)
+    pending: List[Dict[str, str]] = []
+    unflushed: Dict[str, int] = {}          # CRCs of files whose thoughts are still in `pending`
+
+    def flush() -> None:
+        added = log.append_many(pending)
+        stats.added += len(added)
+        stats.duplicates += len(pending) - len(added)
+        pending.clear()
+        manifest.update(unflushed)
+        unflushed.clear()
+
+    with zipfile.ZipFile(source) as archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir()
+            and not os.path.basename(info.filename).startswith(".")
+            and "__MACOSX" not in info.filename
+            and info.filename.lower().endswith(TEXT_SUFFIXES + (".json",))
+        ]
+        try:
+            for number, info in enumerate(members, start=1):
+                check()
+                stats.files += 1
+                if manifest.get(info.filename) == info.CRC:
+                    stats.unchanged_files += 1
+                    continue
+                # file_size comes from the ZIP directory and may lie, so the read is capped too
+                if info.file_size > MAX_FILE_BYTES:
+                    stats.oversized_files += 1
+                    continue
+                with archive.open(info) as member:
+                    data = member.read(MAX_FILE_BYTES + 1)
+                if len(data) > MAX_FILE_BYTES:
+                    stats.oversized_files += 1
+                    continue
+                fallback = parse_date(os.path.basename(info.filename)) or date(*info.date_time[:3]).isoformat()
+                if info.filename.lower().endswith(".json"):
+                    thoughts = split_journal_json(data, fallback)
+                else:
+                    thoughts = split_markdown(data.decode("utf-8", errors="replace"), fallback)
+                for when, text in thoughts:
+                    stats.thoughts += 1
+                    pending.append({"date": when, "text": text, "hash": content_hash(text), "source": info.filename})
+                unflushed[info.filename] = info.CRC
+                if len(pending) >= FLUSH_EVERY:
+                    flush()
+                if progress and (number % 50 == 0 or number == len(members)):
+                    progress(number / len(members), f"Imported {number}/{len(members)} files, {stats.added + len(pending)} new thoughts")
+            flush()
+        finally:
+            # Only files whose thoughts were flushed are in the manifest, so a failed
+            # or cancelled import is picked up again next time
+            _save_manifest(log, manifest)
+    return asdict(stats)
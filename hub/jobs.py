@@ -0,0 +1,350 @@
+"""
+Background job runner for long generations.
+
+Pages submit slow work (full-contract rewrites, book summaries, Flux
+renders) to a shared thread pool instead of running it on the script
+thread. Every job is a row in a SQLite table with an id, status, progress
+and result, so a rerun or a trip to another page never repeats or loses
+the work: the page looks the job up again and reattaches to it.
+
+Job functions receive a `JobContext` as their first argument and must
+return something JSON-serialisable. They must not call Streamlit UI
+functions, since they run outside any script run.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+from hub.metrics import record_cache
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+JOB_DB_PATH = os.environ.get(
+    "HUB_JOB_DB",
+    os.path.join(tempfile.gettempdir(), "techsolute_hub", "jobs.sqlite3"),
+)
+MAX_WORKERS = int(os.environ.get("HUB_JOB_WORKERS", "4"))
+# Replicate predictions mostly sleep between polls, so they get their own,
+# larger pool and can't starve imports, reflections and batches
+PREDICTION_WORKERS = int(os.environ.get("HUB_PREDICTION_WORKERS", "16"))
+DEFAULT_POOL, PREDICTION_POOL = "default", "predictions"
+RETENTION_SECONDS = 24 * 3600
+POLL_SECONDS = 1.0
+# A job whose page has stopped polling for this long is treated as abandoned
+ABANDON_SECONDS = float(os.environ.get("HUB_JOB_ABANDON_SECONDS", "30"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    page TEXT NOT NULL,
+    key TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, created);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the job has been cancelled."""
+
+
+@dataclass
+class Job:
+    id: str
+    page: str
+    key: Optional[str]
+    status: str
+    progress: float
+    message: str
+    result: Any
+    error: Optional[str]
+    cancel_requested: bool
+    created: float
+    updated: float
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE
+
+
+def make_key(page: str, *parts: Any) -> str:
+    """Stable key for a page + inputs combination, used to dedupe submissions."""
+    digest = hashlib.sha256()
+    digest.update(page.encode("utf-8"))
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(b"\x00")
+        digest.update(part)
+    return digest.hexdigest()
+
+
+# --------------------------------------------------
+# JOB CONTEXT (handed to job functions)
+# --------------------------------------------------
+class JobContext:
+    def __init__(self, runner: "JobRunner", job_id: str):
+        self.runner = runner
+        self.job_id = job_id
+
+    def set_progress(self, fraction: float, message: str = "") -> None:
+        """Report progress in [0, 1] with an optional status line."""
+        self.runner._update(self.job_id, progress=max(0.0, min(1.0, fraction)), message=message)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.runner._cancel_requested(self.job_id)
+
+    @property
+    def abandoned(self) -> bool:
+        """True once no page has polled this job for ABANDON_SECONDS."""
+        return time.time() - self.runner.last_seen(self.job_id) > ABANDON_SECONDS
+
+    def check(self) -> None:
+        """Raise JobCancelled if cancellation was requested."""
+        if self.cancelled:
+            raise JobCancelled()
+
+
+# --------------------------------------------------
+# RUNNER
+# --------------------------------------------------
+class JobRunner:
+    """Thread pool + SQLite job table. One instance per server process."""
+
+    def __init__(
+        self, db_path: str = JOB_DB_PATH, max_workers: int = MAX_WORKERS, prediction_workers: int = PREDICTION_WORKERS
+    ):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pools = {
+            DEFAULT_POOL: ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hub-job"),
+            PREDICTION_POOL: ThreadPoolExecutor(max_workers=prediction_workers, thread_name_prefix="hub-predict"),
+        }
+        self._futures = {}
+        self._last_seen = {}
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            now = time.time()
+            # Work from a previous server process can't be resumed
+            self._conn.execute(
+                "UPDATE jobs SET status=?, error=?, updated=? WHERE status IN (?, ?)",
+                (FAILED, "Interrupted by a server restart.", now, *ACTIVE),
+            )
+            self._conn.execute("DELETE FROM jobs WHERE updated < ?", (now - RETENTION_SECONDS,))
+
+    # ---- submission ----
+    def submit(
+        self,
+        page: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Optional[str] = None,
+        dedupe: bool = True,
+        pool: str = DEFAULT_POOL,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Queue fn(ctx, *args, **kwargs) on `pool` and return the job id.
+        If `dedupe` and a job with the same key is still queued or running, its
+        id is returned instead and nothing new is queued. Finished jobs are
+        never reused here; reattaching to a result is up to the session.
+        """
+        with self._lock:
+            if key is not None and dedupe:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE key=? AND status IN (?, ?) ORDER BY created DESC LIMIT 1",
+                    (key, *ACTIVE),
+                ).fetchone()
+                record_cache("jobs", hit=row is not None, tool=page)
+                if row:
+                    return row[0]
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO jobs (id, page, key, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, page, key, QUEUED, now, now),
+            )
+            self._last_seen[job_id] = now
+            self._futures[job_id] = self._pools[pool].submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        ctx = JobContext(self, job_id)
+        try:
+            ctx.check()
+            self._update(job_id, status=RUNNING)
+            result = fn(ctx, *args, **kwargs)
+            ctx.check()
+            self._update(job_id, status=DONE, progress=1.0, result=json.dumps(result))
+        except JobCancelled:
+            self._update(job_id, status=CANCELLED, message="Cancelled")
+        except Exception as exc:
+            self._update(job_id, status=FAILED, error=str(exc) or exc.__class__.__name__)
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+                self._last_seen.pop(job_id, None)
+
+    # ---- state ----
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated"] = time.time()
+        columns = ", ".join(f"{name}=?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id=?", (*fields.values(), job_id))
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def touch(self, job_id: str) -> None:
+        """Record that a page is still watching this job."""
+        with self._lock:
+            if job_id in self._futures:
+                self._last_seen[job_id] = time.time()
+
+    def last_seen(self, job_id: str) -> float:
+        with self._lock:
+            return self._last_seen.get(job_id, time.time())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, page, key, status, progress, message, result, error, cancel_requested, created, updated "
+                "FROM jobs WHERE id=?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        values = list(row)
+        values[6] = json.loads(values[6]) if values[6] is not None else None
+        values[8] = bool(values[8])
+        return Job(*values)
+
+    def cancel(self, job_id: str) -> None:
+        """Cancel a queued job outright; ask a running job to stop at its next check()."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET cancel_requested=1 WHERE id=?", (job_id,))
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            # _run never starts for it, so its cleanup happens here instead
+            self._update(job_id, status=CANCELLED, message="Cancelled")
+            with self._lock:
+                self._futures.pop(job_id, None)
+                self._last_seen.pop(job_id, None)
+
+
+@st.cache_resource
+def get_runner() -> JobRunner:
+    """The process-wide runner shared by every session and page."""
+    return JobRunner()
+
+
+# --------------------------------------------------
+# PAGE HELPERS
+# --------------------------------------------------
+def _session_id() -> str:
+    return st.session_state.setdefault("job_session", uuid.uuid4().hex)
+
+
+def submit(
+    page: str,
+    fn: Callable[..., Any],
+    *args: Any,
+    key_parts: tuple = (),
+    force: bool = False,
+    shared: bool = False,
+    pool: str = DEFAULT_POOL,
+    **kwargs: Any,
+) -> str:
+    """
+    Submit a job for this session's page and remember it, so the page can
+    reattach after reruns or after the user navigates away and back.
+
+    Keys are scoped to the session, so one user's result is never handed to
+    another; pass `shared=True` for work on shared state (a batch everyone
+    resumes) so concurrent sessions join one in-flight job. `force=True`
+    (an explicit button click) always queues a new job. Jobs that mostly wait
+    on a Replicate prediction go to `pool=PREDICTION_POOL`.
+    """
+    key = None
+    if key_parts:
+        key = make_key(page, *key_parts) if shared else make_key(page, _session_id(), *key_parts)
+    previous = current(page)
+    if not force and key is not None and previous is not None and previous.key == key:
+        # Same inputs as last time: reattach instead of retrying on every rerun
+        return previous.id
+    job_id = get_runner().submit(page, fn, *args, key=key, dedupe=not force, pool=pool, **kwargs)
+    st.session_state[f"job_{page}"] = job_id
+    return job_id
+
+
+def current(page: str) -> Optional[Job]:
+    """The job this session last submitted on `page`, if any."""
+    job_id = st.session_state.get(f"job_{page}")
+    return get_runner().get(job_id) if job_id else None
+
+
+def forget(page: str) -> None:
+    st.session_state.pop(f"job_{page}", None)
+
+
+def track(job: Job, label: str) -> Optional[Job]:
+    """
+    Render progress for `job` and return it once it has completed successfully.
+    While the job is active a fragment polls the table and triggers a full
+    rerun when it finishes, so the script thread is never held.
+    """
+    if job.status == DONE:
+        return job
+    if job.status in (FAILED, CANCELLED):
+        if job.status == FAILED:
+            st.error(f"{label} failed: {job.error}")
+        else:
+            st.info(f"{label} was cancelled.")
+        if st.button("Try again", key=f"retry_{job.id}"):
+            forget(job.page)
+            st.rerun()
+        return None
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def _progress():
+        get_runner().touch(job.id)
+        latest = get_runner().get(job.id)
+        if latest is None or latest.finished:
+            st.rerun()
+        text = latest.message or ("Queued..." if latest.status == QUEUED else f"{label}...")
+        st.progress(latest.progress, text=text)
+        if st.button("Cancel", key=f"cancel_{job.id}"):
+            get_runner().cancel(job.id)
+            st.rerun()
+
+    _progress()
+    return None
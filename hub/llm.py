@@ -0,0 +1,149 @@
+"""
+Instrumented Gemini access for the pages.
+
+`get_model(tool)` replaces `GenerativeModel('gemini-2.5-flash')` in the
+pages: it returns a wrapper with the same `generate_content` call that
+records latency, token usage, prompt bytes and failures in hub.metrics
+under the page's tool name. `upload_file` does the same for file uploads.
+Unless a model name is passed, hub.routing picks the model per call from
+the tool's tier.
+
+Identical text-only calls that overlap in time (same model, settings and
+prompt, from any session or tool) are coalesced through hub.singleflight
+into one upstream request; set HUB_SINGLEFLIGHT=0 to turn that off.
+Each request then runs under hub.resilience (deadline, retries, hedging,
+circuit breaker); every individual attempt is recorded in the metrics.
+Text prompts can fail over to other providers (hub.providers) in the
+order hub.routing.plan gives; the first provider gets half the tool's
+deadline when there is somewhere to fail over to.
+"""
+import io
+import os
+import time
+from typing import Any, Hashable, Iterator, List, Optional, Tuple
+
+import google.generativeai as genai
+
+from hub import metrics, providers, resilience, routing
+from hub.singleflight import Group
+
+SINGLEFLIGHT = os.environ.get("HUB_SINGLEFLIGHT", "1") != "0"
+FAILOVER_SHARE = 0.5
+MIN_FAILOVER_DEADLINE = 5.0
+
+_inflight = Group()
+
+
+def _prompt_bytes(contents: Any) -> int:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    return sum(len(part.encode("utf-8")) for part in parts if isinstance(part, str))
+
+
+def _text_only(contents: Any) -> bool:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    return all(isinstance(part, str) for part in parts)
+
+
+def _flight_key(model: "Model", plan: List[Tuple[str, str]], contents: Any, kwargs: dict) -> Optional[Hashable]:
+    """Key for coalescing, or None for calls that must not be shared (files, streams)."""
+    if not _text_only(contents):
+        return None
+    parts = tuple(contents) if isinstance(contents, (list, tuple)) else (contents,)
+    try:
+        settings = repr(sorted(model._kwargs.items())) + repr(sorted(kwargs.items()))
+    except TypeError:
+        return None
+    return (tuple(plan), settings, parts)
+
+
+class _TimedStream:
+    """Records a streamed call once the caller has read the last chunk."""
+
+    def __init__(self, response, record: metrics.CallRecord):
+        self._response = response
+        self._record = record
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            yield from self._response
+        except BaseException as exc:
+            self._record.finish(exc)
+            raise
+        self._record.usage(self._response)
+        self._record.finish()
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class Model:
+    """A GenerativeModel that routes, fails over and reports every call to hub.metrics."""
+
+    def __init__(self, tool: str, model_name: Optional[str] = None, **kwargs: Any):
+        self.tool = tool
+        self.pinned = model_name
+        self._kwargs = kwargs
+
+    @property
+    def model_name(self) -> str:
+        """The model the next default call would use."""
+        return routing.plan(self.tool, pinned=self.pinned)[0][1]
+
+    def generate_content(self, contents: Any, *, op: str = "generate", stream: bool = False, **kwargs: Any):
+        """`op` names the call site within the tool (e.g. 'riddle', 'compare')."""
+        plan = routing.plan(self.tool, op, text_only=_text_only(contents) and not stream, pinned=self.pinned)
+        key = _flight_key(self, plan, contents, kwargs) if SINGLEFLIGHT and not stream else None
+        if key is None:
+            return self._call(plan, contents, op, stream, kwargs)
+        response, shared = _inflight.do(key, lambda: self._call(plan, contents, op, stream, kwargs))
+        metrics.record_cache("singleflight", shared, self.tool)
+        return response
+
+    def _call(self, plan: List[Tuple[str, str]], contents: Any, op: str, stream: bool, kwargs: dict):
+        """Try each (provider, model) in turn while failures look like provider trouble."""
+        budget = resilience.policy_for(self.tool, op).deadline
+        size = _prompt_bytes(contents)
+        started = time.monotonic()
+        for index, (provider, model_name) in enumerate(plan):
+            last = index == len(plan) - 1
+            remaining = max(budget - (time.monotonic() - started), MIN_FAILOVER_DEADLINE)
+            deadline = remaining if last else min(remaining, budget * FAILOVER_SHARE)
+            if index:
+                metrics.record_event("failover", self.tool)
+            try:
+                # A stream is only retried while opening it; chunks are never duplicated
+                return resilience.call(
+                    self.tool, model_name,
+                    lambda: self._attempt(provider, model_name, contents, op, stream, kwargs),
+                    hedge=not stream, deadline=deadline, op=op, size=size,
+                )
+            except Exception as exc:
+                if last or not (isinstance(exc, resilience.ResilienceError) or resilience.is_retryable(exc)):
+                    raise
+
+    def _attempt(self, provider: str, model_name: str, contents: Any, op: str, stream: bool, kwargs: dict):
+        record = metrics.start_call("llm", self.tool, model_name, op=op, bytes_sent=_prompt_bytes(contents))
+        try:
+            response = providers.get(provider).generate(model_name, contents, self._kwargs, kwargs, stream=stream)
+        except BaseException as exc:
+            record.finish(exc)
+            raise
+        if stream:
+            return _TimedStream(response, record)
+        record.usage(response)
+        record.finish()
+        return response
+
+
+def get_model(tool: str, model_name: Optional[str] = None, **kwargs: Any) -> Model:
+    """Model for `tool`; pass `model_name` to bypass routing."""
+    return Model(tool, model_name, **kwargs)
+
+
+def upload_file(tool: str, data: Any, mime_type: Optional[str] = None, op: str = "upload"):
+    """genai.upload_file with its size and latency recorded."""
+    if isinstance(data, (bytes, bytearray)):
+        data = io.BytesIO(data)
+    size = data.getbuffer().nbytes if hasattr(data, "getbuffer") else getattr(data, "size", 0)
+    with metrics.timed("upload", tool, "gemini-files", op=op, bytes_sent=size):
+        return genai.upload_file(data, mime_type=mime_type)
@@ -0,0 +1,354 @@
+"""
+In-process metrics for model and image-API calls.
+
+Every external call (Gemini, Replicate, remove.bg) is recorded with the
+tool it was made for, latency, input/output tokens, bytes sent and the
+error class if it failed; caches record hits and misses, and the
+resilience layer counts retries, hedges and breaker trips. Series live in
+one process-wide registry (calls from background jobs included) and are
+read by the admin Metrics page, which also offers a Prometheus-style
+text export. Nothing is persisted: numbers reset when the server restarts.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+# Latency buckets in seconds (upper bounds), tuned for LLM calls
+BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0, float("inf"))
+RECENT_SAMPLES = 500
+
+# USD per 1M tokens (input, output); override with HUB_PRICE_<MODEL>="in,out"
+TOKEN_PRICES = {
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "claude-3-5-haiku-latest": (0.80, 4.00),
+    "claude-sonnet-4-5": (3.00, 15.00),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "mistral-small-latest": (0.10, 0.30),
+    "mistral-large-latest": (2.00, 6.00),
+}
+# USD per successful call for APIs billed per image
+CALL_PRICES = {
+    "black-forest-labs/flux-dev": 0.025,
+    "remove.bg": 0.20,
+}
+
+
+def _price_override(model: str) -> Optional[Tuple[float, float]]:
+    raw = os.environ.get("HUB_PRICE_" + model.upper().replace("-", "_").replace(".", "_").replace("/", "_"))
+    if not raw:
+        return None
+    values = [float(v) for v in raw.split(",")]
+    return (values[0], values[1] if len(values) > 1 else 0.0)
+
+
+def call_cost(model: str, input_tokens: int = 0, output_tokens: int = 0, units: int = 1) -> float:
+    """Estimated USD cost of one call."""
+    prices = _price_override(model) or TOKEN_PRICES.get(model)
+    if prices:
+        return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+    return CALL_PRICES.get(model, 0.0) * units
+
+
+# --------------------------------------------------
+# SERIES
+# --------------------------------------------------
+@dataclass
+class CallSeries:
+    """Aggregates for one (kind, tool, op, model) combination."""
+
+    kind: str
+    tool: str
+    op: str
+    model: str
+    calls: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    seconds_total: float = 0.0
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+    input_tokens: int = 0
+    output_tokens: int = 0
+    bytes_sent: int = 0
+    cost: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_SAMPLES))
+    # True/False per recent call, for a recent (not lifetime) error rate
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=RECENT_SAMPLES))
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency quantile over the most recent successful calls."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CallRecord:
+    """One call in flight. The caller fills in usage, then calls `finish()`."""
+
+    def __init__(self, kind: str, tool: str, model: str, op: str = "generate", bytes_sent: int = 0):
+        self.kind = kind
+        self.tool = tool
+        self.model = model
+        self.op = op
+        self.bytes_sent = bytes_sent
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.units = 1
+        self.started = time.perf_counter()
+
+    def usage(self, response) -> None:
+        """Copy token counts from a Gemini response's usage_metadata."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            self.output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+
+    def finish(self, error: Union[BaseException, str, None] = None) -> None:
+        """Record the call; `error` is the exception raised or a short error class."""
+        if isinstance(error, BaseException):
+            error = type(error).__name__
+        REGISTRY.record_call(
+            self.kind, self.tool, self.model, time.perf_counter() - self.started, op=self.op,
+            input_tokens=0 if error else self.input_tokens,
+            output_tokens=0 if error else self.output_tokens,
+            bytes_sent=self.bytes_sent,
+            error=error,
+            units=self.units,
+        )
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[Tuple[str, str, str, str], CallSeries] = {}
+        self.cache: Dict[Tuple[str, str], List[int]] = {}
+        self.events: Dict[Tuple[str, str], int] = {}
+        self.started = time.time()
+
+    def record_call(
+        self,
+        kind: str,
+        tool: str,
+        model: str,
+        seconds: float,
+        op: str = "generate",
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        bytes_sent: int = 0,
+        error: Optional[str] = None,
+        units: int = 1,
+    ) -> None:
+        key = (kind, tool, op, model)
+        with self._lock:
+            series = self.calls.get(key)
+            if series is None:
+                series = self.calls[key] = CallSeries(kind, tool, op, model)
+            series.calls += 1
+            series.seconds_total += seconds
+            series.bucket_counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            series.input_tokens += input_tokens
+            series.output_tokens += output_tokens
+            series.bytes_sent += bytes_sent
+            series.outcomes.append(not error)
+            if error:
+                series.errors[error] = series.errors.get(error, 0) + 1
+            else:
+                series.recent.append(seconds)
+                series.cost += call_cost(model, input_tokens, output_tokens, units)
+
+    def record_cache(self, cache: str, hit: bool, tool: str = "") -> None:
+        key = (cache, tool)
+        with self._lock:
+            counts = self.cache.setdefault(key, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def record_event(self, event: str, tool: str = "") -> None:
+        key = (event, tool)
+        with self._lock:
+            self.events[key] = self.events.get(key, 0) + 1
+
+    def series(self) -> List[CallSeries]:
+        with self._lock:
+            return list(self.calls.values())
+
+    def latency_quantile(
+        self, tool: str, model: str, q: float, kind: str = "llm", min_samples: int = 1, op: Optional[str] = None
+    ) -> Optional[float]:
+        """Quantile of recent successes of `tool` on `model`, for one op or across all of them."""
+        with self._lock:
+            samples = [
+                s for series in self.calls.values()
+                if series.kind == kind and series.tool == tool and series.model == model
+                and (op is None or series.op == op)
+                for s in series.recent
+            ]
+        if not samples or len(samples) < min_samples:
+            return None
+        samples.sort()
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def model_health(self, model: str, tool: Optional[str] = None, kind: str = "llm") -> Tuple[Optional[float], float, int]:
+        """(median latency, recent error rate, recent calls) for `model`, optionally for one tool."""
+        with self._lock:
+            matching = [
+                series for series in self.calls.values()
+                if series.kind == kind and series.model == model and (tool is None or series.tool == tool)
+            ]
+            samples = sorted(s for series in matching for s in series.recent)
+            outcomes = [ok for series in matching for ok in series.outcomes]
+        median = samples[len(samples) // 2] if samples else None
+        error_rate = outcomes.count(False) / len(outcomes) if outcomes else 0.0
+        return median, error_rate, len(outcomes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.cache.clear()
+            self.events.clear()
+            self.started = time.time()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def start_call(kind: str, tool: str, model: str, op: str = "generate", bytes_sent: int = 0) -> CallRecord:
+    return CallRecord(kind, tool, model, op, bytes_sent)
+
+
+@contextmanager
+def timed(kind: str, tool: str, model: str, op: str = "generate", bytes_sent: int = 0) -> Iterator[CallRecord]:
+    """
+    Time one external call and record it, tagging failures with the
+    exception class (the exception still propagates).
+    """
+    record = start_call(kind, tool, model, op, bytes_sent)
+    try:
+        yield record
+    except BaseException as exc:
+        record.finish(exc)
+        raise
+    record.finish()
+
+
+def record_cache(cache: str, hit: bool, tool: str = "") -> None:
+    REGISTRY.record_cache(cache, hit, tool)
+
+
+def record_event(event: str, tool: str = "") -> None:
+    REGISTRY.record_event(event, tool)
+
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+def _labels(**labels: str) -> str:
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def prometheus_text(registry: MetricsRegistry = REGISTRY) -> str:
+    """Render every series in the Prometheus text exposition format."""
+    lines = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    series = registry.series()
+
+    family("hub_call_duration_seconds", "histogram", "Latency of external model and image API calls.")
+    for s in series:
+        base = dict(kind=s.kind, tool=s.tool, op=s.op, model=s.model)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, s.bucket_counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"hub_call_duration_seconds_bucket{_labels(**base, le=le)} {cumulative}")
+        lines.append(f"hub_call_duration_seconds_sum{_labels(**base)} {s.seconds_total:.6f}")
+        lines.append(f"hub_call_duration_seconds_count{_labels(**base)} {s.calls}")
+
+    family("hub_call_errors_total", "counter", "Failed calls by exception class.")
+    for s in series:
+        for error, count in sorted(s.errors.items()):
+            lines.append(f"hub_call_errors_total{_labels(kind=s.kind, tool=s.tool, op=s.op, model=s.model, error=error)} {count}")
+
+    family("hub_tokens_total", "counter", "Model tokens by direction.")
+    for s in series:
+        if s.input_tokens or s.output_tokens:
+            base = dict(tool=s.tool, op=s.op, model=s.model)
+            lines.append(f"hub_tokens_total{_labels(**base, direction='input')} {s.input_tokens}")
+            lines.append(f"hub_tokens_total{_labels(**base, direction='output')} {s.output_tokens}")
+
+    family("hub_bytes_sent_total", "counter", "Bytes sent to external APIs (prompts and uploads).")
+    for s in series:
+        if s.bytes_sent:
+            lines.append(f"hub_bytes_sent_total{_labels(kind=s.kind, tool=s.tool, op=s.op, model=s.model)} {s.bytes_sent}")
+
+    family("hub_cost_usd_total", "counter", "Estimated spend in USD.")
+    for s in series:
+        if s.cost:
+            lines.append(f"hub_cost_usd_total{_labels(kind=s.kind, tool=s.tool, op=s.op, model=s.model)} {s.cost:.6f}")
+
+    family("hub_cache_requests_total", "counter", "Cache lookups by result.")
+    with registry._lock:
+        cache = dict(registry.cache)
+    for (name, tool), (hits, misses) in sorted(cache.items()):
+        lines.append(f"hub_cache_requests_total{_labels(cache=name, tool=tool, result='hit')} {hits}")
+        lines.append(f"hub_cache_requests_total{_labels(cache=name, tool=tool, result='miss')} {misses}")
+
+    family("hub_resilience_events_total", "counter", "Retries, hedges, deadlines and circuit breaker events.")
+    with registry._lock:
+        events = dict(registry.events)
+    for (event, tool), count in sorted(events.items()):
+        lines.append(f"hub_resilience_events_total{_labels(event=event, tool=tool)} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def summary_rows(registry: MetricsRegistry = REGISTRY) -> List[Dict]:
+    """One flat row per series, for tables."""
+    rows = []
+    for s in registry.series():
+        p50, p95 = s.quantile(0.5), s.quantile(0.95)
+        rows.append({
+            "kind": s.kind,
+            "tool": s.tool,
+            "op": s.op,
+            "model": s.model,
+            "calls": s.calls,
+            "errors": s.error_count,
+            "seconds_total": s.seconds_total,
+            "p50_s": p50,
+            "p95_s": p95,
+            "input_tokens": s.input_tokens,
+            "output_tokens": s.output_tokens,
+            "bytes_sent": s.bytes_sent,
+            "cost_usd": s.cost,
+        })
+    return rows
+
+
+def bucket_label(index: int) -> str:
+    bound = BUCKETS[index]
+    if bound == float("inf"):
+        return f">{BUCKETS[index - 1]:g}s"
+    return f"≤{bound:g}s"
@@ -0,0 +1,192 @@
+"""
+Persistent per-user notes: an append-only JSONL log plus a date index.
+
+Each user's notes live in one file, one JSON record per line, only ever
+appended to. When a log is first opened it is scanned once to record
+each note's byte offset and a sorted (date, id) index; after that an
+append writes its lines and updates both in place. Range queries and
+pages are answered from the index and read only the notes they return,
+so a page load costs the same with 50 notes or 50,000.
+
+Users are identified by an opaque id (ContraMind takes it from the
+`?user=` query parameter), not by an account: the id is a shared secret,
+and anyone holding the link can read and add to those notes.
+
+Notes are user data, not a cache, so they live under HUB_DATA_DIR (a
+persistent volume in deployment) rather than the temp directory.
+"""
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+DATA_DIR = os.environ.get("HUB_DATA_DIR", os.path.join(os.path.expanduser("~"), ".techsolute_hub"))
+NOTES_DIR = os.environ.get("HUB_NOTES_DIR", os.path.join(DATA_DIR, "notes"))
+BULK_APPEND = 64            # above this many notes, re-sorting the index beats inserting one by one
+_USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+Note = Dict[str, Any]
+
+
+def valid_user_id(user: Optional[str]) -> bool:
+    return bool(user and _USER_ID.match(user))
+
+
+class NoteLog:
+    """One user's notes; ids are 0, 1, 2... in the order they were added."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets: List[int] = []
+        self._by_date: List[Tuple[str, int]] = []
+        self._hashes: Set[str] = set()          # content hashes of imported notes, for dedupe
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            self._scan()
+
+    def _scan(self) -> None:
+        with open(self.path, "rb") as fh:
+            offset = 0
+            for line in fh:
+                if line.endswith(b"\n"):
+                    record = json.loads(line)
+                    self._offsets.append(offset)
+                    self._by_date.append((record["date"], len(self._offsets) - 1))
+                    if "hash" in record:
+                        self._hashes.add(record["hash"])
+                    offset += len(line)
+                else:
+                    # A torn final write from a crash: drop it so the next append starts clean
+                    break
+        if offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as fh:
+                fh.truncate(offset)
+        self._by_date.sort()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    # ---- writes ----
+    def append(self, date: str, text: str, **fields: Any) -> Optional[Note]:
+        added = self.append_many([{"date": date, "text": text, **fields}])
+        return added[0] if added else None
+
+    def append_many(self, notes: List[Dict[str, Any]]) -> List[Note]:
+        """Append several notes with one write; notes carrying a known "hash" are skipped."""
+        added: List[Note] = []
+        with self._lock:
+            now = time.time()
+            chunks = []
+            with open(self.path, "ab") as fh:
+                offset = fh.tell()
+                for fields in notes:
+                    if fields.get("hash") in self._hashes:
+                        continue
+                    note = {"id": len(self._offsets), "added": now, **fields}
+                    line = (json.dumps(note, ensure_ascii=False) + "\n").encode("utf-8")
+                    chunks.append(line)
+                    self._offsets.append(offset)
+                    offset += len(line)
+                    if "hash" in note:
+                        self._hashes.add(note["hash"])
+                    added.append(note)
+                fh.write(b"".join(chunks))
+            if len(added) > BULK_APPEND:
+                self._by_date.extend((note["date"], note["id"]) for note in added)
+                self._by_date.sort()
+            else:
+                for note in added:
+                    bisect.insort(self._by_date, (note["date"], note["id"]))
+        return added
+
+    def has_hash(self, content_hash: str) -> bool:
+        with self._lock:
+            return content_hash in self._hashes
+
+    # ---- reads ----
+    def _read(self, fh, note_id: int) -> Note:
+        fh.seek(self._offsets[note_id])
+        return json.loads(fh.readline())
+
+    def get(self, note_id: int) -> Note:
+        with self._lock, open(self.path, "rb") as fh:
+            return self._read(fh, note_id)
+
+    __getitem__ = get
+
+    def since(self, note_id: int) -> List[Note]:
+        """Notes added after the first `note_id` ones, in insertion order."""
+        with self._lock:
+            if note_id >= len(self._offsets):
+                return []
+            with open(self.path, "rb") as fh:
+                fh.seek(self._offsets[note_id])
+                return [json.loads(line) for line in fh]
+
+    def __iter__(self) -> Iterator[Note]:
+        return iter(self.since(0))
+
+    def _span(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._by_date, (start, -1)) if start else 0
+        hi = bisect.bisect_right(self._by_date, (end, len(self._offsets))) if end else len(self._by_date)
+        return lo, hi
+
+    def count(self, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """Notes dated within [start, end] (ISO dates, inclusive)."""
+        with self._lock:
+            lo, hi = self._span(start, end)
+        return max(hi - lo, 0)
+
+    def range(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> List[Note]:
+        """One page of the notes dated within [start, end], in date order."""
+        with self._lock:
+            lo, hi = self._span(start, end)
+            keys = self._by_date[lo:hi]
+            if newest_first:
+                keys = keys[::-1]
+            keys = keys[offset:offset + limit if limit is not None else None]
+            with open(self.path, "rb") as fh:
+                return [self._read(fh, note_id) for _, note_id in keys]
+
+    def first_date(self) -> Optional[str]:
+        with self._lock:
+            return self._by_date[0][0] if self._by_date else None
+
+    def last_date(self) -> Optional[str]:
+        with self._lock:
+            return self._by_date[-1][0] if self._by_date else None
+
+
+_logs: Dict[str, NoteLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_log(app: str, user: str) -> NoteLog:
+    """
+    The process-wide log for `user` in `app`, shared by all of that user's
+    sessions. Exactly one NoteLog exists per file (never evicted), since two
+    would append with diverging offsets.
+    """
+    if not valid_user_id(user):
+        raise ValueError(f"Invalid user id: {user!r}")
+    path = os.path.join(NOTES_DIR, app, f"{user}.jsonl")
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = NoteLog(path)
+        return log
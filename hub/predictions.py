@@ -0,0 +1,115 @@
+"""
+Asynchronous Replicate predictions for the image pages.
+
+Instead of the blocking `replicate_client.run(...)`, a prediction is
+created and then polled with a bounded back-off from inside a background
+job (see hub.jobs). Progress is parsed from the model's tqdm logs and
+reported with an ETA; the prediction is cancelled on Replicate when the
+user cancels, when the page stops watching it, or when it overruns.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import replicate
+
+from hub import metrics
+from hub.jobs import JobCancelled, JobContext
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+PREDICTION_TIMEOUT = float(os.environ.get("HUB_PREDICTION_TIMEOUT", "180"))
+POLL_INITIAL = 0.5
+POLL_MAX = 2.0
+POLL_BACKOFF = 1.5
+
+TERMINAL = ("succeeded", "failed", "canceled")
+STATUS_TEXT = {
+    "starting": "Warming up the model...",
+    "processing": "Rendering...",
+}
+
+
+def make_client(api_token: str, base_url: Optional[str] = None) -> replicate.Client:
+    """Replicate client; `base_url` points at a stand-in server in tests."""
+    return replicate.Client(api_token=api_token, base_url=base_url or None)
+
+
+def _format_eta(seconds: float) -> str:
+    return f"~{seconds:.0f}s left" if seconds >= 1 else "almost done"
+
+
+def _output_urls(output: Any) -> List[str]:
+    if output is None:
+        return []
+    if isinstance(output, (list, tuple)):
+        return [str(item) for item in output]
+    return [str(output)]
+
+
+def run_prediction(
+    ctx: JobContext,
+    client: replicate.Client,
+    model: str,
+    model_input: Dict[str, Any],
+    label: str = "Rendering",
+    timeout: float = PREDICTION_TIMEOUT,
+    tool: str = "replicate",
+) -> List[str]:
+    """
+    Create a prediction and poll it to completion inside a job.
+    Returns the output URLs. Raises JobCancelled, TimeoutError or RuntimeError.
+    The whole wait is recorded in hub.metrics under `tool`.
+    """
+    record = metrics.start_call("image", tool, model, op="predict")
+    try:
+        urls = _await_prediction(ctx, client, model, model_input, label, timeout)
+    except BaseException as exc:
+        record.finish(exc)
+        raise
+    record.units = len(urls)
+    record.finish()
+    return urls
+
+
+def _await_prediction(ctx, client, model, model_input, label, timeout) -> List[str]:
+    ctx.set_progress(0.02, "Submitting to Replicate...")
+    prediction = client.predictions.create(model=model, input=model_input)
+    started = time.monotonic()
+    delay = POLL_INITIAL
+
+    try:
+        while prediction.status not in TERMINAL:
+            if ctx.cancelled or ctx.abandoned:
+                raise JobCancelled()
+            elapsed = time.monotonic() - started
+            if elapsed > timeout:
+                raise TimeoutError(f"{label} took longer than {timeout:.0f}s and was stopped.")
+
+            progress = prediction.progress
+            if progress is not None and progress.percentage > 0:
+                eta = elapsed * (1 - progress.percentage) / progress.percentage
+                ctx.set_progress(
+                    0.05 + 0.9 * progress.percentage,
+                    f"{label} {progress.percentage:.0%} · {_format_eta(eta)}",
+                )
+            else:
+                ctx.set_progress(0.05, STATUS_TEXT.get(prediction.status, f"{label}..."))
+
+            time.sleep(delay)
+            delay = min(delay * POLL_BACKOFF, POLL_MAX)
+            prediction.reload()
+    except (JobCancelled, TimeoutError):
+        try:
+            prediction.cancel()
+        except Exception:
+            pass  # Best effort: the job is already being torn down
+        raise
+
+    if prediction.status == "canceled":
+        raise JobCancelled()
+    if prediction.status == "failed":
+        raise RuntimeError(prediction.error or f"{label} failed on Replicate.")
+    return _output_urls(prediction.output)
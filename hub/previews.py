@@ -0,0 +1,91 @@
+"""
+Downscaled WebP/AVIF previews for the image pages.
+
+`st.image` re-encodes anything that is not PNG/JPEG/GIF back to PNG or
+JPEG, so previews bypass it: they are written into the app's `static/`
+folder and shown by URL (the browser fetches and caches them over HTTP),
+or inlined as a data URI when static serving is disabled. Lossless
+originals stay in the artifact store for downloads.
+"""
+import base64
+import io
+import os
+from dataclasses import dataclass
+from typing import Tuple
+
+import streamlit as st
+from PIL import Image, features
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PREVIEW_DIR = os.path.join(APP_ROOT, "static", "previews")
+STATIC_URL = "/app/static/previews"
+
+# Opt in to AVIF where Pillow can encode it (smaller, slower to encode)
+PREFER_AVIF = os.environ.get("HUB_PREVIEW_AVIF", "0") == "1"
+
+MIME_TYPES = {"webp": "image/webp", "avif": "image/avif", "jpeg": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class PreviewProfile:
+    name: str
+    max_side: int
+    quality: int
+
+    @property
+    def tag(self) -> str:
+        return f"{self.name}-{self.max_side}-q{self.quality}"
+
+
+PROFILES = {
+    # T-shirt mockups are shown in up to four narrow columns
+    "afroforge": PreviewProfile("afroforge", max_side=600, quality=75),
+    # Phone wallpapers are tall; keep enough height to judge detail
+    "person8": PreviewProfile("person8", max_side=900, quality=80),
+    # Cutouts need clean edges, so a slightly higher quality
+    "bgforge": PreviewProfile("bgforge", max_side=800, quality=85),
+}
+
+
+def preview_format() -> str:
+    if PREFER_AVIF and features.check("avif"):
+        return "avif"
+    if features.check("webp"):
+        return "webp"
+    return "jpeg"
+
+
+def encode_preview(img: Image.Image, profile: PreviewProfile) -> Tuple[bytes, str]:
+    """Downscale to the profile's longest side and encode; returns (bytes, format)."""
+    fmt = preview_format()
+    preview = img.copy()
+    preview.thumbnail((profile.max_side, profile.max_side), Image.LANCZOS)
+
+    has_alpha = preview.mode in ("RGBA", "LA", "PA") or "transparency" in preview.info
+    if fmt == "jpeg" or not has_alpha:
+        preview = preview.convert("RGB")
+    else:
+        preview = preview.convert("RGBA")
+
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        preview.save(buffer, format="WEBP", quality=profile.quality, method=4)
+    elif fmt == "avif":
+        preview.save(buffer, format="AVIF", quality=profile.quality)
+    else:
+        preview.save(buffer, format="JPEG", quality=profile.quality, optimize=True)
+    return buffer.getvalue(), fmt
+
+
+def preview_src(path: str) -> str:
+    """URL for a preview file: static serving when enabled, else a data URI."""
+    if st.get_option("server.enableStaticServing"):
+        return f"{STATIC_URL}/{os.path.basename(path)}"
+    ext = path.rsplit(".", 1)[-1]
+    with open(path, "rb") as fh:
+        encoded = base64.b64encode(fh.read()).decode("ascii")
+    return f"data:{MIME_TYPES[ext]};base64,{encoded}"
@@ -0,0 +1,265 @@
+"""
+Opt-in per-rerun profiling.
+
+`profiling.start()` at the top of a page starts a sampling profiler for
+that script run: a background thread reads the script thread's stack via
+`sys._current_frames()` every few milliseconds and stops on its own once
+the page's module frame is gone (normal end, st.stop or st.rerun).
+`with profiling.section("parse pdf"):` adds a named timing to the
+breakdown. The sidebar shows the last few runs of the session with the
+section breakdown, the hottest functions, and downloads of the collapsed
+stacks (for flamegraph.pl / speedscope) and a ready-made SVG flamegraph.
+
+Off by default. Enable for every session with HUB_PROFILE=1, or for an
+admin session with `?profile=1` (`?profile=0` turns it off again).
+When disabled, start() and section() cost next to nothing.
+"""
+import hashlib
+import html
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from hub.admin import is_admin
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+ENV_ENABLED = os.environ.get("HUB_PROFILE", "0") == "1"
+SAMPLE_INTERVAL = float(os.environ.get("HUB_PROFILE_INTERVAL_MS", "5")) / 1000
+RUNS_PER_SESSION = 5
+MAX_SESSIONS = 50
+MAX_RUN_SECONDS = 600
+
+FLAME_WIDTH = 1200
+FLAME_ROW = 17
+
+
+@dataclass
+class RunProfile:
+    page: str
+    started: float
+    interval: float
+    duration: float = 0.0
+    samples: Counter = field(default_factory=Counter)
+    sections: List[Tuple[str, float]] = field(default_factory=list)
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format: `a;b;c count` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def hottest(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Functions by self time (leaf of the sampled stack), in ms."""
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [(name, count * self.interval * 1000) for name, count in leaves.most_common(limit)]
+
+
+# Completed runs, per session, newest last
+_RUNS: "OrderedDict[str, Deque[RunProfile]]" = OrderedDict()
+# Run being profiled, per script thread, so section() can find it
+_ACTIVE: Dict[int, RunProfile] = {}
+_LOCK = threading.Lock()
+
+
+def _frame_name(frame, script_file: str) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    if code.co_filename == script_file:
+        # Line-level detail for the page itself, where reruns spend their time
+        return f"{code.co_name} ({filename}:{frame.f_lineno})"
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack(frame, script_file: str) -> Optional[str]:
+    """Stack from the page's module frame inward, or None if the script has finished."""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    for index, candidate in enumerate(frames):
+        if candidate.f_code.co_filename == script_file:
+            return ";".join(_frame_name(f, script_file) for f in frames[index:])
+    return None
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, script_file: str, session_id: str, profile: RunProfile):
+        super().__init__(name="hub-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.script_file = script_file
+        self.session_id = session_id
+        self.profile = profile
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        while time.perf_counter() - start < MAX_RUN_SECONDS:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = _stack(frame, self.script_file) if frame is not None else None
+            if stack is None:
+                break
+            self.profile.samples[stack] += 1
+            del frame
+            time.sleep(self.profile.interval)
+        self.profile.duration = time.perf_counter() - start
+        with _LOCK:
+            if _ACTIVE.get(self.thread_id) is self.profile:
+                del _ACTIVE[self.thread_id]
+            runs = _RUNS.setdefault(self.session_id, deque(maxlen=RUNS_PER_SESSION))
+            runs.append(self.profile)
+            _RUNS.move_to_end(self.session_id)
+            while len(_RUNS) > MAX_SESSIONS:
+                _RUNS.popitem(last=False)
+
+
+def enabled() -> bool:
+    if ENV_ENABLED:
+        return True
+    flag = st.query_params.get("profile")
+    if flag is not None and is_admin():
+        st.session_state.hub_profile = flag == "1"
+    return bool(st.session_state.get("hub_profile"))
+
+
+def start() -> None:
+    """Profile the calling page's current run (if enabled) and show past runs."""
+    if not enabled():
+        return
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    # Only the caller's frame is needed; inspect.stack() would read source for every frame
+    script_file = sys._getframe(1).f_code.co_filename
+    thread_id = threading.get_ident()
+    profile = RunProfile(page=os.path.basename(script_file), started=time.time(), interval=SAMPLE_INTERVAL)
+    with _LOCK:
+        _ACTIVE[thread_id] = profile
+        previous = list(_RUNS.get(ctx.session_id, ()))
+    _Sampler(thread_id, script_file, ctx.session_id, profile).start()
+    _sidebar(previous)
+
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """Time a block of the page into the current run's breakdown."""
+    profile = _ACTIVE.get(threading.get_ident())
+    if profile is None:
+        yield
+        return
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections.append((name, time.perf_counter() - began))
+
+
+# --------------------------------------------------
+# FLAMEGRAPH
+# --------------------------------------------------
+def _color(name: str) -> str:
+    digest = hashlib.md5(name.encode("utf-8")).digest()
+    return f"rgb({205 + digest[0] % 50},{80 + digest[1] % 130},{40 + digest[2] % 40})"
+
+
+def flamegraph_svg(profile: RunProfile, title: str = "") -> str:
+    """Render the collapsed stacks as a self-contained SVG flamegraph."""
+    root: Dict = {"name": "all", "value": 0, "children": {}}
+    for stack, count in profile.samples.items():
+        node = root
+        node["value"] += count
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+            node["value"] += count
+
+    total = max(root["value"], 1)
+    rects: List[str] = []
+    max_depth = 0
+
+    def draw(node: Dict, x: float, depth: int) -> None:
+        nonlocal max_depth
+        width = node["value"] / total * FLAME_WIDTH
+        if width < 0.5:
+            return
+        max_depth = max(max_depth, depth)
+        ms = node["value"] * profile.interval * 1000
+        label = html.escape(node["name"])
+        tooltip = f"{label} — {ms:.0f} ms ({node['value'] / total:.1%})"
+        rects.append(
+            f'<g><title>{tooltip}</title>'
+            f'<rect x="{x:.1f}" y="{{y{depth}}}" width="{width:.1f}" height="{FLAME_ROW - 1}" fill="{_color(node["name"])}" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{{t{depth}}}">{html.escape(node["name"][: int(width / 7)])}</text>' if width > 40 else "")
+            + "</g>"
+        )
+        child_x = x
+        for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+            draw(child, child_x, depth + 1)
+            child_x += child["value"] / total * FLAME_WIDTH
+
+    draw(root, 0.0, 0)
+    height = (max_depth + 1) * FLAME_ROW + 40
+    # Root at the bottom, callees stacked upwards
+    body = "".join(rects)
+    for depth in range(max_depth + 1):
+        y = height - 10 - (depth + 1) * FLAME_ROW
+        body = body.replace(f"{{y{depth}}}", str(y)).replace(f"{{t{depth}}}", str(y + 12))
+    heading = html.escape(title or f"{profile.page} — {profile.duration * 1000:.0f} ms, {profile.sample_count} samples")
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{FLAME_WIDTH}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<rect width="100%" height="100%" fill="#fdfdf6"/>'
+        f'<text x="{FLAME_WIDTH / 2}" y="18" text-anchor="middle" font-size="14">{heading}</text>'
+        f"{body}</svg>"
+    )
+
+
+# --------------------------------------------------
+# SIDEBAR
+# --------------------------------------------------
+def _sidebar(runs: List[RunProfile]) -> None:
+    with st.sidebar.expander("⏱️ Profiler", expanded=True):
+        if not runs:
+            st.caption("Profiling is on. Results for this run appear after the next rerun.")
+            return
+        labels = [
+            f"{time.strftime('%H:%M:%S', time.localtime(run.started))} · {run.page} · {run.duration * 1000:.0f} ms"
+            for run in runs
+        ]
+        index = st.selectbox("Run", range(len(runs)), index=len(runs) - 1, format_func=labels.__getitem__, key="hub_profile_run")
+        run = runs[index]
+
+        st.caption(f"{run.sample_count} samples every {run.interval * 1000:.0f} ms")
+        if run.sections:
+            accounted = sum(seconds for _, seconds in run.sections)
+            lines = [f"- **{name}**: {seconds * 1000:.0f} ms" for name, seconds in run.sections]
+            lines.append(f"- _rest of the run_: {max(run.duration - accounted, 0) * 1000:.0f} ms")
+            st.markdown("\n".join(lines))
+        hottest = run.hottest(5)
+        if hottest:
+            st.markdown("**Hottest (self time)**\n" + "\n".join(f"- `{name}` {ms:.0f} ms" for name, ms in hottest))
+
+        stem = f"profile_{run.page.rsplit('.', 1)[0]}_{int(run.started)}"
+        st.download_button("Collapsed stacks", run.collapsed(), file_name=f"{stem}.txt", mime="text/plain", use_container_width=True)
+        st.download_button(
+            "Flamegraph (SVG)",
+            lambda: flamegraph_svg(run),
+            file_name=f"{stem}.svg",
+            mime="image/svg+xml",
+            use_container_width=True,
+        )
+        if st.button("🔄 Refresh", key="hub_profile_refresh", use_container_width=True):
+            st.rerun()
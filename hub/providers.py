@@ -0,0 +1,266 @@
+"""
+Text-generation providers behind hub.llm.
+
+Each adapter turns a prompt plus Gemini-style settings into one call on
+its SDK and returns an object the pages can treat like a Gemini response
+(`.text`, `.usage_metadata`). Gemini is always available; the others
+become available when their API key is set (Streamlit secrets or the
+environment) and their SDK imports. hub.routing decides the order in
+which they are tried for each tool.
+
+Only text prompts can leave Gemini: uploaded files and streams stay on it.
+"""
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+# Model per routing tier ("fast", "heavy") for each provider
+MODELS: Dict[str, Dict[str, str]] = {
+    "openai": {"fast": "gpt-4.1-mini", "heavy": "gpt-4.1"},
+    "anthropic": {"fast": "claude-3-5-haiku-latest", "heavy": "claude-sonnet-4-5"},
+    "groq": {"fast": "llama-3.1-8b-instant", "heavy": "llama-3.3-70b-versatile"},
+    "mistral": {"fast": "mistral-small-latest", "heavy": "mistral-large-latest"},
+    "fake": {"fast": "fake-fast", "heavy": "fake-heavy"},
+}
+# Model-name prefixes, to find the provider of a pinned model
+PREFIXES = {
+    "gemini": "gemini",
+    "gpt": "openai",
+    "o1": "openai",
+    "o3": "openai",
+    "o4": "openai",
+    "claude": "anthropic",
+    "llama": "groq",
+    "mistral": "mistral",
+    "fake": "fake",
+}
+MAX_OUTPUT_TOKENS = 8192
+
+
+def _secret(name: str) -> Optional[str]:
+    try:
+        value = st.secrets.get(name)
+    except (FileNotFoundError, KeyError):
+        value = None
+    return value or os.environ.get(name) or None
+
+
+@dataclass
+class Usage:
+    prompt_token_count: int = 0
+    candidates_token_count: int = 0
+
+
+@dataclass
+class Completion:
+    """The parts of a Gemini response the pages and metrics use."""
+
+    text: str
+    usage_metadata: Usage
+    provider: str = ""
+
+
+def _settings(model_kwargs: Dict[str, Any], call_kwargs: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """System instruction and generation settings from Gemini-style kwargs."""
+    config = call_kwargs.get("generation_config") or model_kwargs.get("generation_config") or {}
+    if not isinstance(config, dict):
+        config = {k: getattr(config, k) for k in ("temperature", "max_output_tokens", "response_mime_type") if getattr(config, k, None) is not None}
+    system = model_kwargs.get("system_instruction")
+    return (str(system) if system else None), config
+
+
+def _prompt(contents: Any) -> str:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    return "\n\n".join(parts)
+
+
+# --------------------------------------------------
+# ADAPTERS
+# --------------------------------------------------
+class Provider:
+    name = ""
+    key_name: Optional[str] = None
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        if self.key_name is None:
+            return True
+        if self._client is not None:
+            return True
+        try:
+            self._import()
+        except ImportError:
+            return False
+        return _secret(self.key_name) is not None
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._import()(api_key=_secret(self.key_name))
+            return self._client
+
+    def _import(self):
+        raise NotImplementedError
+
+    def generate(self, model: str, contents: Any, model_kwargs: Dict[str, Any], call_kwargs: Dict[str, Any], stream: bool = False):
+        raise NotImplementedError
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        # Imported on first use like the other SDKs: pages that only read
+        # routing stats (Metrics) should not pay for loading it
+        import google.generativeai as genai
+        return genai.GenerativeModel(model, **model_kwargs).generate_content(contents, stream=stream, **call_kwargs)
+
+
+class OpenAIProvider(Provider):
+    """OpenAI chat completions; Groq's SDK has the same shape."""
+
+    name = "openai"
+    key_name = "OPENAI_API_KEY"
+
+    def _import(self):
+        from openai import OpenAI
+        return OpenAI
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        system, config = _settings(model_kwargs, call_kwargs)
+        messages = ([{"role": "system", "content": system}] if system else []) + [
+            {"role": "user", "content": _prompt(contents)}
+        ]
+        options: Dict[str, Any] = {"max_tokens": config.get("max_output_tokens", MAX_OUTPUT_TOKENS)}
+        if "temperature" in config:
+            options["temperature"] = config["temperature"]
+        if config.get("response_mime_type") == "application/json":
+            options["response_format"] = {"type": "json_object"}
+        response = self.client().chat.completions.create(model=model, messages=messages, **options)
+        usage = response.usage
+        return Completion(
+            response.choices[0].message.content or "",
+            Usage(getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0)),
+            self.name,
+        )
+
+
+class GroqProvider(OpenAIProvider):
+    name = "groq"
+    key_name = "GROQ_API_KEY"
+
+    def _import(self):
+        from groq import Groq
+        return Groq
+
+
+class AnthropicProvider(Provider):
+    name = "anthropic"
+    key_name = "ANTHROPIC_API_KEY"
+
+    def _import(self):
+        from anthropic import Anthropic
+        return Anthropic
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        system, config = _settings(model_kwargs, call_kwargs)
+        options: Dict[str, Any] = {"max_tokens": config.get("max_output_tokens", MAX_OUTPUT_TOKENS)}
+        if system:
+            options["system"] = system
+        if "temperature" in config:
+            options["temperature"] = config["temperature"]
+        response = self.client().messages.create(
+            model=model, messages=[{"role": "user", "content": _prompt(contents)}], **options
+        )
+        text = "".join(block.text for block in response.content if getattr(block, "type", "") == "text")
+        return Completion(text, Usage(response.usage.input_tokens, response.usage.output_tokens), self.name)
+
+
+class MistralProvider(Provider):
+    name = "mistral"
+    key_name = "MISTRAL_API_KEY"
+
+    def _import(self):
+        try:
+            from mistralai import Mistral
+        except ImportError:
+            from mistralai.client import Mistral
+        return Mistral
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        system, config = _settings(model_kwargs, call_kwargs)
+        messages = ([{"role": "system", "content": system}] if system else []) + [
+            {"role": "user", "content": _prompt(contents)}
+        ]
+        options: Dict[str, Any] = {"max_tokens": config.get("max_output_tokens", MAX_OUTPUT_TOKENS)}
+        if "temperature" in config:
+            options["temperature"] = config["temperature"]
+        if config.get("response_mime_type") == "application/json":
+            options["response_format"] = {"type": "json_object"}
+        response = self.client().chat.complete(model=model, messages=messages, **options)
+        usage = response.usage
+        return Completion(
+            response.choices[0].message.content or "",
+            Usage(usage.prompt_tokens or 0, usage.completion_tokens or 0),
+            self.name,
+        )
+
+
+class FakeProvider(Provider):
+    """
+    Local stand-in for tests and demos, used only when listed explicitly
+    (HUB_PROVIDERS=fake,...). HUB_FAKE_LATENCY, HUB_FAKE_ERROR_RATE and
+    HUB_FAKE_REPLY shape its behaviour.
+    """
+
+    name = "fake"
+
+    def available(self) -> bool:
+        return True
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        time.sleep(float(os.environ.get("HUB_FAKE_LATENCY", "0.05")))
+        if random.random() < float(os.environ.get("HUB_FAKE_ERROR_RATE", "0")):
+            raise RuntimeError("503 Service Unavailable (fake provider)")
+        prompt = _prompt(contents)
+        text = os.environ.get("HUB_FAKE_REPLY") or f"Fake {model} reply to: {prompt[:80]}"
+        return Completion(text, Usage(len(prompt) // 4, len(text) // 4), self.name)
+
+
+PROVIDERS: Dict[str, Provider] = {
+    provider.name: provider
+    for provider in (
+        GeminiProvider(), OpenAIProvider(), AnthropicProvider(), GroqProvider(), MistralProvider(), FakeProvider()
+    )
+}
+
+
+def get(name: str) -> Provider:
+    return PROVIDERS[name]
+
+
+def provider_for_model(model: str) -> str:
+    for prefix, provider in PREFIXES.items():
+        if model.startswith(prefix):
+            return provider
+    return "gemini"
+
+
+def model_for(provider: str, tier: str) -> str:
+    return MODELS[provider][tier]
+
+
+def available() -> List[str]:
+    return [name for name, provider in PROVIDERS.items() if name != "fake" and provider.available()]
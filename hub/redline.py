@@ -0,0 +1,65 @@
+"""
+Clause-level diffs between versions of the same document.
+
+Clauses are compared by a hash of their normalized text (case, spacing,
+quote style and leading clause numbers ignored), so renumbering after an
+insertion does not count as a change. `diff_clauses` lines two versions up
+and `redline_html` marks word-level edits inside a changed clause.
+"""
+import difflib
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+EQUAL, CHANGED, ADDED, REMOVED = "unchanged", "changed", "added", "removed"
+
+_NUMBERING = re.compile(r"^\s*(?:(?:section|article|clause)\s+)?[\dIVXivx]+(?:\.\d+)*[.)]?\s+", re.IGNORECASE)
+_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'", "–": "-", "—": "-"})
+_TOKENS = re.compile(r"\s+|[^\s]+")
+
+
+def normalize_clause(text: str) -> str:
+    text = _NUMBERING.sub("", text.translate(_QUOTES))
+    return " ".join(text.lower().split())
+
+
+def clause_key(text: str) -> str:
+    return hashlib.sha256(normalize_clause(text).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Change:
+    status: str
+    old: Optional[int]          # index in the previous version
+    new: Optional[int]          # index in the new version
+
+
+def diff_clauses(old: List[str], new: List[str]) -> List[Change]:
+    """Align two clause lists; replaced runs are paired in order, leftovers are added/removed."""
+    matcher = difflib.SequenceMatcher(None, [clause_key(c) for c in old], [clause_key(c) for c in new], autojunk=False)
+    changes: List[Change] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            changes.extend(Change(EQUAL, i, j) for i, j in zip(range(i1, i2), range(j1, j2)))
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        changes.extend(Change(CHANGED, i1 + k, j1 + k) for k in range(paired))
+        changes.extend(Change(REMOVED, i, None) for i in range(i1 + paired, i2))
+        changes.extend(Change(ADDED, None, j) for j in range(j1 + paired, j2))
+    return changes
+
+
+def redline_html(old: str, new: str) -> str:
+    """`new` with word-level deletions struck through and insertions underlined."""
+    a, b = _TOKENS.findall(old), _TOKENS.findall(new)
+    out = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag in ("replace", "delete"):
+            out.append(f'<del style="color:#c0392b">{html.escape("".join(a[i1:i2]))}</del>')
+        if tag in ("replace", "insert"):
+            out.append(f'<ins style="color:#27ae60">{html.escape("".join(b[j1:j2]))}</ins>')
+        if tag == "equal":
+            out.append(html.escape("".join(b[j1:j2])))
+    return '<div style="white-space:pre-wrap">' + "".join(out) + "</div>"
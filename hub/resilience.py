@@ -0,0 +1,337 @@
+"""
+Deadlines, retries, hedging and circuit breaking for model calls.
+
+`call(tool, model, fn)` runs one logical request and may invoke `fn`
+several times:
+
+- the whole request, retries included, must finish within the tool's
+  deadline, otherwise `CallTimeout` is raised (a stalled attempt keeps
+  running in the background but its answer is dropped);
+- retryable failures (429, 5xx, connection errors) are retried with
+  full-jitter exponential backoff;
+- if an attempt is still running after the recent p95 latency of the
+  same (tool, op) (from hub.metrics), one duplicate "hedge" attempt is
+  started and the first success wins; long generations (a slow p95 or a
+  large prompt) are never hedged, since duplicating them only doubles
+  the most expensive work;
+- each model has a circuit breaker that opens when most recent requests
+  failed even after retries, fails fast while open, and lets a single
+  probe through after a cooldown.
+
+The exceptions raised here carry messages meant for end users, since the
+pages show `str(e)` in their error boxes.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from google.api_core import exceptions as google_exceptions
+
+from hub import metrics
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+@dataclass(frozen=True)
+class Policy:
+    deadline: float = 60.0          # seconds for the whole request
+    attempts: int = 3
+    backoff: float = 0.5            # first retry waits up to this long
+    max_backoff: float = 8.0
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    hedge_min_delay: float = 2.0    # never hedge sooner than this
+    hedge_min_samples: int = 20     # recent calls needed before trusting the quantile
+    hedge_max_delay: float = 20.0   # ops whose quantile is slower than this are not hedged
+    hedge_max_bytes: int = 32_000   # nor are requests with prompts larger than this
+
+
+DEFAULT_POLICY = Policy()
+
+# Long documents and image uploads get more time and are not duplicated;
+# short interactive prompts should fail (and retry) fast.
+TOOL_POLICIES: Dict[str, Policy] = {
+    "clearpact": Policy(deadline=180.0, hedge=False),
+    "summarily": Policy(deadline=180.0, hedge=False),
+    "chartexpo": Policy(deadline=120.0, hedge=False),
+    "person8": Policy(deadline=180.0, hedge=False),
+    "game": Policy(deadline=30.0),
+    "ghostly": Policy(deadline=30.0),
+    "killshot": Policy(deadline=30.0),
+    "tonebridge": Policy(deadline=30.0),
+    "contramind": Policy(deadline=120.0, hedge=False),
+    "echomind": Policy(deadline=180.0, hedge=False),
+}
+
+# Call sites whose size differs from the rest of their tool
+OP_POLICIES: Dict[Tuple[str, str], Policy] = {
+    ("affili8", "variants"): Policy(deadline=180.0, hedge=False),
+    ("affili8", "batch"): Policy(deadline=90.0, hedge=False),
+    ("contramind", "pairs"): Policy(deadline=90.0),
+    ("echomind", "period"): Policy(deadline=90.0),
+}
+
+HEDGING = os.environ.get("HUB_HEDGE", "1") != "0"
+WORKERS = int(os.environ.get("HUB_CALL_WORKERS", "32"))
+
+BREAKER_THRESHOLD = 5       # failed requests ...
+BREAKER_RATIO = 0.5         # ... making up at least this share of requests ...
+BREAKER_WINDOW = 30.0       # ... within this many seconds open the circuit
+BREAKER_COOLDOWN = 20.0     # seconds before a probe is let through
+
+RETRYABLE_STATUS = ("429", "500", "502", "503", "504")
+RETRYABLE_CODES = (408, 429, 500, 502, 503, 504, 529)
+
+
+def policy_for(tool: str, op: str = "generate") -> Policy:
+    """The (tool, op) policy, else the tool's; HUB_DEADLINE_<TOOL>_<OP> or HUB_DEADLINE_<TOOL> override its deadline."""
+    policy = OP_POLICIES.get((tool, op)) or TOOL_POLICIES.get(tool, DEFAULT_POLICY)
+    override = os.environ.get(f"HUB_DEADLINE_{tool}_{op}".upper()) or os.environ.get(f"HUB_DEADLINE_{tool.upper()}")
+    if override:
+        policy = replace(policy, deadline=float(override))
+    if not HEDGING:
+        policy = replace(policy, hedge=False)
+    return policy
+
+
+# --------------------------------------------------
+# ERRORS
+# --------------------------------------------------
+class ResilienceError(Exception):
+    """Base for failures decided by this layer rather than by the provider."""
+
+
+class CallTimeout(ResilienceError, TimeoutError):
+    pass
+
+
+class CircuitOpen(ResilienceError):
+    pass
+
+
+class RetriesExhausted(ResilienceError):
+    pass
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, ResilienceError):
+        return False
+    if isinstance(exc, (google_exceptions.ServerError, google_exceptions.TooManyRequests)):
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # OpenAI, Anthropic, Groq and Mistral SDK errors
+    if getattr(exc, "status_code", None) in RETRYABLE_CODES:
+        return True
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    text = str(exc).lower()
+    return text.startswith(RETRYABLE_STATUS) or "unavailable" in text or "overloaded" in text
+
+
+# --------------------------------------------------
+# CIRCUIT BREAKER
+# --------------------------------------------------
+class CircuitBreaker:
+    """Judges whole requests (after retries), so a flaky-but-working provider stays usable."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, name: str, threshold: int = BREAKER_THRESHOLD, ratio: float = BREAKER_RATIO,
+                 window: float = BREAKER_WINDOW, cooldown: float = BREAKER_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.ratio = ratio
+        self.window = window
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probing = False
+        self.state = self.CLOSED
+
+    @property
+    def recent_failures(self) -> int:
+        return sum(1 for _, ok in self._outcomes if not ok)
+
+    def allow(self, tool: str = "") -> None:
+        """Raise CircuitOpen unless a request may go through now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == self.OPEN and waited >= self.cooldown:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(self.cooldown - waited, 1)
+        metrics.record_event("circuit_rejected", tool)
+        raise CircuitOpen(
+            f"The AI service ({self.name}) is failing right now, so requests are paused. "
+            f"Please try again in about {retry_in:.0f}s."
+        )
+
+    def success(self) -> None:
+        with self._lock:
+            self._probing = False
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._record(True)
+
+    def failure(self, tool: str = "") -> None:
+        with self._lock:
+            self._probing = False
+            if self.state == self.OPEN:
+                return
+            if self.state == self.CLOSED:
+                self._record(False)
+                failures = self.recent_failures
+                if failures < self.threshold or failures < self.ratio * len(self._outcomes):
+                    return
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._outcomes.clear()
+        metrics.record_event("circuit_opened", tool)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without judging the provider."""
+        with self._lock:
+            self._probing = False
+
+    def _record(self, ok: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(model)
+        return breaker
+
+
+def breaker_states() -> List[Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [
+        {"model": b.name, "state": b.state, "recent_failures": b.recent_failures}
+        for b in breakers
+    ]
+
+
+# --------------------------------------------------
+# CALLS
+# --------------------------------------------------
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="hub-call")
+
+
+def _hedge_delay(tool: str, op: str, model: str, policy: Policy, size: int = 0) -> Optional[float]:
+    if not policy.hedge or size > policy.hedge_max_bytes:
+        return None
+    quantile = metrics.REGISTRY.latency_quantile(
+        tool, model, policy.hedge_quantile, min_samples=policy.hedge_min_samples, op=op
+    )
+    if quantile is None or quantile > policy.hedge_max_delay:
+        return None
+    return max(quantile, policy.hedge_min_delay)
+
+
+def _attempt(
+    tool: str, model: str, fn: Callable[[], Any], policy: Policy, deadline: float, op: str = "generate", size: int = 0
+) -> Any:
+    """One try, plus at most one hedge; first success wins."""
+    started = time.monotonic()
+    hedge_at = _hedge_delay(tool, op, model, policy, size)
+    first = _executor.submit(fn)
+    pending: Set[Future] = {first}
+    error: Optional[BaseException] = None
+    while True:
+        now = time.monotonic()
+        remaining = deadline - now
+        if remaining <= 0:
+            metrics.record_event("deadline", tool)
+            raise CallTimeout(
+                f"The AI service did not answer within {policy.deadline:g}s. Please try again."
+            )
+        timeout = remaining
+        if hedge_at is not None:
+            timeout = min(timeout, max(started + hedge_at - now, 0))
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is not first:
+                    metrics.record_event("hedge_won", tool)
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        if hedge_at is not None and time.monotonic() - started >= hedge_at:
+            metrics.record_event("hedge", tool)
+            pending.add(_executor.submit(fn))
+            hedge_at = None
+
+
+def call(
+    tool: str,
+    model: str,
+    fn: Callable[[], Any],
+    hedge: bool = True,
+    deadline: Optional[float] = None,
+    op: str = "generate",
+    size: int = 0,
+) -> Any:
+    """
+    Run `fn` (one provider request) under the (tool, op) policy; `deadline` (s)
+    overrides it and `size` (prompt bytes) can rule out hedging.
+    """
+    policy = policy_for(tool, op)
+    if not hedge:
+        policy = replace(policy, hedge=False)
+    if deadline is not None:
+        policy = replace(policy, deadline=deadline)
+    breaker = breaker_for(model)
+    deadline = time.monotonic() + policy.deadline
+    last: Optional[BaseException] = None
+
+    breaker.allow(tool)
+    for attempt in range(1, policy.attempts + 1):
+        try:
+            result = _attempt(tool, model, fn, policy, deadline, op, size)
+        except CallTimeout:
+            breaker.failure(tool)
+            raise
+        except Exception as exc:
+            if not is_retryable(exc):
+                breaker.release()
+                raise
+            last = exc
+        else:
+            breaker.success()
+            return result
+
+        delay = random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** (attempt - 1)))
+        if attempt == policy.attempts or time.monotonic() + delay >= deadline:
+            break
+        metrics.record_event("retry", tool)
+        time.sleep(delay)
+
+    breaker.failure(tool)
+    raise RetriesExhausted(
+        f"The AI service is temporarily unavailable ({last}). Please try again in a moment."
+    ) from last
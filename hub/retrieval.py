@@ -0,0 +1,152 @@
+"""
+Local retrieval over one long document.
+
+Follow-up questions about a contract or report should not resend the whole
+text. `build_index(text)` splits it once into section-sized chunks and
+keeps a BM25 index over them; `index.search(question)` returns the few
+chunks worth sending with the question. Pure Python, so no extra
+dependency, and fast enough for documents of a few hundred pages.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import streamlit as st
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+CHUNK_CHARS = 1500
+TOP_K = 4
+BM25_K1 = 1.5
+BM25_B = 0.75
+STEM_CHARS = 7             # truncation stemming: "indemnities", "indemnify" -> "indemni"
+MERGE_CHARS = 120          # pieces shorter than this join the previous chunk
+
+# Lines that start a new clause: "12.", "3.1", "Section 4", "ARTICLE V", "## Term", "SCHEDULE A"
+_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s|\d+[A-Za-z]?(?:\.\d+)*[.)]?\s|(?:section|article|clause|schedule|annex|exhibit)\s+[\w.]+|[A-Z][A-Z0-9 ,&'-]{3,60}$)",
+    re.IGNORECASE,
+)
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ed", "es", "s")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in into is it its may me my "
+    "of on or our shall should so that the their them there these this those to under up us was "
+    "we what when where which who will with would you your".split()
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[: -len(suffix)]
+            break
+    return word[:STEM_CHARS]
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+@dataclass
+class Chunk:
+    number: int
+    title: str
+    text: str
+
+
+# --------------------------------------------------
+# CHUNKING
+# --------------------------------------------------
+def _bare_heading(lines: List[str]) -> bool:
+    """A section so far made of just a title line ("3. Termination"), which belongs with what follows."""
+    filled = [l.strip() for l in lines if l.strip()]
+    return len(filled) == 1 and len(filled[0]) < 80 and not filled[0].endswith((".", ";"))
+
+
+def split_sections(text: str, max_chars: int = CHUNK_CHARS, merge: bool = True) -> List[Chunk]:
+    """
+    Clause-aligned chunks: split at headings, then cut to `max_chars`.
+    With `merge`, one-liners are folded into the previous chunk; turn it off
+    when chunk boundaries must stay stable between versions of a document.
+    """
+    sections: List[List[str]] = [[]]
+    for line in text.splitlines():
+        if _HEADING.match(line) and any(l.strip() for l in sections[-1]) and not _bare_heading(sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+
+    pieces: List[Tuple[str, str]] = []
+    for lines in sections:
+        body = "\n".join(lines).strip()
+        if not body:
+            continue
+        title = body.splitlines()[0][:80].strip()
+        part = 0
+        while len(body) > max_chars:
+            cut = body.rfind("\n", 0, max_chars)
+            if cut < max_chars // 2:
+                cut = body.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append((title if not part else f"{title} (cont.)", body[:cut].strip()))
+            body = body[cut:].strip()
+            part += 1
+        if body:
+            pieces.append((title if not part else f"{title} (cont.)", body))
+
+    # Fold one-liners (signature blocks, stray headings) into their neighbour
+    merged: List[Tuple[str, str]] = []
+    for title, body in pieces:
+        if merge and merged and len(body) < MERGE_CHARS and len(merged[-1][1]) + len(body) <= max_chars:
+            merged[-1] = (merged[-1][0], f"{merged[-1][1]}\n{body}")
+        else:
+            merged.append((title, body))
+    return [Chunk(i, title, body) for i, (title, body) in enumerate(merged, start=1)]
+
+
+# --------------------------------------------------
+# INDEX
+# --------------------------------------------------
+class Index:
+    def __init__(self, chunks: List[Chunk]):
+        self.chunks = chunks
+        self._terms = [Counter(tokenize(c.text)) for c in chunks]
+        self._lengths = [sum(t.values()) for t in self._terms]
+        self._avg_length = (sum(self._lengths) / len(chunks)) if chunks else 0.0
+        df: Counter = Counter()
+        for terms in self._terms:
+            df.update(terms.keys())
+        n = len(chunks)
+        self._idf: Dict[str, float] = {t: math.log(1 + (n - f + 0.5) / (f + 0.5)) for t, f in df.items()}
+
+    @property
+    def chars(self) -> int:
+        return sum(len(c.text) for c in self.chunks)
+
+    def search(self, query: str, k: int = TOP_K) -> List[Tuple[float, Chunk]]:
+        """Best `k` chunks by BM25, in document order; the opening chunks if nothing matches."""
+        query_terms = set(tokenize(query))
+        scored = []
+        for chunk, terms, length in zip(self.chunks, self._terms, self._lengths):
+            score = 0.0
+            for term in query_terms & terms.keys():
+                tf = terms[term]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._avg_length or 1))
+                score += self._idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            if score > 0:
+                scored.append((score, chunk))
+        if not scored:
+            return [(0.0, chunk) for chunk in self.chunks[:k]]
+        best = sorted(scored, key=lambda pair: -pair[0])[:k]
+        return sorted(best, key=lambda pair: pair[1].number)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_index(text: str) -> Index:
+    """Index for `text`, built once per distinct document and shared across sessions."""
+    return Index(split_sections(text))
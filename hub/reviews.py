@@ -0,0 +1,80 @@
+"""
+Cache of per-clause contract reviews, in SQLite.
+
+ClearPact reviews each clause once and reuses the review for every later
+version or contract containing the same clause text. Reviews are small
+JSON records with very different churn from images, so they live in
+their own table with their own size cap instead of the artifact store,
+where image traffic would evict them. The least recently used reviews are
+dropped once the cap is reached.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import streamlit as st
+
+from hub.jobs import JOB_DB_PATH
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+REVIEW_DB_PATH = os.environ.get("HUB_REVIEW_DB", os.path.join(os.path.dirname(JOB_DB_PATH), "reviews.sqlite3"))
+MAX_REVIEWS = int(os.environ.get("HUB_REVIEW_MAX_ROWS", "50000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    key TEXT PRIMARY KEY,
+    review TEXT NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_used ON reviews (used);
+"""
+
+
+class ReviewStore:
+    def __init__(self, db_path: str = REVIEW_DB_PATH, max_rows: int = MAX_REVIEWS):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The stored review, refreshing its LRU position."""
+        with self._lock:
+            row = self._conn.execute("SELECT review FROM reviews WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE reviews SET used=? WHERE key=?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, review: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reviews (key, review, used) VALUES (?, ?, ?)",
+                (key, json.dumps(review), time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()
+            if count > self.max_rows:
+                self._conn.execute(
+                    "DELETE FROM reviews WHERE key IN (SELECT key FROM reviews ORDER BY used LIMIT ?)",
+                    (count - self.max_rows,),
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+
+@st.cache_resource
+def get_store() -> ReviewStore:
+    """The process-wide review cache shared by every session."""
+    return ReviewStore()
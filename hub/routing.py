@@ -0,0 +1,173 @@
+"""
+Model routing between a fast and a heavy Gemini tier.
+
+Each tool (and optionally each call site within it) is mapped to a tier.
+The fast tier serves short, structured or interactive prompts and picks
+whichever of its models currently answers fastest for that tool, using
+median latency from hub.metrics, penalised by the recent error rate. The
+heavy tier serves long-form generation and keeps to its first model
+unless that one is unhealthy. Models whose circuit breaker is open are
+skipped in both tiers.
+
+Pin a tool or call site with HUB_MODEL_<TOOL> or HUB_MODEL_<TOOL>_<OP>,
+set to a model name or to a tier name ("fast", "heavy").
+
+`plan()` extends this across providers: it lists the (provider, model)
+pairs to try in order for a call, following the tool's provider
+preference and keeping only configured providers. Fast-tier tools try
+Groq first when it is configured. Override the order with
+HUB_PROVIDERS_<TOOL> or HUB_PROVIDERS, e.g. "gemini,openai".
+"""
+import os
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from hub import metrics, providers, resilience
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+@dataclass(frozen=True)
+class Tier:
+    models: Tuple[str, ...]
+    fastest: bool                   # pick by latency, or first healthy model
+
+
+TIERS: Dict[str, Tier] = {
+    "fast": Tier(("gemini-2.5-flash-lite", "gemini-2.5-flash"), fastest=True),
+    "heavy": Tier(("gemini-2.5-flash", "gemini-2.5-pro"), fastest=False),
+}
+DEFAULT_TIER = "heavy"
+
+# Tool, or (tool, op) for a single call site
+ROUTES: Dict[object, str] = {
+    "affili8": "fast",
+    "assistforge": "fast",
+    "failforward": "fast",
+    "game": "fast",
+    "ghostly": "fast",
+    "killshot": "fast",
+    "regretfix": "fast",
+    "retromirror": "fast",
+    "tonebridge": "fast",
+    "verdict": "fast",
+    "bubblescope": "heavy",
+    "chartexpo": "heavy",
+    "clearpact": "heavy",
+    ("clearpact", "qa"): "fast",
+    "contramind": "heavy",
+    ("contramind", "pairs"): "fast",
+    "echomind": "heavy",
+    ("echomind", "period"): "fast",
+    "person8": "heavy",
+    ("person8", "planner"): "fast",
+    "skillguard": "heavy",
+    "summarily": "heavy",
+    "survy": "heavy",
+}
+
+# Expected median latency (s), blended with observations as PRIOR_WEIGHT calls
+PRIOR_LATENCY = {
+    "gemini-2.5-flash-lite": 1.0,
+    "gemini-2.5-flash": 2.5,
+    "gemini-2.5-pro": 8.0,
+}
+PRIOR_WEIGHT = 3
+# Provider order per tier; only configured providers are used
+PROVIDER_ORDER: Dict[str, Tuple[str, ...]] = {
+    "fast": ("groq", "gemini", "openai", "anthropic", "mistral"),
+    "heavy": ("gemini", "anthropic", "openai", "mistral", "groq"),
+}
+# Per-tool exceptions to the tier's order
+PROVIDER_PREFERENCES: Dict[str, Tuple[str, ...]] = {}
+
+MIN_SAMPLES = 10            # calls before an error rate can mark a model unhealthy
+ERROR_PENALTY = 5.0         # latency multiplier per unit of error rate
+UNHEALTHY_ERROR_RATE = 0.3
+EXPLORE_RATE = 0.05         # share of fast-tier calls sent to a random model
+
+
+def _pin(tool: str, op: str) -> Optional[str]:
+    for name in (f"HUB_MODEL_{tool}_{op}", f"HUB_MODEL_{tool}"):
+        value = os.environ.get(name.upper())
+        if value:
+            return value
+    return None
+
+
+def tier_for(tool: str, op: str = "generate") -> str:
+    return ROUTES.get((tool, op)) or ROUTES.get(tool) or DEFAULT_TIER
+
+
+def _usable(model: str) -> bool:
+    return resilience.breaker_for(model).state != resilience.CircuitBreaker.OPEN
+
+
+def _expected_latency(tool: str, model: str) -> float:
+    median, error_rate, calls = metrics.REGISTRY.model_health(model, tool)
+    prior = PRIOR_LATENCY.get(model, 5.0)
+    if median is not None:
+        prior = (PRIOR_WEIGHT * prior + calls * median) / (PRIOR_WEIGHT + calls)
+    return prior * (1 + ERROR_PENALTY * error_rate)
+
+
+def _healthy(model: str) -> bool:
+    _, error_rate, calls = metrics.REGISTRY.model_health(model)
+    return _usable(model) and (calls < MIN_SAMPLES or error_rate < UNHEALTHY_ERROR_RATE)
+
+
+def choose(tool: str, op: str = "generate", explore: bool = True) -> str:
+    """Model to use for this call."""
+    pinned = _pin(tool, op)
+    if pinned and pinned not in TIERS:
+        return pinned
+    tier = TIERS[pinned or tier_for(tool, op)]
+
+    candidates: List[str] = [m for m in tier.models if _usable(m)] or list(tier.models)
+    if not tier.fastest:
+        return next((m for m in candidates if _healthy(m)), candidates[0])
+    if explore and len(candidates) > 1 and random.random() < EXPLORE_RATE:
+        return random.choice(candidates)
+    return min(candidates, key=lambda m: _expected_latency(tool, m))
+
+
+def provider_order(tool: str, tier: str) -> List[str]:
+    raw = os.environ.get(f"HUB_PROVIDERS_{tool.upper()}") or os.environ.get("HUB_PROVIDERS")
+    order = [name.strip() for name in raw.split(",")] if raw else PROVIDER_PREFERENCES.get(tool) or PROVIDER_ORDER[tier]
+    return [name for name in order if name in providers.PROVIDERS and providers.get(name).available()] or ["gemini"]
+
+
+def plan(tool: str, op: str = "generate", text_only: bool = True, pinned: Optional[str] = None) -> List[Tuple[str, str]]:
+    """(provider, model) pairs to try in order for one call."""
+    pinned = pinned or _pin(tool, op)
+    if pinned and pinned not in TIERS:
+        return [(providers.provider_for_model(pinned), pinned)]
+    tier = pinned or tier_for(tool, op)
+    if not text_only:
+        return [("gemini", choose(tool, op))]
+
+    steps = []
+    for name in provider_order(tool, tier):
+        model = choose(tool, op) if name == "gemini" else providers.model_for(name, tier)
+        steps.append((name, model))
+    # Providers that are failing right now go last rather than first
+    return sorted(steps, key=lambda step: not _usable(step[1]))
+
+
+def snapshot() -> List[Dict[str, object]]:
+    """Current routing decision per tool, for the Metrics page."""
+    rows = []
+    for route, tier in ROUTES.items():
+        if not isinstance(route, str):
+            continue
+        pinned = _pin(route, "generate")
+        rows.append({
+            "tool": route,
+            "tier": pinned if pinned in TIERS else tier,
+            "pinned": bool(pinned),
+            "model": choose(route, explore=False),
+            "providers": " → ".join(f"{name}:{model}" for name, model in plan(route)),
+        })
+    return rows
@@ -0,0 +1,204 @@
+"""
+Schema-constrained JSON generation.
+
+`generate_json(model, prompt, Riddle)` asks for `application/json` with a
+response schema derived from the dataclass, then turns the reply into a
+validated `Riddle`:
+
+1. parse it as JSON;
+2. if that fails, repair locally: strip ``` fences and surrounding prose,
+   drop trailing commas, accept Python-style single quotes;
+3. build the dataclass, coercing "7" to 7 and similar; its `__post_init__`
+   can reject values that parse but make no sense (an answer that is not
+   among the options);
+4. only if all of that fails, re-ask once with the validation error.
+
+Supported field types: str, int, float, bool, List[...] of those, and
+nested dataclasses.
+"""
+import ast
+import dataclasses
+import json
+import re
+import typing
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from hub import metrics
+
+T = TypeVar("T")
+
+REASKS = 1
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+# --------------------------------------------------
+# SCHEMA
+# --------------------------------------------------
+def _type_schema(tp: Any) -> Dict[str, Any]:
+    if dataclasses.is_dataclass(tp):
+        return schema_for(tp)
+    if typing.get_origin(tp) in (list, List):
+        (item,) = typing.get_args(tp) or (str,)
+        return {"type": "array", "items": _type_schema(item)}
+    return {"type": _JSON_TYPES[tp]}
+
+
+def schema_for(cls: type) -> Dict[str, Any]:
+    """Gemini response_schema (OpenAPI subset) for a dataclass."""
+    hints = typing.get_type_hints(cls)
+    fields = dataclasses.fields(cls)
+    return {
+        "type": "object",
+        "properties": {f.name: _type_schema(hints[f.name]) for f in fields},
+        "required": [
+            f.name for f in fields
+            if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING
+        ],
+    }
+
+
+# --------------------------------------------------
+# PARSING
+# --------------------------------------------------
+def _outermost_json(text: str) -> Optional[str]:
+    """The first balanced {...} or [...] block in `text`."""
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    start = min(starts)
+    opener = text[start]
+    closer = "}" if opener == "{" else "]"
+    depth, in_string, escaped = 0, False, False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return None
+
+
+def parse_loose(text: Optional[str]) -> Tuple[Any, bool]:
+    """json.loads, falling back to the local repairs; also says whether a repair was needed."""
+    if not text:
+        raise StructuredOutputError("empty reply")
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    candidate = text.strip()
+    fenced = _FENCE.search(candidate)
+    if fenced:
+        candidate = fenced.group(1).strip()
+    candidate = _outermost_json(candidate) or candidate
+    candidate = _TRAILING_COMMA.sub(r"\1", candidate)
+    try:
+        return json.loads(candidate), True
+    except ValueError:
+        pass
+    try:
+        value = ast.literal_eval(candidate)
+    except (ValueError, SyntaxError):
+        raise StructuredOutputError(f"reply is not JSON: {text[:120]!r}") from None
+    if not isinstance(value, (dict, list)):
+        raise StructuredOutputError(f"reply is not a JSON object: {text[:120]!r}")
+    return value, True
+
+
+# --------------------------------------------------
+# VALIDATION
+# --------------------------------------------------
+def _coerce(value: Any, tp: Any, path: str) -> Any:
+    if dataclasses.is_dataclass(tp):
+        return build(tp, value, path)
+    if typing.get_origin(tp) in (list, List):
+        (item,) = typing.get_args(tp) or (str,)
+        if not isinstance(value, list):
+            raise StructuredOutputError(f"{path}: expected a list")
+        return [_coerce(v, item, f"{path}[{i}]") for i, v in enumerate(value)]
+    if tp is bool:
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if not isinstance(value, bool):
+            raise StructuredOutputError(f"{path}: expected true/false")
+        return value
+    if tp in (int, float):
+        if isinstance(value, bool):
+            raise StructuredOutputError(f"{path}: expected a number")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise StructuredOutputError(f"{path}: expected a number, got {value!r}") from None
+        if tp is int:
+            if number != int(number):
+                raise StructuredOutputError(f"{path}: expected a whole number, got {value!r}")
+            return int(number)
+        return number
+    if tp is str:
+        if isinstance(value, (dict, list)) or value is None:
+            raise StructuredOutputError(f"{path}: expected text")
+        return str(value)
+    return value
+
+
+def build(cls: Type[T], data: Any, path: str = "$") -> T:
+    """Construct `cls` from parsed JSON, coercing field types."""
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"{path}: expected an object")
+    hints = typing.get_type_hints(cls)
+    values = {}
+    for f in dataclasses.fields(cls):
+        if f.name not in data:
+            if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+                raise StructuredOutputError(f"{path}.{f.name}: missing")
+            continue
+        values[f.name] = _coerce(data[f.name], hints[f.name], f"{path}.{f.name}")
+    try:
+        return cls(**values)
+    except (ValueError, TypeError) as exc:
+        raise StructuredOutputError(f"{path}: {exc}") from None
+
+
+# --------------------------------------------------
+# GENERATION
+# --------------------------------------------------
+def generate_json(model, prompt: str, cls: Type[T], op: str = "generate", reasks: int = REASKS) -> T:
+    """One validated `cls` instance from the model, re-asking only if local repair fails."""
+    config = {"response_mime_type": "application/json", "response_schema": schema_for(cls)}
+    request = prompt
+    for attempt in range(reasks + 1):
+        text = model.generate_content(request, op=op, generation_config=config).text
+        try:
+            data, repaired = parse_loose(text)
+            result = build(cls, data)
+        except StructuredOutputError as exc:
+            if attempt == reasks:
+                raise StructuredOutputError(f"The AI returned an unusable answer ({exc}). Please try again.") from None
+            metrics.record_event("json_reask", model.tool)
+            request = (
+                f"{prompt}\n\nYour previous reply could not be used: {exc}.\n"
+                f"Reply with only a JSON object matching this schema:\n{json.dumps(schema_for(cls))}"
+            )
+            continue
+        if repaired:
+            metrics.record_event("json_repaired", model.tool)
+        return result
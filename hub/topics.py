@@ -0,0 +1,180 @@
+"""
+Online topic clustering and belief-drift detection for notes.
+
+Notes are assigned to topics one at a time as they arrive (leader-follower
+clustering over the hashed vectors from hub.vectors): a note joins the
+closest topic if it is similar enough, otherwise it starts a new one, and
+the topic's centroid moves toward it. Each note also gets a stance score
+from local cues (negation, sentiment words), so per-topic stance over time
+and the points where it flips can be computed with pandas in milliseconds,
+without a model call. Only the flagged points need a model to explain them.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from hub.retrieval import STOPWORDS
+from hub.vectors import DIM, embed, negated
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+TOPIC_SIMILARITY = 0.12     # join the nearest topic at or above this cosine
+MAX_TOPICS = 60             # beyond this, notes join the nearest topic regardless
+MIN_TOPIC_NOTES = 3         # smaller topics are not charted or checked for drift
+TREND_ALPHA = 0.5           # EWM smoothing of stance within a topic
+DRIFT_THRESHOLD = 0.6       # |stance - previous trend| that counts as a drift point
+
+POSITIVE = frozenset(
+    "good great love enjoy happy best better benefit agree right worth valuable important "
+    "excited hopeful confident productive healthy support prefer win success useful fun calm".split()
+)
+NEGATIVE = frozenset(
+    "bad terrible hate dislike awful worst worse harm disagree wrong waste useless scam afraid "
+    "anxious risky stressful unhealthy oppose fail failure boring pointless isolating toxic".split()
+)
+_WORD = re.compile(r"[a-z']+")
+
+
+def sentiment(text: str) -> float:
+    """Lexicon sentiment in [-1, 1]."""
+    words = _WORD.findall(text.lower())
+    pos = sum(w in POSITIVE for w in words)
+    neg = sum(w in NEGATIVE for w in words)
+    return (pos - neg) / (pos + neg + 1)
+
+
+def stance(text: str) -> float:
+    """+0.5 for an affirmed claim, -0.5 for a negated one, shifted by sentiment; in [-1, 1]."""
+    return (-0.5 if negated(text) else 0.5) + 0.5 * sentiment(text)
+
+
+@dataclass
+class Topic:
+    id: int
+    centroid: np.ndarray
+    size: int = 0
+    words: Counter = field(default_factory=Counter)
+
+
+class TopicTracker:
+    """Topics, stance and dates for a growing list of notes; row i is the i-th note added."""
+
+    def __init__(self, dim: int = DIM, threshold: float = TOPIC_SIMILARITY, max_topics: int = MAX_TOPICS):
+        self.dim = dim
+        self.threshold = threshold
+        self.max_topics = max_topics
+        self.lock = threading.Lock()
+        self.topics: List[Topic] = []
+        self._centroids = np.zeros((0, dim), dtype=np.float32)
+        self._doc_words: Counter = Counter()
+        self.rows: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, note: Dict[str, Any]) -> int:
+        """Assign `note` ({"id", "date", "text"}) to a topic and return the topic id."""
+        vector = embed(note["text"], self.dim)
+        vector /= np.linalg.norm(vector) or 1
+        topic_id: Optional[int] = None
+        if len(self.topics):
+            scores = self._centroids @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold or len(self.topics) >= self.max_topics:
+                topic_id = best
+        if topic_id is None:
+            topic_id = len(self.topics)
+            self.topics.append(Topic(topic_id, vector.copy()))
+            self._centroids = np.vstack([self._centroids, vector[None, :]])
+
+        topic = self.topics[topic_id]
+        topic.size += 1
+        # Running mean of member vectors, kept unit length for cosine scoring
+        centroid = topic.centroid + (vector - topic.centroid) / topic.size
+        topic.centroid = centroid / (np.linalg.norm(centroid) or 1)
+        self._centroids[topic_id] = topic.centroid
+
+        words = {w for w in _WORD.findall(note["text"].lower()) if len(w) > 3 and w not in STOPWORDS}
+        topic.words.update(words)
+        self._doc_words.update(words)
+        self.rows.append({
+            "id": note.get("id", len(self.rows)),
+            "date": note["date"],
+            "topic": topic_id,
+            "stance": stance(note["text"]),
+            "sentiment": sentiment(note["text"]),
+        })
+        return topic_id
+
+    def sync(self, notes) -> None:
+        """Catch up with a note log (anything with len() and since(n)), adding only new notes."""
+        with self.lock:
+            if len(notes) > len(self.rows):
+                for note in notes.since(len(self.rows)):
+                    self.add(note)
+
+    def label(self, topic_id: int, words: int = 3) -> str:
+        """The topic's most distinctive words."""
+        topic = self.topics[topic_id]
+        total = max(len(self.rows), 1)
+        ranked = sorted(
+            topic.words.items(),
+            key=lambda item: (-item[1] * math.log(1 + total / self._doc_words[item[0]]), item[0]),
+        )
+        return ", ".join(word for word, _ in ranked[:words]) or f"topic {topic_id + 1}"
+
+    # ---- analysis ----
+    def frame(self, min_notes: int = MIN_TOPIC_NOTES) -> pd.DataFrame:
+        """One row per note in topics of at least `min_notes`, with the topic's stance trend."""
+        with self.lock:
+            df = pd.DataFrame(self.rows, columns=["id", "date", "topic", "stance", "sentiment"])
+            labels = {t.id: self.label(t.id) for t in self.topics if t.size >= min_notes}
+        df = df[df["topic"].isin(list(labels))].copy()
+        if df.empty:
+            return df.assign(label=[], trend=[], shift=[], drift=[])
+        df["date"] = pd.to_datetime(df["date"])
+        df["label"] = df["topic"].map(labels)
+        df = df.sort_values(["topic", "date", "id"])
+        grouped = df.groupby("topic")["stance"]
+        df["trend"] = grouped.transform(lambda s: s.ewm(alpha=TREND_ALPHA).mean())
+        df["shift"] = df["stance"] - df.groupby("topic")["trend"].shift()
+        df["drift"] = df["shift"].abs() >= DRIFT_THRESHOLD
+        return df
+
+    def drift_points(self, limit: int = 8) -> pd.DataFrame:
+        """The strongest flagged points, most recent first among equals."""
+        df = self.frame()
+        if df.empty:
+            return df
+        flagged = df[df["drift"]].copy()
+        flagged["magnitude"] = flagged["shift"].abs()
+        return flagged.sort_values(["magnitude", "date"], ascending=False).head(limit)
+
+    def topic_history(
+        self, topic_id: int, before_id: int, notes, k: int = 2, frame: Optional[pd.DataFrame] = None
+    ) -> List[Dict[str, Any]]:
+        """Up to `k` notes of the topic that precede note `before_id` by date."""
+        df = self.frame() if frame is None else frame
+        members = df[df["topic"] == topic_id].reset_index(drop=True)
+        hits = members.index[members["id"] == before_id]
+        if not len(hits):
+            return []
+        earlier = members.iloc[max(hits[0] - k, 0):hits[0]]
+        return [notes[int(note_id)] for note_id in earlier["id"]]
+
+
+def charted(df: pd.DataFrame, top: int = 6) -> pd.DataFrame:
+    """Rows for the `top` largest topics, for plotting."""
+    if df.empty:
+        return df
+    largest = df["topic"].value_counts().head(top).index
+    return df[df["topic"].isin(largest)]
+
@@ -0,0 +1,134 @@
+"""
+Hashed bag-of-words vectors for short notes, in NumPy.
+
+Every note is hashed into a fixed-size vector once, when it is added
+(words plus word pairs, sublinear term frequency, signed hashing), so
+the index grows incrementally and needs no vocabulary. Document
+frequencies are kept per bucket and applied as IDF weights at query
+time. `candidate_pairs` finds the note pairs most worth a closer look:
+highly similar ones, ranked higher when exactly one side is negated
+("I want to move abroad" vs "I no longer want to move abroad").
+"""
+import re
+import zlib
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from hub.retrieval import tokenize
+
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+DIM = 1024
+BLOCK = 512                 # rows per similarity block, bounds memory at BLOCK x n floats
+NEAR_DUPLICATE = 0.97       # pairs above this are the same thought saved twice
+MIN_SIMILARITY = 0.05
+POLARITY_BOOST = 1.3
+MAX_PAIRS_PER_NOTE = 2      # keep one chatty topic from taking every slot
+
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|nothing|neither|nor|none|no longer|stop(?:ped)?|quit|"
+    r"\w+n't|cannot|against|wrong|disagree|hate|dislike)\b",
+    re.IGNORECASE,
+)
+
+
+def _features(text: str) -> List[str]:
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def embed(text: str, dim: int = DIM) -> np.ndarray:
+    """Unweighted hashed vector: log(1 + tf) per bucket, sign from a second hash bit."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+def negated(text: str) -> bool:
+    return bool(_NEGATION.search(text))
+
+
+class NoteIndex:
+    """Append-only index; row i is the i-th note added."""
+
+    def __init__(self, dim: int = DIM):
+        self.dim = dim
+        self._rows = np.zeros((64, dim), dtype=np.float32)
+        self._polarity = np.zeros(64, dtype=bool)
+        self._df = np.zeros(dim, dtype=np.float32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, text: str) -> int:
+        if self._count == len(self._rows):
+            # Amortised growth, so appends stay O(dim)
+            self._rows = np.vstack([self._rows, np.zeros_like(self._rows)])
+            self._polarity = np.concatenate([self._polarity, np.zeros_like(self._polarity)])
+        vector = embed(text, self.dim)
+        self._rows[self._count] = vector
+        self._polarity[self._count] = negated(text)
+        self._df += vector != 0
+        self._count += 1
+        return self._count - 1
+
+    def extend(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+    def vectors(self) -> np.ndarray:
+        """IDF-weighted, L2-normalised rows for every note."""
+        idf = np.log((1 + self._count) / (1 + self._df)) + 1
+        weighted = self._rows[: self._count] * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        return weighted / np.where(norms == 0, 1, norms)
+
+    def similar(self, text: str, k: int = 5) -> List[Tuple[float, int]]:
+        if not self._count:
+            return []
+        idf = np.log((1 + self._count) / (1 + self._df)) + 1
+        query = embed(text, self.dim) * idf
+        query /= np.linalg.norm(query) or 1
+        scores = self.vectors() @ query
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), int(i)) for i in top]
+
+    def candidate_pairs(self, k: int = 12) -> List[Tuple[float, int, int]]:
+        """Top `k` (score, i, j) pairs with i < j, scored by similarity and opposing polarity."""
+        n = self._count
+        if n < 2:
+            return []
+        matrix = self.vectors()
+        polarity = self._polarity[:n]
+        per_block = max(k * 4, 32)
+        found: List[Tuple[float, int, int]] = []
+        for start in range(0, n, BLOCK):
+            block = matrix[start:start + BLOCK]
+            scores = block @ matrix.T
+            rows = np.arange(start, start + len(block))
+            scores[np.arange(n)[None, :] <= rows[:, None]] = -1        # each pair once, no self-pairs
+            scores[(scores > NEAR_DUPLICATE) | (scores < MIN_SIMILARITY)] = -1
+            scores = np.where(polarity[rows][:, None] != polarity[None, :], scores * POLARITY_BOOST, scores)
+            flat = scores.ravel()
+            take = min(per_block, flat.size)
+            for index in np.argpartition(-flat, take - 1)[:take]:
+                if flat[index] > 0:
+                    r, j = divmod(int(index), n)
+                    found.append((float(flat[index]), start + r, j))
+
+        chosen: List[Tuple[float, int, int]] = []
+        uses = np.zeros(n, dtype=int)
+        for score, i, j in sorted(found, reverse=True):
+            if uses[i] < MAX_PAIRS_PER_NOTE and uses[j] < MAX_PAIRS_PER_NOTE:
+                chosen.append((score, i, j))
+                uses[i] += 1
+                uses[j] += 1
+                if len(chosen) == k:
+                    break
+        return chosen
@@ -1,5 +1,18 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from dataclasses import dataclass
+from itertools import product as combinations
+from typing import Any, Dict, List, Optional, Tuple
+
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
+from hub.export import download_buttons
+from hub.llm import get_model
+from hub.structured import generate_json
+from hub import batch, jobs, profiling
 
 # Secure Gemini API key
 try:
@@ -8,9 +21,207 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("affili8")
+
+MATRIX_PAGE = "affili8_matrix"
+BATCH_PAGE = "affili8_batch"
+STYLES = ["Enthusiastic Buyer", "Balanced Analyst", "Comparative (vs competitor)", "Storytelling"]
+LENGTHS = ["Short (300 words)", "Medium (600 words)", "Long (1000 words)"]
+MAX_BATCH_ROWS = 1000
+# Upper bound on the words one variant-matrix reply may have to hold
+MAX_MATRIX_WORDS = 4000
+# Accepted column names in uploaded catalogs
+COLUMNS = {
+    "product": ("product", "product_name", "name", "title"),
+    "description": ("description", "product_description", "features", "desc"),
+    "link": ("link", "affiliate_link", "url"),
+    "style": ("style", "review_style"),
+    "length": ("length", "review_length"),
+}
+
+
+REVIEW_GUIDE = """Include:
+- Engaging intro hook
+- Key features and benefits
+- Pros and cons (balanced)
+- Personal "why I love it" touch
+- Natural call-to-action with the affiliate link
+- SEO-friendly (natural keywords)
+
+Make it persuasive but honest. Format with markdown headings and bullets.
+"""
+
+
+def review_prompt(product_name: str, description: str, affiliate_link: str, style: str, length: str) -> str:
+    return f"""
+You are AffiliateForge — an expert affiliate marketer writing high-converting product reviews.
+
+Product: {product_name}
+Description: {description}
+Affiliate link: {affiliate_link}
+
+Write a {length.lower()} review in this style: {style}
+
+{REVIEW_GUIDE}"""
+
+
+# --------------------------------------------------
+# VARIANT MATRIX
+# --------------------------------------------------
+@dataclass
+class Variant:
+    style: str
+    length: str
+    review: str
+
+
+@dataclass
+class VariantSet:
+    variants: List[Variant]
+
+
+def _words(length: str) -> int:
+    match = re.search(r"\d+", length)
+    return int(match.group()) if match else 600
+
+
+def matrix_prompt(product_name: str, description: str, affiliate_link: str, combos: List[Tuple[str, str]]) -> str:
+    """The product block once, then one line per style/length variant."""
+    wanted = "\n".join(f"{i}. style: {style}; length: {length}" for i, (style, length) in enumerate(combos, start=1))
+    return f"""
+You are AffiliateForge — an expert affiliate marketer writing high-converting product reviews.
+
+Product: {product_name}
+Description: {description}
+Affiliate link: {affiliate_link}
+
+Write {len(combos)} separate reviews of this product, one for each variant below, in this order:
+{wanted}
+
+Each review stands on its own and follows its variant's style and length.
+{REVIEW_GUIDE}
+Return JSON: {{"variants": [{{"style": "...", "length": "...", "review": "markdown"}}]}}, echoing each variant's style and length exactly.
+"""
+
+
+def generate_matrix(
+    product_name: str, description: str, affiliate_link: str, styles: List[str], lengths: List[str]
+) -> Dict[Tuple[str, str], Optional[str]]:
+    """Every style × length review from a single structured call; None where one is missing."""
+    combos = list(combinations(styles, lengths))
+    result = generate_json(model, matrix_prompt(product_name, description, affiliate_link, combos), VariantSet, op="variants")
+    reviews: Dict[Tuple[str, str], Optional[str]] = dict.fromkeys(combos)
+    for position, variant in enumerate(result.variants):
+        combo = (_pick(variant.style, styles, ""), _pick(variant.length, lengths, ""))
+        if combo not in reviews and len(result.variants) == len(combos):
+            # Labels came back garbled but the count matches: trust the order
+            combo = combos[position]
+        if combo in reviews and reviews[combo] is None:
+            reviews[combo] = variant.review
+    return reviews
+
+
+def forge_matrix(ctx, product_name: str, description: str, affiliate_link: str, styles: List[str], lengths: List[str]) -> Dict:
+    """Background job: the variant matrix, with reviews as rows the job table can store."""
+    ctx.set_progress(0.1, f"Forging {len(styles) * len(lengths)} variants...")
+    reviews = generate_matrix(product_name, description, affiliate_link, styles, lengths)
+    return {
+        "name": product_name,
+        "styles": styles,
+        "lengths": lengths,
+        "reviews": [[style, length, review] for (style, length), review in reviews.items()],
+    }
+
+
+def matrix_markdown(product_name: str, reviews: Dict[Tuple[str, str], Optional[str]]) -> str:
+    sections = [f"# {product_name} — review variants"]
+    for (style, length), review in reviews.items():
+        if review:
+            sections.append(f"## {style} · {length}\n\n{review}")
+    return "\n\n".join(sections)
+
+
+# --------------------------------------------------
+# BATCH MODE
+# --------------------------------------------------
+def _pick(value: str, options: List[str], default: str) -> str:
+    """Match loose catalog values ("short", "storytelling") to an option."""
+    value = (value or "").strip().lower()
+    if not value:
+        return default
+    for option in options:
+        if option.lower() == value or option.lower().startswith(value) or value in option.lower():
+            return option
+    return default
+
+
+def parse_catalog(name: str, data: bytes, style: str, length: str) -> List[Dict[str, str]]:
+    """Rows from a CSV or JSONL upload; missing styles and lengths use the defaults."""
+    text = data.decode("utf-8-sig")
+    if name.lower().endswith((".jsonl", ".json")):
+        stripped = text.strip()
+        records = json.loads(stripped) if stripped.startswith("[") else [
+            json.loads(line) for line in stripped.splitlines() if line.strip()
+        ]
+    else:
+        records = list(csv.DictReader(io.StringIO(text)))
+
+    rows = []
+    for number, record in enumerate(records, start=1):
+        if not isinstance(record, dict):
+            raise ValueError(f"Row {number} is not an object.")
+        fields = {str(k).strip().lower(): str(v or "").strip() for k, v in record.items() if k is not None}
+        row = {
+            column: next((fields[alias] for alias in aliases if fields.get(alias)), "")
+            for column, aliases in COLUMNS.items()
+        }
+        if not row["product"] and not row["link"]:
+            continue
+        if not row["product"] or not row["link"]:
+            raise ValueError(f"Row {number} needs both a product name and an affiliate link.")
+        row["style"] = _pick(row["style"], STYLES, style)
+        row["length"] = _pick(row["length"], LENGTHS, length)
+        rows.append(row)
+    return rows
+
+
+def write_review(row: Dict[str, str]) -> str:
+    prompt = review_prompt(row["product"], row["description"], row["link"], row["style"], row["length"])
+    return model.generate_content(prompt, op="batch").text
+
+
+def generate_batch(ctx, batch_key: str, rows: List[Dict[str, str]], workers: int):
+    """Background job: write every review of the batch that is not finished yet."""
+    return batch.run_batch(ctx, batch_key, rows, write_review, workers=workers)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60] or "review"
+
+
+def results_csv(rows: List[Dict[str, Any]]) -> bytes:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, ["product", "link", "style", "length", "status", "review", "error"])
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**{k: row[k] for k in ("product", "link", "style", "length", "status", "error")},
+                         "review": row["output"] or ""})
+    return out.getvalue().encode("utf-8")
+
+
+def results_zip(rows: List[Dict[str, Any]]) -> bytes:
+    """One Markdown file per finished review, plus the CSV."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for row in rows:
+            if row["status"] == batch.DONE:
+                archive.writestr(f"{row['idx'] + 1:04d}-{_slug(row['product'])}.md", row["output"])
+        archive.writestr("reviews.csv", results_csv(rows))
+    return buffer.getvalue()
+
 
 st.set_page_config(page_title="AffiliateForge", page_icon="💰", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -24,64 +235,151 @@ st.markdown('<p class="subheader">AI-generated product reviews for affiliate com
 
 st.info("Describe a product and paste your affiliate link. AffiliateForge generates persuasive, balanced reviews ready for your blog, YouTube, or social.")
 
-with st.form("review_form"):
-    product_name = st.text_input("Product Name")
-    description = st.text_area("Product Description (features, benefits)", height=150)
-    affiliate_link = st.text_input("Your Affiliate Link", placeholder="e.g., https://amazon.com/dp/B123?tag=yourtag")
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        style = st.selectbox("Review Style", ["Enthusiastic Buyer", "Balanced Analyst", "Comparative (vs competitor)", "Storytelling"])
-    with col2:
-        length = st.selectbox("Review Length", ["Short (300 words)", "Medium (600 words)", "Long (1000 words)"])
+single_tab, matrix_tab, batch_tab = st.tabs(["Single review", "Compare variants", "Batch (CSV / JSONL)"])
 
-    submitted = st.form_submit_button("Generate Review")
+with single_tab:
+    with st.form("review_form"):
+        product_name = st.text_input("Product Name")
+        description = st.text_area("Product Description (features, benefits)", height=150)
+        affiliate_link = st.text_input("Your Affiliate Link", placeholder="e.g., https://amazon.com/dp/B123?tag=yourtag")
 
-if submitted:
-    if not product_name or not affiliate_link:
-        st.warning("Product name and affiliate link required.")
-    else:
-        with st.spinner("Forging your affiliate review..."):
-            try:
-                prompt = f"""
-You are AffiliateForge — an expert affiliate marketer writing high-converting product reviews.
+        col1, col2 = st.columns(2)
+        with col1:
+            style = st.selectbox("Review Style", STYLES)
+        with col2:
+            length = st.selectbox("Review Length", LENGTHS)
 
-Product: {product_name}
-Description: {description}
-Affiliate link: {affiliate_link}
+        submitted = st.form_submit_button("Generate Review")
 
-Write a {length.lower()} review in this style: {style}
+    if submitted:
+        if not product_name or not affiliate_link:
+            st.warning("Product name and affiliate link required.")
+        else:
+            with st.spinner("Forging your affiliate review..."):
+                try:
+                    prompt = review_prompt(product_name, description, affiliate_link, style, length)
 
-Include:
-- Engaging intro hook
-- Key features and benefits
-- Pros and cons (balanced)
-- Personal "why I love it" touch
-- Natural call-to-action with the affiliate link
-- SEO-friendly (natural keywords)
+                    response = model.generate_content(prompt)
+                    review = response.text
 
-Make it persuasive but honest. Format with markdown headings and bullets.
-"""
+                    st.success("Review Generated")
+                    st.markdown("### Your Affiliate Review")
+                    st.markdown(review)
+
+                    # Copy button + affiliate link reminder
+                    st.code(review, language="markdown")
+                    download_buttons(review, "affiliate_review", f"{product_name} Review", accent="#f1c40f")
+
+                    st.caption("AffiliateForge uses Gemini AI — always disclose affiliate links per FTC guidelines.")
+                except Exception as e:
+                    st.error(f"Generation failed: {str(e)}")
+
+with matrix_tab:
+    with st.form("matrix_form"):
+        st.markdown("Get several styles and lengths side by side from one request, sending the product once.")
+        matrix_name = st.text_input("Product Name", key="matrix_name")
+        matrix_description = st.text_area("Product Description (features, benefits)", height=150, key="matrix_description")
+        matrix_link = st.text_input("Your Affiliate Link", key="matrix_link")
+        col1, col2 = st.columns(2)
+        with col1:
+            matrix_styles = st.multiselect("Styles", STYLES, default=STYLES[:2])
+        with col2:
+            matrix_lengths = st.multiselect("Lengths", LENGTHS, default=LENGTHS[:1])
+        compared = st.form_submit_button("Generate Variants")
 
-                response = model.generate_content(prompt)
-                review = response.text
+    if compared:
+        total_words = len(matrix_styles) * sum(_words(length) for length in matrix_lengths)
+        if not matrix_name or not matrix_link:
+            st.warning("Product name and affiliate link required.")
+        elif not matrix_styles or not matrix_lengths:
+            st.warning("Pick at least one style and one length.")
+        elif total_words > MAX_MATRIX_WORDS:
+            st.warning(f"That is about {total_words} words in one reply; pick fewer variants (up to {MAX_MATRIX_WORDS} words).")
+        else:
+            details = (matrix_name, matrix_description, matrix_link, matrix_styles, matrix_lengths)
+            jobs.submit(MATRIX_PAGE, forge_matrix, *details, key_parts=details, force=True)
+
+    job = jobs.current(MATRIX_PAGE)
+    if job and jobs.track(job, "Variant generation"):
+        name, styles, lengths = job.result["name"], job.result["styles"], job.result["lengths"]
+        reviews = {(style, length): review for style, length, review in job.result["reviews"]}
+        missing = [f"{style} · {length}" for (style, length), review in reviews.items() if not review]
+        if missing:
+            st.warning(f"The AI skipped {len(missing)} variant(s): {', '.join(missing)}. Generate again to fill them in.")
+        for length in lengths:
+            st.markdown(f"### {length}")
+            for col, style in zip(st.columns(len(styles)), styles):
+                with col:
+                    st.markdown(f"**{style}**")
+                    with st.container(height=500):
+                        st.markdown(reviews.get((style, length)) or "_Not generated._")
+        download_buttons(matrix_markdown(name, reviews), "affiliate_review_variants", f"{name} Review Variants",
+                         formats=("md", "html", "docx"), accent="#f1c40f")
+
+with batch_tab:
+    st.markdown("Upload a catalog with one product per row: `product`, `link`, and optionally `description`, `style` and `length`.")
+    upload = st.file_uploader("Catalog (CSV or JSONL)", type=["csv", "jsonl", "json"])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        default_style = st.selectbox("Default style", STYLES, key="batch_style")
+    with col2:
+        default_length = st.selectbox("Default length", LENGTHS, key="batch_length")
+    with col3:
+        workers = st.slider("Parallel requests", 1, 16, batch.DEFAULT_WORKERS)
 
-                st.success("Review Generated")
-                st.markdown("### Your Affiliate Review")
-                st.markdown(review)
+    if upload is not None:
+        try:
+            catalog = parse_catalog(upload.name, upload.getvalue(), default_style, default_length)
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"Could not read {upload.name}: {e}")
+            catalog = []
+        if len(catalog) > MAX_BATCH_ROWS:
+            st.warning(f"Only the first {MAX_BATCH_ROWS} of {len(catalog)} products will be used.")
+            catalog = catalog[:MAX_BATCH_ROWS]
+        if catalog:
+            st.dataframe(catalog[:20], use_container_width=True, hide_index=True)
+            if st.button(f"Generate {len(catalog)} reviews", type="primary"):
+                batch_key = jobs.make_key(BATCH_PAGE, catalog)
+                store = batch.get_store()
+                store.register(batch_key, catalog)
+                todo = store.todo(batch_key)
+                if todo:
+                    # Keyed on the rows still to do, so a resubmit resumes rather than reattaching
+                    jobs.submit(BATCH_PAGE, generate_batch, batch_key, catalog, workers, key_parts=(batch_key, todo), shared=True)
+                st.session_state["affili8_batch"] = batch_key
 
-                # Copy button + affiliate link reminder
-                st.code(review, language="markdown")
-                st.download_button(
-                    "📥 Download Review (Markdown)",
-                    review,
-                    "affiliate_review.md",
-                    "text/markdown"
-                )
+    batch_key = st.session_state.get("affili8_batch")
+    job = jobs.current(BATCH_PAGE)
+    running = bool(job and not job.finished)
+    if job:
+        jobs.track(job, "Batch generation")
 
-                st.caption("AffiliateForge uses Gemini AI — always disclose affiliate links per FTC guidelines.")
-            except Exception as e:
-                st.error(f"Generation failed: {str(e)}")
+    @st.fragment(run_every=2 if running else None)
+    def batch_results(batch_key: str):
+        store = batch.get_store()
+        counts = store.counts(batch_key)
+        rows = store.rows(batch_key)
+        st.caption(
+            f"{counts[batch.DONE]} written, {counts[batch.FAILED]} failed, {counts[batch.PENDING]} pending. "
+            "Finished reviews are saved as they complete; uploading the same file again resumes where it stopped."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📥 CSV", data=lambda: results_csv(store.rows(batch_key)),
+                               file_name="affiliate_reviews.csv", mime="text/csv", use_container_width=True)
+        with col2:
+            st.download_button("📥 ZIP of Markdown", data=lambda: results_zip(store.rows(batch_key)),
+                               file_name="affiliate_reviews.zip", mime="application/zip", use_container_width=True)
+        finished = [row for row in rows if row["status"] != batch.PENDING]
+        if finished:
+            st.dataframe(
+                [{"product": row["product"], "status": row["status"],
+                  "review": (row["output"] or row["error"] or "")[:120]} for row in finished[-50:]],
+                use_container_width=True, hide_index=True,
+            )
 
+    if batch_key:
+        batch_results(batch_key)
 st.markdown("---")
 st.caption("AffiliateForge • Turn products into commissions with AI • Powered by Gemini AI")
@@ -1,18 +1,47 @@
 import streamlit as st
-import replicate
 from PIL import Image, ImageDraw, ImageFont
-import requests
-from io import BytesIO
 import os
+from hub import jobs, profiling
+from hub.artifacts import get_store
+from hub.predictions import make_client, run_prediction
 
 # Replicate API token (secure via secrets)
 try:
-    replicate_client = replicate.Client(api_token=st.secrets["REPLICATE_API_TOKEN"])
+    replicate_client = make_client(st.secrets["REPLICATE_API_TOKEN"], st.secrets.get("REPLICATE_BASE_URL"))
 except KeyError:
     st.error("Replicate API token not found. Add REPLICATE_API_TOKEN to Streamlit secrets.")
     st.stop()
 
+PAGE = "afroforge"
+
+
+def forge_designs(ctx, full_prompt, num_variants):
+    """Background job: run Flux and return the output image URLs."""
+    return run_prediction(
+        ctx,
+        replicate_client,
+        "black-forest-labs/flux-dev",
+        {
+            "prompt": full_prompt,
+            "num_outputs": num_variants,
+            "aspect_ratio": "1:1",
+            "output_format": "png"
+        },
+        label="Forging designs",
+        tool="afroforge"
+    )
+
+
+def tshirt_mockup(img):
+    """Simple mockup: white t-shirt background"""
+    tshirt = Image.new("RGB", (600, 800), "white")
+    img_resized = img.resize((400, 400))
+    tshirt.paste(img_resized, (100, 150))
+    return tshirt
+
+
 st.set_page_config(page_title="AfroForge", page_icon="🌍", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -47,43 +76,34 @@ if st.button("Forge Designs", type="primary"):
         st.warning("Enter a design idea first.")
     else:
         full_prompt = f"Afrocentric print-on-demand design: {prompt}. {style}. High resolution, suitable for t-shirts, hoodies, posters. Rich African cultural elements, patterns, symbols."
-
-        with st.spinner("Forging your Afrocentric designs..."):
-            try:
-                outputs = replicate_client.run(
-                    "black-forest-labs/flux-dev",
-                    input={
-                        "prompt": full_prompt,
-                        "num_outputs": num_variants,
-                        "aspect_ratio": "1:1",
-                        "output_format": "png"
-                    }
+        jobs.submit(
+            PAGE, forge_designs, full_prompt, num_variants,
+            key_parts=(full_prompt, num_variants), force=True, pool=jobs.PREDICTION_POOL,
+        )
+
+job = jobs.current(PAGE)
+if job and jobs.track(job, "Design generation"):
+    output_urls = job.result
+    st.success("Designs forged!")
+    cols = st.columns(len(output_urls))
+
+    with profiling.section("image pipeline"):
+        store = get_store()
+        for idx, output_url in enumerate(output_urls):
+            with cols[idx]:
+                # Downloaded once per URL; the mockup is rendered once per design
+                design = store.fetch_url(output_url)
+                mockup = store.derive(design, "tshirt", lambda source: tshirt_mockup(source.open()))
+
+                st.image(store.preview(mockup, "afroforge"), caption=f"Variant {idx+1} on T-Shirt Mockup")
+                st.download_button(
+                    f"Download Variant {idx+1}",
+                    data=design.read,
+                    file_name=f"afroforge_variant_{idx+1}.png",
+                    mime="image/png"
                 )
 
-                st.success("Designs forged!")
-                cols = st.columns(num_variants)
-
-                for idx, output_url in enumerate(outputs):
-                    with cols[idx]:
-                        response = requests.get(output_url)
-                        img = Image.open(BytesIO(response.content))
-
-                        # Simple mockup: white t-shirt background
-                        tshirt = Image.new("RGB", (600, 800), "white")
-                        img_resized = img.resize((400, 400))
-                        tshirt.paste(img_resized, (100, 150))
-
-                        st.image(tshirt, caption=f"Variant {idx+1} on T-Shirt Mockup")
-                        st.download_button(
-                            f"Download Variant {idx+1}",
-                            data=response.content,
-                            file_name=f"afroforge_variant_{idx+1}.png",
-                            mime="image/png"
-                        )
-
-                st.caption("AfroForge uses Flux AI via Replicate — designs are AI-generated and royalty-free for POD use.")
-            except Exception as e:
-                st.error(f"Design generation failed: {str(e)}")
+    st.caption("AfroForge uses Flux AI via Replicate — designs are AI-generated and royalty-free for POD use.")
 
 st.markdown("---")
 st.caption("AfroForge • Celebrate African culture through AI-crafted designs • Global fulfillment coming soon")
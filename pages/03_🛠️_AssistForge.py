@@ -1,6 +1,8 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from datetime import datetime
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -9,9 +11,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("assistforge")
 
 st.set_page_config(page_title="AssistForge", page_icon="🤝", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
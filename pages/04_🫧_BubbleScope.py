@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from typing import Optional
 
+from hub.llm import Model, get_model
+from hub import profiling
+
 
 # --------------------------------------------------
 # PAGE CONFIG (MUST BE FIRST STREAMLIT CALL)
@@ -14,12 +17,13 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+profiling.start()
 
 
 # --------------------------------------------------
 # SECURE GEMINI CONFIGURATION
 # --------------------------------------------------
-def configure_gemini() -> Optional[GenerativeModel]:
+def configure_gemini() -> Optional[Model]:
     """
     Safely configure Gemini model.
     Returns model if successful, otherwise None.
@@ -35,7 +39,7 @@ def configure_gemini() -> Optional[GenerativeModel]:
 
     try:
         configure(api_key=api_key)
-        return GenerativeModel("gemini-2.5-flash")
+        return get_model("bubblescope")
     except Exception as exc:
         st.error(f"Failed to initialize Gemini model: {exc}")
         return None
@@ -158,7 +162,8 @@ if st.button("Scope My Bubble", type="primary"):
             try:
                 prompt = build_prompt(sources, topics, lean)
 
-                response = model.generate_content(prompt)
+                with profiling.section("gemini analysis"):
+                    response = model.generate_content(prompt)
 
                 analysis_text = getattr(response, "text", "").strip()
 
@@ -172,27 +177,28 @@ if st.button("Scope My Bubble", type="primary"):
                     # --------------------------------------------------
                     # SIMPLE VISUALIZATION (ILLUSTRATIVE ONLY)
                     # --------------------------------------------------
-                    spectrum_data = pd.DataFrame(
-                        {
-                            "Perspective": [
-                                "Far Left",
-                                "Left",
-                                "Center",
-                                "Right",
-                                "Far Right",
-                            ],
-                            "Estimated Exposure (%)": [20, 55, 15, 8, 2],
-                        }
-                    )
-
-                    fig = px.bar(
-                        spectrum_data,
-                        x="Perspective",
-                        y="Estimated Exposure (%)",
-                        title="Estimated Exposure Spectrum (Illustrative)",
-                    )
-
-                    st.plotly_chart(fig, use_container_width=True)
+                    with profiling.section("spectrum chart"):
+                        spectrum_data = pd.DataFrame(
+                            {
+                                "Perspective": [
+                                    "Far Left",
+                                    "Left",
+                                    "Center",
+                                    "Right",
+                                    "Far Right",
+                                ],
+                                "Estimated Exposure (%)": [20, 55, 15, 8, 2],
+                            }
+                        )
+
+                        fig = px.bar(
+                            spectrum_data,
+                            x="Perspective",
+                            y="Estimated Exposure (%)",
+                            title="Estimated Exposure Spectrum (Illustrative)",
+                        )
+
+                        st.plotly_chart(fig, use_container_width=True)
 
                     st.caption(
                         "This visualization is an illustrative estimate based on your inputs, "
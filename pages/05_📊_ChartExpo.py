@@ -1,6 +1,7 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
-import google.generativeai as genai
+from google.generativeai import configure
+from hub.llm import get_model, upload_file
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -10,9 +11,10 @@ except KeyError:
     st.stop()
 
 # Current multimodal model (vision-capable)
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("chartexpo")
 
 st.set_page_config(page_title="ChartSkeptic", page_icon="📊", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -43,7 +45,7 @@ if uploaded_files:
         with st.spinner(f"Analyzing Chart {idx + 1}..."):
             try:
                 # Upload with mime_type
-                gemini_file = genai.upload_file(uploaded_file, mime_type=uploaded_file.type)
+                gemini_file = upload_file("chartexpo", uploaded_file, mime_type=uploaded_file.type)
                 uploaded_gemini_files.append(gemini_file)
 
                 prompt = """
@@ -59,7 +61,7 @@ Analyze this chart/dashboard critically:
 Be specific, evidence-based, and neutral. Reference visible elements (axes, labels, trends).
 """
 
-                response = model.generate_content([gemini_file, prompt])
+                response = model.generate_content([gemini_file, prompt], op="chart")
                 analysis = response.text
                 analyses.append(analysis)
 
@@ -96,7 +98,7 @@ Be critical and specific.
                 all_files_content = [file for file in uploaded_gemini_files]
                 all_files_content.append(comparison_prompt)
 
-                comparison_response = model.generate_content(all_files_content)
+                comparison_response = model.generate_content(all_files_content, op="compare")
                 comparison = comparison_response.text
 
                 st.success("Cross-chart analysis complete")
@@ -1,7 +1,22 @@
+import html
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from PyPDF2 import PdfReader
 from docx import Document
+from hub import jobs, profiling
+from hub.artifacts import derived_key
+from hub.export import download_buttons
+from hub.llm import get_model
+from hub.metrics import record_cache
+from hub.redline import ADDED, CHANGED, EQUAL, REMOVED, clause_key, diff_clauses, redline_html
+from hub.retrieval import build_index, split_sections
+from hub.reviews import get_store
+from hub.structured import StructuredOutputError, generate_json
 
 # Secure Gemini API key
 try:
@@ -10,9 +25,204 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("clearpact")
+
+PAGE = "clearpact"
+VERSIONS_PAGE = "clearpact_versions"
+FULL_MODE, VERSIONS_MODE = "Full rewrite", "Negotiation (track versions)"
+RISKS = ("Low", "Medium", "High")
+RISK_CLASSES = {"Low": "risk-low", "Medium": "risk-med", "High": "risk-high"}
+CLAUSES_PER_CALL = 8
+CLAUSE_WORKERS = 4
+# Bump when the clause prompt changes so stale cached analyses are not reused
+CLAUSE_CACHE_VARIANT = "clearpact-clause-v1"
+
+
+def analyze_contract(ctx, contract_text):
+    """Background job: full plain-English rewrite with per-section risk tags."""
+    ctx.set_progress(0.1, "Analyzing contract...")
+    prompt = f"""
+You are ClearPact — a legal expert who translates contracts into plain English and analyzes risk.
+
+Contract text:
+{contract_text}
+
+Task:
+1. Rewrite the entire contract in simple, clear English (keep structure with section headings).
+2. For each major section, add:
+   - Risk level: Low / Medium / High
+   - Who benefits most: Party A / Party B / Balanced / Unclear
+   - Brief reason (1 sentence)
+
+Output format:
+- Use markdown headings for sections
+- After each section, add tags like:
+  **Risk: High** | **Favors: Party A** | Reason: One-sided termination rights
+
+Be accurate, neutral, and helpful.
+"""
+    return model.generate_content(prompt).text
+
+
+# --------------------------------------------------
+# CLAUSE-LEVEL ANALYSIS (negotiation mode)
+# --------------------------------------------------
+@dataclass
+class ClauseReview:
+    id: int
+    plain: str
+    risk: str
+    favors: str
+    reason: str
+
+    def __post_init__(self):
+        risk = self.risk.strip().lower()
+        match = next((r for r in RISKS if risk and r.lower().startswith(risk[:3])), None)
+        if match is None:
+            raise ValueError(f"risk must be one of {', '.join(RISKS)}")
+        self.risk = match
+
+
+@dataclass
+class ClauseReviews:
+    clauses: List[ClauseReview]
+
+
+def review_clauses(clauses: List[str]) -> List[Dict[str, str]]:
+    """Plain-English rewrite and risk tags for a handful of clauses in one call."""
+    listing = "\n\n".join(f"[{i}]\n{clause}" for i, clause in enumerate(clauses, start=1))
+    prompt = f"""
+You are ClearPact — a legal expert who translates contracts into plain English and analyzes risk.
+
+Clauses from one contract, each with an id in brackets:
+{listing}
+
+For every clause return:
+- id: its id
+- plain: the clause rewritten in simple, clear English (1-3 sentences)
+- risk: Low / Medium / High
+- favors: Party A / Party B / Balanced / Unclear
+- reason: one sentence
+
+Be accurate, neutral, and helpful.
+"""
+    result = generate_json(model, prompt, ClauseReviews, op="clauses")
+    by_id = {review.id: review for review in result.clauses}
+    missing = [i for i in range(1, len(clauses) + 1) if i not in by_id]
+    if missing:
+        raise StructuredOutputError(f"The AI skipped {len(missing)} clause(s). Please try again.")
+    return [{k: v for k, v in asdict(by_id[i]).items() if k != "id"} for i in range(1, len(clauses) + 1)]
+
+
+def _review_key(clause: str) -> str:
+    return derived_key(clause_key(clause), CLAUSE_CACHE_VARIANT)
+
+
+def cached_review(clause: str) -> Optional[Dict[str, str]]:
+    return get_store().get(_review_key(clause))
+
+
+def analyze_clauses(ctx, clauses):
+    """Background job: analyses for every clause, calling the model only for clauses never seen before."""
+    store = get_store()
+    reviews = [cached_review(clause) for clause in clauses]
+    for review in reviews:
+        record_cache("clauses", hit=review is not None, tool="clearpact")
+    todo = [i for i, review in enumerate(reviews) if review is None]
+    groups = [todo[start:start + CLAUSES_PER_CALL] for start in range(0, len(todo), CLAUSES_PER_CALL)]
+
+    done = 0
+    ctx.set_progress(0.05, f"Analyzing {len(todo)} new or changed clause(s) of {len(clauses)}...")
+    with ThreadPoolExecutor(max_workers=CLAUSE_WORKERS) as pool:
+        futures = {pool.submit(review_clauses, [clauses[i] for i in group]): group for group in groups}
+        for future in as_completed(futures):
+            for i, review in zip(futures[future], future.result()):
+                # Saved as soon as each group lands, so a failed run keeps its progress
+                store.put(_review_key(clauses[i]), review)
+                reviews[i] = review
+            done += len(futures[future])
+            ctx.set_progress(0.05 + 0.95 * done / max(len(todo), 1), f"Analyzed {done}/{len(todo)} clauses")
+            ctx.check()
+    return {"reviews": reviews, "analyzed": len(todo)}
+
+
+def add_version(name: str, text: str) -> int:
+    """Record an uploaded version unless it is identical to one already seen; returns its index."""
+    clauses = [chunk.text for chunk in split_sections(text, merge=False)]
+    versions = st.session_state.setdefault("clearpact_versions", [])
+    keys = [clause_key(c) for c in clauses]
+    for index, version in enumerate(versions):
+        if [clause_key(c) for c in version["clauses"]] == keys:
+            return index
+    versions.append({"name": name, "clauses": clauses})
+    return len(versions) - 1
+
+
+def risk_tag(review: Dict[str, str], previous: Optional[Dict[str, str]] = None) -> str:
+    was = ""
+    if previous and previous["risk"] != review["risk"]:
+        was = f" (was {previous['risk']})"
+    return (
+        f'<div class="{RISK_CLASSES[review["risk"]]}"><b>Risk: {review["risk"]}{was}</b> | '
+        f'<b>Favors: {html.escape(review["favors"])}</b> | Reason: {html.escape(review["reason"])}'
+        f'<br>{html.escape(review["plain"])}</div>'
+    )
+
+
+def versions_report(name: str, changes, base, current, reviews) -> str:
+    sections = [f"# ClearPact redline: {name}"]
+    for change in changes:
+        if change.status == EQUAL:
+            continue
+        clause = current[change.new] if change.new is not None else base[change.old]
+        title = clause.splitlines()[0][:80]
+        if change.new is None:
+            sections.append(f"## [Removed] {title}\n\n~~{clause}~~")
+            continue
+        review = reviews[change.new]
+        sections.append(
+            f"## [{change.status.capitalize()}] {title}\n\n{review['plain']}\n\n"
+            f"**Risk: {review['risk']}** | **Favors: {review['favors']}** | Reason: {review['reason']}"
+        )
+    return "\n\n".join(sections)
+
+
+def answer_question(contract_text, question, history):
+    """Answer from the few clauses that match the question, not the whole contract."""
+    hits = build_index(contract_text).search(question)
+    excerpts = "\n\n".join(f"[§{chunk.number}]\n{chunk.text}" for _, chunk in hits)
+    recent = "\n".join(f"Q: {q}\nA: {a[:300]}" for q, a, _ in history[-2:])
+    prompt = f"""
+You are ClearPact — a legal expert answering questions about one contract in plain English.
+
+Relevant excerpts from the contract:
+{excerpts}
+
+{f"Earlier in this conversation:{chr(10)}{recent}{chr(10)}" if recent else ""}
+Question: {question}
+
+Answer only from the excerpts, citing them like [§3]. If they do not cover the question, say so.
+"""
+    answer = model.generate_content(prompt, op="qa").text
+    return answer, [chunk.number for _, chunk in hits]
+
+
+@st.cache_data(max_entries=16, show_spinner="Reading the contract...")
+def read_contract(mime: str, data: bytes) -> str:
+    """The upload's text, parsed once per file content so follow-up questions don't re-read it."""
+    if mime == "application/pdf":
+        reader = PdfReader(io.BytesIO(data))
+        return "\n".join([page.extract_text() or "" for page in reader.pages])
+    if mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        doc = Document(io.BytesIO(data))
+        return "\n".join([para.text for para in doc.paragraphs])
+    if mime == "text/plain":
+        return data.decode("utf-8")
+    return ""
+
 
 st.set_page_config(page_title="ClearPact", page_icon="📄", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -29,65 +239,128 @@ st.markdown('<p class="subheader">Contracts in plain English + risk visualized</
 
 st.info("Upload any contract. ClearPact rewrites it in simple language, highlights risk zones, and shows who benefits most in each section.")
 
+mode = st.radio(
+    "Mode", [FULL_MODE, VERSIONS_MODE], horizontal=True,
+    help="Negotiation mode keeps every uploaded version and re-analyzes only the clauses that changed.",
+)
 uploaded_file = st.file_uploader("Upload contract (PDF, DOCX, TXT)", type=['pdf', 'docx', 'txt'])
 
 if uploaded_file:
     # Extract text
-    text = ""
-    if uploaded_file.type == "application/pdf":
-        reader = PdfReader(uploaded_file)
-        text = "\n".join([page.extract_text() or "" for page in reader.pages])
-    elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        doc = Document(uploaded_file)
-        text = "\n".join([para.text for para in doc.paragraphs])
-    elif uploaded_file.type == "text/plain":
-        text = uploaded_file.read().decode("utf-8")
-
-    if text.strip():
-        with st.spinner("Analyzing contract..."):
-            try:
-                prompt = f"""
-You are ClearPact — a legal expert who translates contracts into plain English and analyzes risk.
+    with profiling.section("text extraction"):
+        text = read_contract(uploaded_file.type, uploaded_file.getvalue())
 
-Contract text:
-{text[:30000]}  # Truncate if too long
+    if not text.strip():
+        st.warning("No text extracted from file.")
+    elif mode == FULL_MODE:
+        contract_text = text[:30000]
+        if st.session_state.get("clearpact_contract") != contract_text:
+            st.session_state["clearpact_contract"] = contract_text
+            st.session_state["clearpact_qa"] = []
+        jobs.submit(PAGE, analyze_contract, contract_text, key_parts=(contract_text,))
+    else:
+        shown = add_version(uploaded_file.name, text)
+        st.session_state["clearpact_shown"] = shown
+        clauses = st.session_state["clearpact_versions"][shown]["clauses"]
+        jobs.submit(VERSIONS_PAGE, analyze_clauses, clauses, key_parts=(clauses,))
 
-Task:
-1. Rewrite the entire contract in simple, clear English (keep structure with section headings).
-2. For each major section, add:
-   - Risk level: Low / Medium / High
-   - Who benefits most: Party A / Party B / Balanced / Unclear
-   - Brief reason (1 sentence)
+if mode == FULL_MODE:
+    # Reattaches to the last analysis after reruns or navigating away and back
+    job = jobs.current(PAGE)
+    if job and jobs.track(job, "Contract analysis"):
+        analysis = job.result
 
-Output format:
-- Use markdown headings for sections
-- After each section, add tags like:
-  **Risk: High** | **Favors: Party A** | Reason: One-sided termination rights
+        st.success("Analysis complete")
+        st.markdown("### Plain English Contract + Risk Heatmap")
+        st.markdown(analysis)
 
-Be accurate, neutral, and helpful.
-"""
+        download_buttons(analysis, "clearpact_analysis", "ClearPact Contract Analysis")
 
-                response = model.generate_content(prompt)
-                analysis = response.text
-
-                st.success("Analysis complete")
-                st.markdown("### Plain English Contract + Risk Heatmap")
-                st.markdown(analysis)
-
-                # Simple download (HTML for now)
-                html = f"<pre>{analysis}</pre>"
-                st.download_button(
-                    "📥 Download Analysis",
-                    html,
-                    "clearpact_analysis.html",
-                    "text/html"
-                )
-
-                st.caption("ClearPact uses Gemini AI — review all outputs carefully. Not legal advice.")
-            except Exception as e:
-                st.error(f"Analysis failed: {str(e)}")
-    else:
-        st.warning("No text extracted from file.")
+        st.caption("ClearPact uses Gemini AI — review all outputs carefully. Not legal advice.")
+
+        contract_text = st.session_state.get("clearpact_contract")
+        if contract_text:
+            st.markdown("### Ask About This Contract")
+            index = build_index(contract_text)
+            st.caption(f"Each question sends only the matching clauses ({len(index.chunks)} indexed), not the whole contract.")
+            history = st.session_state.setdefault("clearpact_qa", [])
+            for q, a, sources in history:
+                with st.chat_message("user"):
+                    st.markdown(q)
+                with st.chat_message("assistant"):
+                    st.markdown(a)
+                    st.caption("Sources: " + ", ".join(f"§{n}" for n in sources))
+
+            question = st.chat_input("e.g. What happens if I terminate early?")
+            if question:
+                with st.chat_message("user"):
+                    st.markdown(question)
+                with st.chat_message("assistant"):
+                    with st.spinner("Reading the relevant clauses..."):
+                        try:
+                            answer, sources = answer_question(contract_text, question, history)
+                            history.append((question, answer, sources))
+                            st.markdown(answer)
+                            st.caption("Sources: " + ", ".join(f"§{n}" for n in sources))
+                        except Exception as e:
+                            st.error(f"Answer failed: {str(e)}")
+                with st.expander("Matched clauses"):
+                    for _, chunk in index.search(question):
+                        st.markdown(f"**§{chunk.number} — {chunk.title}**")
+                        st.text(chunk.text)
+else:
+    versions = st.session_state.get("clearpact_versions", [])
+    shown = st.session_state.get("clearpact_shown")
+    job = jobs.current(VERSIONS_PAGE)
+    if not versions:
+        st.caption("Upload the first version of the contract, then each revision as it comes back.")
+    elif shown is not None and job and jobs.track(job, "Clause analysis"):
+        current = versions[shown]["clauses"]
+        reviews = job.result["reviews"]
+        st.success(
+            f"{versions[shown]['name']} (v{shown + 1}): analyzed {job.result['analyzed']} of {len(current)} clauses; "
+            "the rest were unchanged and reused."
+        )
+        labels = [f"v{i + 1} — {v['name']}" for i, v in enumerate(versions)]
+        earlier = list(range(shown))
+        if earlier:
+            base_index = st.selectbox("Compare against", earlier, index=len(earlier) - 1, format_func=lambda i: labels[i])
+            base = versions[base_index]["clauses"]
+        else:
+            base = []
+        changes = diff_clauses(base, current)
+        counts = {status: sum(c.status == status for c in changes) for status in (CHANGED, ADDED, REMOVED)}
+        st.markdown(
+            f"### Redline v{shown + 1}: {counts[CHANGED]} changed, {counts[ADDED]} added, {counts[REMOVED]} removed"
+        )
+        show_all = st.toggle("Show unchanged clauses", value=not base)
+
+        for change in changes:
+            if change.status == EQUAL and not show_all:
+                continue
+            with st.container(border=True):
+                st.caption(change.status.upper())
+                if change.status == CHANGED:
+                    st.markdown(redline_html(base[change.old], current[change.new]), unsafe_allow_html=True)
+                elif change.status == ADDED:
+                    st.markdown(redline_html("", current[change.new]), unsafe_allow_html=True)
+                elif change.status == REMOVED:
+                    st.markdown(redline_html(base[change.old], ""), unsafe_allow_html=True)
+                else:
+                    st.text(current[change.new])
+                if change.new is not None:
+                    previous = cached_review(base[change.old]) if change.status == CHANGED else None
+                    st.markdown(risk_tag(reviews[change.new], previous), unsafe_allow_html=True)
+
+        report = versions_report(versions[shown]["name"], changes, base, current, reviews)
+        download_buttons(report, "clearpact_redline", "ClearPact Redline")
+        if st.button("Start a new negotiation"):
+            st.session_state.pop("clearpact_versions", None)
+            st.session_state.pop("clearpact_shown", None)
+            jobs.forget(VERSIONS_PAGE)
+            st.rerun()
+
+        st.caption("ClearPact uses Gemini AI — review all outputs carefully. Not legal advice.")
 
 st.markdown("---")
 st.caption("ClearPact • Contracts made human • Powered by Gemini AI")
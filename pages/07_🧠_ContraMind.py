@@ -1,7 +1,21 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
-from datetime import datetime
+import plotly.express as px
+from google.generativeai import configure
+from datetime import date, datetime
+import io
 import json
+import math
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List
+from hub.importer import import_zip
+from hub.llm import get_model
+from hub.notes import NoteLog, get_log, valid_user_id
+from hub.structured import generate_json
+from hub.topics import TopicTracker, charted
+from hub.vectors import NoteIndex
+from hub import jobs, profiling
 
 # Secure Gemini API key
 try:
@@ -10,9 +24,168 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("contramind")
+
+PAGE_SIZE = 20
+IMPORT_PAGE = "contramind_import"
+MAX_PAIRS = 12              # note pairs judged per analysis, however many notes there are
+PAIRS_PER_CALL = 4
+VERDICTS = ("contradiction", "drift", "growth", "consistent")
+SECTIONS = {
+    "contradiction": "Major Contradictions",
+    "drift": "Belief Drift Over Time",
+    "growth": "Key Insights / Growth",
+}
+
+
+@dataclass
+class PairVerdict:
+    pair: int
+    verdict: str
+    explanation: str
+
+    def __post_init__(self):
+        verdict = self.verdict.strip().lower()
+        match = next((v for v in VERDICTS if verdict and v.startswith(verdict[:5])), None)
+        if match is None:
+            raise ValueError(f"verdict must be one of {', '.join(VERDICTS)}")
+        self.verdict = match
+
+
+@dataclass
+class PairVerdicts:
+    pairs: List[PairVerdict]
+
+
+@dataclass
+class DriftExplanation:
+    point: int
+    explanation: str
+
+
+@dataclass
+class DriftExplanations:
+    points: List[DriftExplanation]
+
+
+@st.cache_resource(max_entries=256)
+def _tracker(path: str) -> TopicTracker:
+    return TopicTracker()
+
+
+def topic_tracker(log: NoteLog) -> TopicTracker:
+    """Topics for `log`, shared by the user's sessions and updated only with new notes."""
+    tracker = _tracker(log.path)
+    tracker.sync(log)
+    return tracker
+
+
+def explain_points(points: List[tuple]) -> List[DriftExplanation]:
+    """One small call for a few flagged drift points, each with the notes that preceded it."""
+    listing = "\n\n".join(
+        f"[{n}] Topic: {label}\n"
+        + "".join(f"Before ({note['date']}): {note['text']}\n" for note in history)
+        + f"Flagged ({flagged['date']}): {flagged['text']}"
+        for n, (label, history, flagged) in enumerate(points, start=1)
+    )
+    prompt = f"""
+You are ContraMind — a sharp, honest thinking partner.
+
+ContraMind flagged these points where the user's stance on a topic shifted:
+{listing}
+
+For every point return:
+- point: its number
+- explanation: two direct, kind sentences on what changed and what might be behind it,
+  quoting the user ("You believed... but now you...")
+"""
+    return generate_json(model, prompt, DriftExplanations, op="pairs").points
+
+
+def explain_drift(log: NoteLog, tracker: TopicTracker, drift) -> str:
+    frame = tracker.frame()
+    points = [
+        (row.label, tracker.topic_history(row.topic, row.id, log, frame=frame), log[int(row.id)])
+        for row in drift.itertuples()
+    ]
+    groups = [points[start:start + PAIRS_PER_CALL] for start in range(0, len(points), PAIRS_PER_CALL)]
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        results = list(pool.map(explain_points, groups))
+    lines = []
+    for group, explanations in zip(groups, results):
+        for item in explanations:
+            if 1 <= item.point <= len(group):
+                label, _, flagged = group[item.point - 1]
+                lines.append(f"- **{flagged['date']}** · _{label}_: “{flagged['text'][:200]}”  \n  {item.explanation}")
+    return "\n".join(lines)
+
+
+def notes_index(log: NoteLog) -> NoteIndex:
+    """This session's index over `log`, catching up on notes appended since it was built."""
+    path, index = st.session_state.get("notes_index", (None, None))
+    if path != log.path or len(index) > len(log):
+        index = NoteIndex()
+        st.session_state.notes_index = (log.path, index)
+    if len(index) < len(log):
+        index.extend(note["text"] for note in log.since(len(index)))
+    return index
+
+
+def import_notes(ctx, log: NoteLog, data: bytes) -> dict:
+    """Job: import a ZIP of Markdown notes or journal exports; the index and topics catch up on the next run."""
+    return import_zip(log, io.BytesIO(data), progress=ctx.set_progress, check=ctx.check)
+
+
+def judge_pairs(pairs: List[tuple]) -> List[PairVerdict]:
+    """One small call for a few (earlier, later) note pairs."""
+    listing = "\n\n".join(
+        f"[{n}]\nEarlier ({a['date']}): {a['text']}\nLater ({b['date']}): {b['text']}"
+        for n, (a, b) in enumerate(pairs, start=1)
+    )
+    prompt = f"""
+You are ContraMind — a sharp, honest thinking partner.
+
+Each pair below holds two of the user's thoughts on a related topic:
+{listing}
+
+For every pair return:
+- pair: its number
+- verdict: contradiction (later says not-earlier), drift (opinion gradually shifted),
+  growth (a wise change of mind), or consistent
+- explanation: one or two direct, kind sentences addressed to the user ("You believed... but now you..."),
+  quoting their words
+"""
+    return generate_json(model, prompt, PairVerdicts, op="pairs").pairs
+
+
+def argue(notes: NoteLog, index: NoteIndex) -> str:
+    """Challenge built from the most related note pairs only, judged in parallel small calls."""
+    pairs = []
+    for _, i, j in index.candidate_pairs(MAX_PAIRS):
+        a, b = sorted((notes[i], notes[j]), key=lambda note: note["date"])
+        pairs.append((a, b))
+    if not pairs:
+        return "Your thoughts don't overlap enough yet for ContraMind to compare them. Add a few more on the same topics."
+
+    groups = [pairs[start:start + PAIRS_PER_CALL] for start in range(0, len(pairs), PAIRS_PER_CALL)]
+    with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+        results = list(pool.map(judge_pairs, groups))
+
+    found = {verdict: [] for verdict in SECTIONS}
+    for group, verdicts in zip(groups, results):
+        for verdict in verdicts:
+            if verdict.verdict in found and 1 <= verdict.pair <= len(group):
+                a, b = group[verdict.pair - 1]
+                found[verdict.verdict].append(
+                    f"- **{a['date']}**: “{a['text'][:200]}”  \n"
+                    f"  **{b['date']}**: “{b['text'][:200]}”  \n"
+                    f"  {verdict.explanation}"
+                )
+    sections = [f"#### {title}\n" + ("\n".join(found[verdict]) or "_Nothing found._") for verdict, title in SECTIONS.items()]
+    return f"_Compared the {len(pairs)} most closely related pairs of thoughts._\n\n" + "\n\n".join(sections)
 
 st.set_page_config(page_title="ContraMind", page_icon="🧠", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -28,9 +201,12 @@ st.markdown('<p class="subheader">Your second brain that argues with you — kee
 
 st.info("Add your thoughts over time. ContraMind will challenge contradictions, flag belief drift, and highlight when you've changed your mind.")
 
-# Initialize session state for notes
-if 'notes' not in st.session_state:
-    st.session_state.notes = []  # List of dicts: {'date': datetime, 'text': str}
+# Notes are stored per user id, carried in the URL so the same link brings them back
+user = st.query_params.get("user")
+if not valid_user_id(user):
+    user = uuid.uuid4().hex[:16]
+    st.query_params["user"] = user
+log = get_log("contramind", user)
 
 # Sidebar: Add new note
 with st.sidebar:
@@ -39,55 +215,95 @@ with st.sidebar:
     note_date = st.date_input("When did you think this?", value=datetime.today())
     if st.button("Save Thought"):
         if new_note.strip():
-            st.session_state.notes.append({
-                "date": note_date.strftime("%Y-%m-%d"),
-                "text": new_note.strip()
-            })
+            log.append(note_date.strftime("%Y-%m-%d"), new_note.strip())
             st.success("Thought saved!")
             st.rerun()
         else:
             st.warning("Write something first.")
 
+    with st.expander("Import notes (ZIP)"):
+        st.caption("A zipped Markdown vault (Obsidian, Logseq, Bear...), text journals or a Day One JSON export. "
+                   "Re-importing only reads files that changed; thoughts you already have are skipped.")
+        archive = st.file_uploader("Notes archive", type=["zip"], label_visibility="collapsed")
+        if archive and st.button("Import"):
+            data = archive.getvalue()
+            jobs.submit(IMPORT_PAGE, import_notes, log, data, key_parts=(user, data), force=True)
+        job = jobs.current(IMPORT_PAGE)
+        if job and jobs.track(job, "Import"):
+            stats = job.result
+            changed = stats['files'] - stats['unchanged_files'] - stats.get('oversized_files', 0)
+            st.success(f"Imported {stats['added']} new thoughts from {changed} changed files.")
+            st.caption(f"{stats['unchanged_files']} files unchanged, {stats['duplicates']} duplicate thoughts skipped.")
+            if stats.get("oversized_files"):
+                st.warning(f"{stats['oversized_files']} files were too large to import and were skipped.")
+
 # Main area
 st.header("Your Knowledge Base")
 
-if st.session_state.notes:
-    # Sort by date
-    sorted_notes = sorted(st.session_state.notes, key=lambda x: x['date'])
+st.caption(
+    f"Your notes are saved under this page's link (user `{user}`). There is no login: anyone with the link "
+    "can read and add to these notes, so keep it private, and bookmark it to come back to them."
+)
 
-    for note in sorted_notes:
+if len(log):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        first, last = date.fromisoformat(log.first_date()), date.fromisoformat(log.last_date())
+        span = st.date_input("Show thoughts from", value=(first, last))
+    with col2:
+        newest_first = st.toggle("Newest first")
+    start = span[0].isoformat() if span else None
+    end = span[1].isoformat() if len(span) > 1 else None
+
+    total = log.count(start, end)
+    pages = max(1, math.ceil(total / PAGE_SIZE))
+    page = st.number_input(f"Page (of {pages})", 1, pages, 1) if pages > 1 else 1
+    offset = (page - 1) * PAGE_SIZE
+    for note in log.range(start, end, offset=offset, limit=PAGE_SIZE, newest_first=newest_first):
         with st.expander(f"{note['date']} — {note['text'][:100]}..."):
             st.write(note['text'])
+    st.caption(f"Showing {min(offset + 1, total)}–{min(offset + PAGE_SIZE, total)} of {total} thoughts ({len(log)} in total).")
+
+    # Topics and drift are computed locally; the model only explains flagged points
+    st.subheader("Topics & Belief Drift")
+    tracker = topic_tracker(log)
+    timeline = tracker.frame()
+    if timeline.empty:
+        st.caption("Topics appear here once a few thoughts share a subject.")
+    else:
+        drift = tracker.drift_points()
+        fig = px.line(
+            charted(timeline), x="date", y="trend", color="label", markers=True, range_y=[-1.1, 1.1],
+            labels={"trend": "stance (against → for)", "label": "topic", "date": ""},
+        )
+        if not drift.empty:
+            fig.add_scatter(
+                x=drift["date"], y=drift["stance"], mode="markers", name="drift",
+                marker=dict(color="#e74c3c", size=14, symbol="x"),
+            )
+        st.plotly_chart(fig, use_container_width=True)
+
+        if drift.empty:
+            st.caption(f"{timeline['topic'].nunique()} topics tracked; no drift flagged yet.")
+        else:
+            st.markdown(f'<span class="drift">{len(drift)} drift point(s) flagged</span>', unsafe_allow_html=True)
+            st.dataframe(
+                [{"date": row.date.date().isoformat(), "topic": row.label, "thought": log[int(row.id)]["text"][:120]}
+                 for row in drift.itertuples()],
+                use_container_width=True, hide_index=True,
+            )
+            if st.button("Explain flagged drift"):
+                with st.spinner("Explaining the flagged shifts..."):
+                    try:
+                        st.markdown(explain_drift(log, tracker, drift))
+                    except Exception as e:
+                        st.error(f"Explanation failed: {str(e)}")
 
     # AI Challenge Button
     if st.button("🧠 Have ContraMind Argue With Me", type="primary"):
         with st.spinner("Analyzing your beliefs for contradictions and drift..."):
             try:
-                notes_text = "\n\n".join([f"{n['date']}: {n['text']}" for n in sorted_notes])
-
-                prompt = f"""
-You are ContraMind — a sharp, honest thinking partner.
-
-Here are the user's past and present thoughts, ordered by date:
-{notes_text}
-
-Your job:
-- Find direct contradictions (e.g., "You said X, but later said not X")
-- Detect belief drift (gradual changes in opinion)
-- Highlight unexamined assumptions or biases
-- Point out when the user has wisely changed their mind
-
-Be direct but kind. Use quotes from their notes.
-Structure:
-- Major Contradictions
-- Belief Drift Over Time
-- Key Insights / Growth
-
-Speak directly: "You believed... but now you..."
-"""
-
-                response = model.generate_content(prompt)
-                challenge = response.text
+                challenge = argue(log, notes_index(log))
 
                 st.success("ContraMind has thoughts")
                 st.markdown("### ContraMind's Challenge")
@@ -97,10 +313,9 @@ Speak directly: "You believed... but now you..."
                 st.error(f"Analysis failed: {str(e)}")
 
     # Export
-    export_data = json.dumps(st.session_state.notes, indent=2)
     st.download_button(
         "📥 Export All Notes (JSON)",
-        export_data,
+        lambda: json.dumps([{"date": note["date"], "text": note["text"]} for note in log], indent=2),
         "contramind_notes.json",
         "application/json"
     )
@@ -1,8 +1,18 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from PyPDF2 import PdfReader
 from docx import Document
+import io
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+from hub.archive import (
+    FILE_CHARS, bucket, choose_freq, period_stats, sample, spread, take_evenly, text_entries, tweet_entries,
+)
+from hub.importer import parse_date
+from hub.llm import get_model
+from hub import jobs, profiling
 
 # Secure Gemini API key
 try:
@@ -12,9 +22,151 @@ except KeyError:
     st.stop()
 
 # Updated to a valid model name as of January 2026 (Gemini 2.5 Flash)
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("echomind")
+
+PAGE = "echomind"
+PERIOD_WORKERS = 4
+MAX_FINAL_SUMMARIES = 12    # more period summaries than this are combined in rounds first
+FREQS = {"Auto": None, "Year": "Y", "Quarter": "Q"}
+
+
+def spread_out(entries: List[Dict]) -> Iterator[Tuple[tuple, Dict]]:
+    for i in spread(len(entries)):
+        yield (i,), entries[i]
+
+
+def file_entries(filename: str, mime: str, data: bytes) -> Iterator[Tuple[tuple, Dict]]:
+    """
+    Dated entries from one upload, lazily and coarse-to-fine (see hub.archive.spread);
+    undated text falls back to the document's own creation date.
+    """
+    fallback = parse_date(filename)
+    try:
+        if mime == "text/plain":
+            yield from spread_out(text_entries(data.decode("utf-8", errors="ignore"), filename, fallback))
+        elif mime == "application/pdf":
+            reader = PdfReader(io.BytesIO(data))
+            try:
+                created = reader.metadata.creation_date if reader.metadata else None
+            except Exception:
+                created = None
+            created = created.date().isoformat() if created else fallback
+            # Pages are only parsed when pulled, so a budget-limited read skips most of a long PDF
+            for page in spread(len(reader.pages)):
+                text = reader.pages[page].extract_text() or ""
+                for n, entry in enumerate(text_entries(text, filename, created)):
+                    yield (page, n), entry
+        elif mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            doc = Document(io.BytesIO(data))
+            created = doc.core_properties.created
+            text = "\n\n".join(para.text for para in doc.paragraphs)
+            yield from spread_out(text_entries(text, filename, created.date().isoformat() if created else fallback))
+        elif mime == "application/json":
+            payload = json.loads(data)
+            if isinstance(payload, list):
+                yield from spread_out(tweet_entries(payload, filename))
+            else:
+                yield from spread_out(text_entries(json.dumps(payload, indent=2), filename, fallback))
+    except Exception:
+        st.warning(f"Could not read all of {filename}.")
+
+
+@st.cache_data(max_entries=32, show_spinner="Reading your files...")
+def read_upload(filename: str, mime: str, data: bytes) -> Tuple[List[Dict], bool]:
+    """One upload's entries up to its FILE_CHARS share, in document order; cached per file content."""
+    return take_evenly([file_entries(filename, mime, data)], budget=FILE_CHARS, per_source=FILE_CHARS)
+
+
+@contextmanager
+def period_pool():
+    """A pool whose queued calls are dropped, not waited for, when the job stops early."""
+    pool = ThreadPoolExecutor(max_workers=PERIOD_WORKERS)
+    try:
+        yield pool
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+
+def summarize_period(period: str, stats: Dict, text: str) -> str:
+    """A short summary of one period from a bounded, evenly spaced sample of it."""
+    prompt = f"""
+You are EchoMind. Below is a sample of what someone wrote during {period}
+({stats['entries']} pieces, {stats['words']} words, lexicon sentiment {stats['sentiment']:+.2f} on -1..1).
+
+{text}
+
+In under 150 words describe what they were preoccupied with, their emotional tone,
+their voice and maturity, and any context of the time the writing reveals. Use "you".
+"""
+    return model.generate_content(prompt, op="period").text
+
+
+def combine_summaries(labelled: List[tuple]) -> str:
+    first, last = labelled[0][0], labelled[-1][0]
+    listing = "\n\n".join(f"{label}:\n{summary}" for label, summary in labelled)
+    prompt = f"""
+Condense these consecutive period summaries of someone's writing ({first} to {last})
+into one summary of under 200 words that keeps what changed between periods:
+
+{listing}
+"""
+    return model.generate_content(prompt, op="period").text
+
+
+def reflect(ctx, entries: List[Dict], freq: str) -> Dict:
+    """Job: summarize every period in parallel, condense in rounds, then write the reflection."""
+    df = bucket(entries, freq)
+    stats = period_stats(df)
+    texts = df.groupby("period", sort=False)["text"].agg(list)
+    periods = list(stats.index)
+    summaries: Dict[str, str] = {}
+    ctx.set_progress(0.0, f"Summarizing {len(periods)} periods...")
+    with period_pool() as pool:
+        futures = {
+            pool.submit(summarize_period, period, stats.loc[period], sample(texts[period])): period
+            for period in periods
+        }
+        for future in as_completed(futures):
+            ctx.check()
+            summaries[futures[future]] = future.result()
+            ctx.set_progress(0.8 * len(summaries) / len(periods), f"Summarized {len(summaries)}/{len(periods)} periods")
+
+    labelled = [(period, summaries[period]) for period in periods]
+    while len(labelled) > MAX_FINAL_SUMMARIES:
+        ctx.check()
+        ctx.set_progress(0.85, "Condensing period summaries...")
+        groups = [labelled[i:i + MAX_FINAL_SUMMARIES] for i in range(0, len(labelled), MAX_FINAL_SUMMARIES)]
+        with period_pool() as pool:
+            condensed = list(pool.map(combine_summaries, groups))
+        labelled = [(f"{group[0][0]} to {group[-1][0]}", text) for group, text in zip(groups, condensed)]
+
+    ctx.set_progress(0.9, "Writing your reflection...")
+    timeline = "\n\n".join(f"{label}:\n{summary}" for label, summary in labelled)
+    reflection = model.generate_content(f"""
+You are EchoMind — an empathetic, insightful analyst who helps people understand their past mindset.
+
+Below is a period-by-period account of everything I wrote (from files: {', '.join(df['source'].unique())}).
+Per-period stats (entries, words, distinct words, variety, sentiment):
+{stats.to_string()}
+
+{timeline}
+
+Explain WHY I likely thought, felt, or wrote this way, and how that changed over time, considering:
+- Probable age and life stage
+- Language patterns, emotional tone, maturity level
+- Cultural, social, or technological context of the time
+- Common psychological development
+
+Be kind, non-judgmental, and deeply understanding. Use "you" to speak directly.
+Clearly label inferences (e.g., "It seems you were...").
+Structure: Insightful paragraphs + bullet points for key factors.
+""").text
+    return {"periods": [{"period": p, "summary": summaries[p]} for p in periods], "reflection": reflection}
 
 st.set_page_config(page_title="EchoMind", page_icon="🧠", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -38,70 +190,43 @@ uploaded_files = st.file_uploader(
 )
 
 if uploaded_files:
-    all_text = ""
-    file_info = []
-
-    for file in uploaded_files:
-        content = ""
-        filename = file.name
-
-        if file.type == "text/plain":
-            content = file.read().decode("utf-8", errors="ignore")
-        elif file.type == "application/pdf":
-            try:
-                reader = PdfReader(file)
-                content = "\n".join([page.extract_text() or "" for page in reader.pages])
-            except:
-                content = "[Error reading PDF]"
-        elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            try:
-                doc = Document(file)
-                content = "\n".join([para.text for para in doc.paragraphs])
-            except:
-                content = "[Error reading DOCX]"
-        elif file.type == "application/json":
-            try:
-                data = json.load(file)
-                if isinstance(data, list):
-                    content = "\n".join([item.get('full_text') or item.get('text', '') for item in data])
-                else:
-                    content = json.dumps(data, indent=2)
-            except:
-                content = "[Error reading JSON]"
-
-        if content.strip():
-            all_text += f"\n\n--- From {filename} ---\n{content[:15000]}"
-            file_info.append(filename)
-
-    if all_text.strip():
-        with st.spinner("EchoMind is reflecting on your past self..."):
-            try:
-                response = model.generate_content(f"""
-You are EchoMind — an empathetic, insightful analyst who helps people understand their past mindset.
-
-Analyze this content I created in the past (from files: {', '.join(file_info)}):
-
-{all_text[:20000]}
-
-Explain WHY I likely thought, felt, or wrote this way, considering:
-- Probable age and life stage
-- Language patterns, emotional tone, maturity level
-- Cultural, social, or technological context of the time
-- Common psychological development
-
-Be kind, non-judgmental, and deeply understanding. Use "you" to speak directly.
-Clearly label inferences (e.g., "It seems you were...").
-Structure: Insightful paragraphs + bullet points for key factors.
-""")
-                insight = response.text
-
-                st.success("Analysis complete")
-                st.markdown("### Why Your Past Self Thought This Way")
-                st.markdown(insight)
-
-                st.caption("EchoMind uses Gemini AI for interpretation — this is an educated reflection, not absolute truth.")
-            except Exception as e:
-                st.error(f"Analysis failed: {str(e)}")
+    # Each file is read (up to its share) once per content; reruns reuse it
+    per_file = [read_upload(file.name, file.type, file.getvalue()) for file in uploaded_files]
+    entries, complete = take_evenly([spread_out(found) for found, _ in per_file])
+    complete = complete and all(done for _, done in per_file)
+    file_info = sorted({entry["source"] for entry in entries})
+
+    if entries:
+        granularity = st.radio("Group your writing by", list(FREQS), horizontal=True)
+        freq = FREQS[granularity] or choose_freq(entries)
+        stats = period_stats(bucket(entries, freq))
+
+        st.markdown("### Your archive over time")
+        st.caption(f"{len(entries)} pieces from {len(file_info)} files across {len(stats)} periods.")
+        if not complete:
+            st.caption("Large upload: EchoMind read an evenly spread sample from every file rather than all of it.")
+        st.bar_chart(stats["words"])
+        st.dataframe(stats, use_container_width=True)
+
+        # Reflecting costs one call per period, so it starts only on request
+        inputs = jobs.make_key(PAGE, entries, freq)
+        if st.button("Reflect on my past self", type="primary"):
+            jobs.submit(PAGE, reflect, entries, freq, key_parts=(entries, freq), force=True)
+            st.session_state["echomind_inputs"] = inputs
+        job = jobs.current(PAGE)
+        if job and st.session_state.get("echomind_inputs") != inputs:
+            st.caption("Your files or grouping changed since the last reflection. Reflect again to update it.")
+        elif job and jobs.track(job, "Reflection"):
+            st.success("Analysis complete")
+            st.markdown("### Why Your Past Self Thought This Way")
+            st.markdown(job.result["reflection"])
+
+            st.markdown("### Period by period")
+            for item in job.result["periods"]:
+                with st.expander(item["period"]):
+                    st.markdown(item["summary"])
+
+            st.caption("EchoMind uses Gemini AI for interpretation — this is an educated reflection, not absolute truth.")
     else:
         st.warning("No readable text found in uploaded files.")
 
@@ -1,6 +1,8 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
-import base64
+from google.generativeai import configure
+from hub.export import download_buttons
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -9,9 +11,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("failforward")
 
 st.set_page_config(page_title="FailForward", page_icon="🔥", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -78,25 +81,12 @@ Tone: Confident, authentic, inspiring.
                 st.markdown("### Your FailForward Profile")
                 st.markdown(reverse_resume)
 
-                # Simple HTML "PDF" alternative (downloadable)
-                html_content = f"""
-                <html>
-                <head><title>FailForward Profile</title></head>
-                <body style="font-family: Arial, sans-serif; padding: 40px;">
-                <h1 style="text-align: center; color: #ff4757;">FailForward Profile</h1>
-                <pre style="white-space: pre-wrap; font-family: Arial;">{reverse_resume}</pre>
-                </body>
-                </html>
-                """
-
-                html_bytes = html_content.encode('utf-8')
-                html_base64 = base64.b64encode(html_bytes).decode('utf-8')
-
-                st.download_button(
-                    label="📥 Download as HTML (open in browser & print to PDF)",
-                    data=html_base64,
-                    file_name="failforward_profile.html",
-                    mime="text/html"
+                download_buttons(
+                    reverse_resume,
+                    "failforward_profile",
+                    "FailForward Profile",
+                    formats=("pdf", "docx", "html", "md"),
+                    accent="#ff4757"
                 )
 
                 st.caption("FailForward uses Gemini AI to reframe experience — this is your story, powerfully told.")
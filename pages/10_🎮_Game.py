@@ -3,14 +3,19 @@ import pandas as pd
 import plotly.express as px
 import uuid
 from datetime import datetime
-from google.generativeai import GenerativeModel, configure
-import json
+from google.generativeai import configure
 import time
+from dataclasses import asdict, dataclass
+from typing import List
+from hub.llm import get_model
+from hub.structured import generate_json
+from hub import profiling
 
 # ===============================
 # PAGE CONFIG & MOBILE OPTIMIZATION
 # ===============================
 st.set_page_config(page_title="MindGames AI", page_icon="🧩", layout="centered")
+profiling.start()
 st.markdown("""
 <style>
 .block-container { max-width: 720px; padding: 1rem; }
@@ -28,7 +33,7 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel("gemini-2.5-flash")
+model = get_model("game")
 
 # ===============================
 # SESSION STATE
@@ -73,23 +78,84 @@ def reset_round():
             del st.session_state[k]
     st.session_state.step = "start"
 
+# ===============================
+# ROUND MODELS
+# ===============================
+def _match_option(answer, options):
+    """The option the answer refers to, ignoring case and spacing."""
+    for option in options:
+        if option.strip().lower() == answer.strip().lower():
+            return option
+    raise ValueError(f"answer {answer!r} is not one of the options")
+
+@dataclass
+class Riddle:
+    riddle: str
+    answer: str
+    reason: str
+
+@dataclass
+class QuizQuestion:
+    question: str
+    options: List[str]
+    answer: str
+
+    def __post_init__(self):
+        if len(self.options) < 2:
+            raise ValueError("a question needs at least two options")
+        self.answer = _match_option(self.answer, self.options)
+
+@dataclass
+class DataRow:
+    Category: str
+    Value: int
+
+@dataclass
+class DataPuzzle:
+    data: List[DataRow]
+
+    def __post_init__(self):
+        if not 3 <= len(self.data) <= 5:
+            raise ValueError("the dataset needs 3-5 rows")
+
+@dataclass
+class LogicPuzzle:
+    problem: str
+    options: List[str]
+    answer: str
+    explanation: str
+
+    def __post_init__(self):
+        if len(self.options) < 2:
+            raise ValueError("a puzzle needs at least two options")
+        self.answer = _match_option(self.answer, self.options)
+
+@dataclass
+class Pattern:
+    pattern: List[int]
+
+    def __post_init__(self):
+        if len(self.pattern) != 5:
+            raise ValueError("the pattern needs exactly 5 numbers")
+
+@dataclass
+class Score:
+    score: int
+    feedback: str
+
+    def __post_init__(self):
+        self.score = max(0, min(self.score, 10))
+
 # ===============================
 # AI HELPER
 # ===============================
-def generate_ai(prompt):
+def generate_round(prompt, model_class, op):
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return generate_json(model, prompt, model_class, op=op)
     except Exception as e:
         st.error(f"AI generation failed: {str(e)}")
         return None
 
-def parse_json(text):
-    try:
-        return json.loads(text)
-    except Exception:
-        return None
-
 # ===============================
 # GAME 1: RIDDLE CHALLENGE
 # ===============================
@@ -103,22 +169,22 @@ Return ONLY valid JSON:
 {"riddle":"...", "answer":"...", "reason":"..."}
 Make it fun and intellectual.
 """
-            data = parse_json(generate_ai(prompt))
+            data = generate_round(prompt, Riddle, "riddle")
             if data:
                 st.session_state.round_riddle = data
                 st.session_state.step = "answer"
 
     if st.session_state.step == "answer":
-        st.markdown(f"### {st.session_state.round_riddle['riddle']}")
+        st.markdown(f"### {st.session_state.round_riddle.riddle}")
         user_answer = st.text_input("Your answer")
         if st.button("Submit Answer"):
-            if user_answer.lower().strip() == st.session_state.round_riddle["answer"].lower().strip():
+            if user_answer.lower().strip() == st.session_state.round_riddle.answer.lower().strip():
                 st.success("Correct! 🎉")
                 st.session_state.score += 10
             else:
                 st.error("Incorrect ❌")
-                st.info(f"**Correct Answer:** {st.session_state.round_riddle['answer']}")
-                st.markdown(f"**Reason:** {st.session_state.round_riddle['reason']}")
+                st.info(f"**Correct Answer:** {st.session_state.round_riddle.answer}")
+                st.markdown(f"**Reason:** {st.session_state.round_riddle.reason}")
             st.session_state.step = "result"
 
     if st.session_state.step == "result":
@@ -139,21 +205,21 @@ Return ONLY valid JSON:
 {{"question":"...","options":["...","...","...","..."],"answer":"..."}}
 Generate a single multiple-choice question on the topic: {topic}.
 """
-            data = parse_json(generate_ai(prompt))
+            data = generate_round(prompt, QuizQuestion, "quiz")
             if data:
                 st.session_state.round_question = data
                 st.session_state.step = "answer"
 
     if st.session_state.step == "answer":
-        st.markdown(st.session_state.round_question["question"])
-        choice = st.radio("Select answer", st.session_state.round_question["options"], key="quiz_choice")
+        st.markdown(st.session_state.round_question.question)
+        choice = st.radio("Select answer", st.session_state.round_question.options, key="quiz_choice")
         if st.button("Submit Answer"):
-            if choice == st.session_state.round_question["answer"]:
+            if choice == st.session_state.round_question.answer:
                 st.success("Correct! 🎉")
                 st.session_state.score += 10
             else:
                 st.error("Incorrect ❌")
-                st.info(f"**Correct Answer:** {st.session_state.round_question['answer']}")
+                st.info(f"**Correct Answer:** {st.session_state.round_question.answer}")
             st.session_state.step = "result"
 
     if st.session_state.step == "result":
@@ -172,9 +238,9 @@ Return ONLY valid JSON:
 {"data":[{"Category":"A","Value":..},{"Category":"B","Value":..},{"Category":"C","Value":..}]}
 Generate a small random dataset with 3-5 rows and integer values.
 """
-        data = parse_json(generate_ai(prompt))
+        data = generate_round(prompt, DataPuzzle, "data_puzzle")
         if data:
-            df = pd.DataFrame(data["data"])
+            df = pd.DataFrame([asdict(row) for row in data.data])
             st.session_state.round_data = df
             st.session_state.step = "answer"
 
@@ -187,11 +253,11 @@ Generate a small random dataset with 3-5 rows and integer values.
 Evaluate the user's guess: "{guess}" for the dataset: {st.session_state.round_data.to_dict(orient='records')}
 Return JSON: {{"score":int,"feedback":"..."}}.
 """
-            result = parse_json(generate_ai(prompt))
+            result = generate_round(prompt, Score, "data_score")
             if result:
-                st.info(f"AI Feedback: {result['feedback']}")
-                st.success(f"Points Earned: {result['score']}")
-                st.session_state.score += result["score"]
+                st.info(f"AI Feedback: {result.feedback}")
+                st.success(f"Points Earned: {result.score}")
+                st.session_state.score += result.score
             st.session_state.step = "result"
 
     if st.session_state.step == "result":
@@ -210,22 +276,22 @@ Return ONLY valid JSON:
 {"problem":"...", "options":["Yes","No"], "answer":"...","explanation":"..."}
 Generate a reasoning/logical puzzle.
 """
-        data = parse_json(generate_ai(prompt))
+        data = generate_round(prompt, LogicPuzzle, "logic")
         if data:
             st.session_state.round_logic = data
             st.session_state.step = "answer"
 
     if st.session_state.step == "answer":
-        st.markdown(st.session_state.round_logic["problem"])
-        choice = st.radio("Answer", st.session_state.round_logic["options"], key="logic_choice")
+        st.markdown(st.session_state.round_logic.problem)
+        choice = st.radio("Answer", st.session_state.round_logic.options, key="logic_choice")
         if st.button("Submit Answer"):
-            if choice == st.session_state.round_logic["answer"]:
+            if choice == st.session_state.round_logic.answer:
                 st.success("Correct! 🎉")
                 st.session_state.score += 10
             else:
                 st.error("Incorrect ❌")
-                st.info(f"Correct Answer: {st.session_state.round_logic['answer']}")
-                st.markdown(f"Explanation: {st.session_state.round_logic['explanation']}")
+                st.info(f"Correct Answer: {st.session_state.round_logic.answer}")
+                st.markdown(f"Explanation: {st.session_state.round_logic.explanation}")
             st.session_state.step = "result"
 
     if st.session_state.step == "result":
@@ -244,9 +310,9 @@ Return ONLY valid JSON:
 {"pattern":[.., .., .., .., ..]}
 Generate a random 5-number sequence for memory challenge.
 """
-        data = parse_json(generate_ai(prompt))
+        data = generate_round(prompt, Pattern, "pattern")
         if data:
-            st.session_state.round_pattern = data["pattern"]
+            st.session_state.round_pattern = data.pattern
             st.session_state.step = "memorize"
 
     if st.session_state.step == "memorize":
@@ -264,11 +330,11 @@ User entered: {user_pattern}
 Original pattern: {st.session_state.round_pattern}
 Return JSON: {{"score":int,"feedback":"..."}} evaluating correctness.
 """
-                result = parse_json(generate_ai(prompt))
+                result = generate_round(prompt, Score, "pattern_score")
                 if result:
-                    st.info(f"AI Feedback: {result['feedback']}")
-                    st.success(f"Points Earned: {result['score']}")
-                    st.session_state.score += result["score"]
+                    st.info(f"AI Feedback: {result.feedback}")
+                    st.success(f"Points Earned: {result.score}")
+                    st.session_state.score += result.score
             except Exception:
                 st.error("Invalid input format. Use comma-separated numbers.")
             st.session_state.step = "result"
@@ -1,8 +1,10 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from PyPDF2 import PdfReader
 from docx import Document
 import json
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -11,9 +13,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("ghostly")
 
 st.set_page_config(page_title="GhostReply", page_icon="👻", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
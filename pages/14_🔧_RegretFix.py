@@ -1,5 +1,7 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -8,9 +10,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("regretfix")
 
 st.set_page_config(page_title="FutureYou", page_icon="⏳", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
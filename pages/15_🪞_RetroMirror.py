@@ -1,5 +1,7 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -8,9 +10,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("retromirror")
 
 st.set_page_config(page_title="RegretMirror", page_icon="🪞", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -21,7 +24,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 st.markdown('<p class="big-font">🪞 RegretMirror</p>', unsafe_allow_html=True)
-st.markdown('<p class="subheader">See your life from the deathbed — what you'll regret, what you'll be proud of.</p>', unsafe_allow_html=True)
+st.markdown("<p class='subheader'>See your life from the deathbed — what you'll regret, what you'll be proud of.</p>", unsafe_allow_html=True)
 
 st.markdown("<div class='warning-box'>This app simulates your future self at the end of life reflecting on today's choices. It's inspired by real regrets of the dying — use it for clarity, not fear.</div>", unsafe_allow_html=True)
 
@@ -1,7 +1,9 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from datetime import datetime
 import json
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -10,9 +12,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("skillguard")
 
 st.set_page_config(page_title="SkillRust", page_icon="🛠️", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
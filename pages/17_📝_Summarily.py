@@ -8,12 +8,13 @@ hide_streamlit_style = """
             </style>
             """
 st.markdown(hide_streamlit_style, unsafe_allow_html=True)
-from google.generativeai import GenerativeModel, configure
-import google.generativeai as genai
+from google.generativeai import configure
 from PyPDF2 import PdfReader
 from docx import Document
 from PIL import Image
 import io
+from hub import jobs, profiling
+from hub.llm import get_model, upload_file
 
 # Secure Gemini API key
 try:
@@ -22,37 +23,20 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("summarily")
 
-st.set_page_config(page_title="Summarily", page_icon="📚", layout="wide")
+UPLOAD_PAGE = "summarily_upload"
+SEARCH_PAGE = "summarily_search"
 
-# Fixed: Add unsafe_allow_html=True to ALL style/markdown with HTML/CSS
-st.markdown("""
-<style>
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    .big-font { font-size:50px !important; font-weight:bold; text-align:center; color:#3498db; }
-    .subheader { font-size:24px; color:#cccccc; text-align:center; margin-bottom:40px; }
-</style>
-""", unsafe_allow_html=True)
 
-st.markdown('<p class="big-font">📚 Summarily</p>', unsafe_allow_html=True)
-st.markdown('<p class="subheader">Chapter-by-chapter book summaries — upload or search.</p>', unsafe_allow_html=True)
+def summarize_upload(ctx, file_bytes, mime_type):
+    """Background job: upload the book to Gemini and summarize it chapter by chapter."""
+    ctx.set_progress(0.1, "Uploading book...")
+    gemini_file = upload_file("summarily", file_bytes, mime_type=mime_type)
+    ctx.check()
+    ctx.set_progress(0.3, "Summarizing chapters...")
 
-mode = st.radio("How do you want to summarize?", ["Upload Book File", "Search by Details"])
-
-if mode == "Upload Book File":
-    st.header("Upload Your Book")
-    uploaded_file = st.file_uploader("PDF, DOCX, or Image (scanned pages)", type=['pdf', 'docx', 'jpg', 'jpeg', 'png'])
-
-    if uploaded_file:
-        st.image(uploaded_file, caption="Uploaded File", use_column_width=True) if uploaded_file.type.startswith('image') else st.info("File uploaded")
-
-        with st.spinner("Extracting and summarizing..."):
-            try:
-                gemini_file = genai.upload_file(uploaded_file, mime_type=uploaded_file.type)
-
-                prompt = """
+    prompt = """
 You are Summarily — an expert book summarizer.
 
 This is a book file (PDF, DOCX, or scanned images).
@@ -65,32 +49,13 @@ Task:
 
 Be accurate and insightful.
 """
+    return model.generate_content([gemini_file, prompt], op="upload").text
 
-                response = model.generate_content([gemini_file, prompt])
-                summary = response.text
-
-                st.success("Summary complete")
-                st.markdown("### Chapter-by-Chapter Summary")
-                st.markdown(summary)
-
-            except Exception as e:
-                st.error(f"Summarization failed: {str(e)}")
-
-elif mode == "Search by Details":
-    st.header("Search for Book Summary")
-    title = st.text_input("Book Title (required)")
-    author = st.text_input("Author Name (optional)")
-    publisher = st.text_input("Publisher (optional)")
-    pub_date = st.text_input("Publication Year (optional)")
-    sample_lines = st.text_area("Few lines from any chapter (optional — helps accuracy)", height=100)
 
-    if st.button("Generate Summary"):
-        if not title.strip():
-            st.warning("Title is required.")
-        else:
-            with st.spinner("Searching and summarizing..."):
-                try:
-                    prompt = f"""
+def summarize_search(ctx, title, author, publisher, pub_date, sample_lines):
+    """Background job: summarize a published book from its details."""
+    ctx.set_progress(0.1, "Searching and summarizing...")
+    prompt = f"""
 You are Summarily — an expert book summarizer with knowledge of published books.
 
 Book details:
@@ -110,16 +75,66 @@ If unsure or author missing, note limitations and do your best.
 
 Structure clearly with headings.
 """
+    return model.generate_content(prompt, op="search").text
 
-                    response = model.generate_content(prompt)
-                    summary = response.text
 
-                    st.success("Summary generated")
-                    st.markdown("### Book Summary")
-                    st.markdown(summary)
+st.set_page_config(page_title="Summarily", page_icon="📚", layout="wide")
+profiling.start()
 
-                except Exception as e:
-                    st.error(f"Summarization failed: {str(e)}")
+# Fixed: Add unsafe_allow_html=True to ALL style/markdown with HTML/CSS
+st.markdown("""
+<style>
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    .big-font { font-size:50px !important; font-weight:bold; text-align:center; color:#3498db; }
+    .subheader { font-size:24px; color:#cccccc; text-align:center; margin-bottom:40px; }
+</style>
+""", unsafe_allow_html=True)
+
+st.markdown('<p class="big-font">📚 Summarily</p>', unsafe_allow_html=True)
+st.markdown('<p class="subheader">Chapter-by-chapter book summaries — upload or search.</p>', unsafe_allow_html=True)
+
+mode = st.radio("How do you want to summarize?", ["Upload Book File", "Search by Details"])
+
+if mode == "Upload Book File":
+    st.header("Upload Your Book")
+    uploaded_file = st.file_uploader("PDF, DOCX, or Image (scanned pages)", type=['pdf', 'docx', 'jpg', 'jpeg', 'png'])
+
+    if uploaded_file:
+        st.image(uploaded_file, caption="Uploaded File", use_column_width=True) if uploaded_file.type.startswith('image') else st.info("File uploaded")
+
+        file_bytes = uploaded_file.getvalue()
+        jobs.submit(
+            UPLOAD_PAGE, summarize_upload, file_bytes, uploaded_file.type,
+            key_parts=(file_bytes, uploaded_file.type),
+        )
+
+    job = jobs.current(UPLOAD_PAGE)
+    if job and jobs.track(job, "Summarization"):
+        st.success("Summary complete")
+        st.markdown("### Chapter-by-Chapter Summary")
+        st.markdown(job.result)
+
+elif mode == "Search by Details":
+    st.header("Search for Book Summary")
+    title = st.text_input("Book Title (required)")
+    author = st.text_input("Author Name (optional)")
+    publisher = st.text_input("Publisher (optional)")
+    pub_date = st.text_input("Publication Year (optional)")
+    sample_lines = st.text_area("Few lines from any chapter (optional — helps accuracy)", height=100)
+
+    if st.button("Generate Summary"):
+        if not title.strip():
+            st.warning("Title is required.")
+        else:
+            details = (title, author, publisher, pub_date, sample_lines)
+            jobs.submit(SEARCH_PAGE, summarize_search, *details, key_parts=details, force=True)
+
+    job = jobs.current(SEARCH_PAGE)
+    if job and jobs.track(job, "Summarization"):
+        st.success("Summary generated")
+        st.markdown("### Book Summary")
+        st.markdown(job.result)
 
 st.markdown("---")
 st.caption("Summarily • Books distilled • Powered by Gemini AI")
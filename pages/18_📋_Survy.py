@@ -1,7 +1,9 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
 from datetime import datetime
 import json
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -10,9 +12,10 @@ except KeyError:
     st.error("Gemini API key not found. Add GEMINI_API_KEY to Streamlit secrets.")
     st.stop()
 
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("survy")
 
 st.set_page_config(page_title="SurveyForge", page_icon="📊", layout="wide")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -82,7 +85,8 @@ with tab2:
 
 with tab3:
     st.header("View Survey Insights")
-    survey_id = st.selectbox("Select Survey", options=list(st.session_state.surveys.keys()), format_func=lambda x: st.session_state.surveys[x]['title'])
+    surveys = st.session_state.surveys
+    survey_id = st.selectbox("Select Survey", options=list(surveys.keys()), format_func=lambda x: surveys[x]['title'])
     
     if survey_id:
         survey = st.session_state.surveys[survey_id]
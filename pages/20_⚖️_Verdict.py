@@ -1,5 +1,7 @@
 import streamlit as st
-from google.generativeai import GenerativeModel, configure
+from google.generativeai import configure
+from hub.llm import get_model
+from hub import profiling
 
 # Secure Gemini API key
 try:
@@ -9,9 +11,10 @@ except KeyError:
     st.stop()
 
 # Current stable Gemini model as of January 2026
-model = GenerativeModel('gemini-2.5-flash')
+model = get_model("verdict")
 
 st.set_page_config(page_title="Verdict", page_icon="⚖️", layout="centered")
+profiling.start()
 
 st.markdown("""
 <style>
@@ -3,6 +3,8 @@ import requests
 from PIL import Image
 import io
 import os
+from hub import metrics, profiling
+from hub.artifacts import derived_key, get_store
 
 # ─── CONFIG ───────────────────────────────────────────────────────────────
 API_KEY = "AkeMEkvNPdCEXEQEJc1b9Bjs"           # ← Your remove.bg API key
@@ -13,9 +15,9 @@ st.set_page_config(
     page_icon="🖼️",
     layout="wide"
 )
+profiling.start()
 
 # ─── FUNCTIONS ────────────────────────────────────────────────────────────
-@st.cache_data(ttl=3600)  # cache results for 1 hour
 def remove_background(image_bytes):
     """Call remove.bg API and return image without background (PNG)"""
     headers = {
@@ -30,17 +32,21 @@ def remove_background(image_bytes):
         "type": "auto"
     }
 
+    call = metrics.start_call("image", "bgforge", "remove.bg", op="removebg", bytes_sent=len(image_bytes))
     try:
         response = requests.post(API_URL, headers=headers, files=files, data=data)
         
         if response.status_code == 200:
+            call.finish()
             return response.content
         else:
+            call.finish(f"HTTP{response.status_code}")
             error = response.json().get("errors", [{}])[0].get("title", "Unknown error")
             st.error(f"API Error ({response.status_code}): {error}")
             return None
             
     except Exception as e:
+        call.finish(e)
         st.error(f"Request failed: {str(e)}")
         return None
 
@@ -71,15 +77,17 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file is not None:
-    # Show original
-    original_bytes = uploaded_file.read()
-    original_img = Image.open(io.BytesIO(original_bytes))
+    # Originals, cutouts and composites live in the artifact store; the page
+    # only shows WebP previews and reads lossless PNGs for downloads.
+    store = get_store()
+    original = store.put_bytes(uploaded_file.getvalue())
+    base_name = uploaded_file.name.split('.')[0]
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Original")
-        st.image(original_img, use_column_width=True)
+        st.image(store.preview(original, "bgforge"), use_column_width=True)
     
     # ── Processing options ────────────────────────────────────────────────
     st.markdown("### What would you like to do?")
@@ -90,32 +98,33 @@ if uploaded_file is not None:
         key="mode"
     )
 
-    result_bytes = None
-    processed_img = None
-
     # ── Remove background ─────────────────────────────────────────────────
     if st.button("✂️ Process Image", type="primary", use_container_width=True):
         with st.spinner("Removing background... (usually 3–8 seconds)"):
-            result_bytes = remove_background(original_bytes)
-            
-            if result_bytes:
-                processed_img = Image.open(io.BytesIO(result_bytes))
-                
-                with col2:
-                    st.subheader("Result")
-                    st.image(processed_img, use_column_width=True)
-                
-                # Download button for transparent PNG
-                st.download_button(
-                    label="⬇️ Download Transparent PNG",
-                    data=result_bytes,
-                    file_name=f"no_background_{uploaded_file.name.split('.')[0]}.png",
-                    mime="image/png",
-                    use_container_width=True
-                )
+            # remove.bg is only called the first time a given image is processed
+            cutout = store.derive(original, "removebg", lambda source: remove_background(source.read()))
+            st.session_state.bg_cutout = cutout.key if cutout else None
+
+    cutout = None
+    if st.session_state.get("bg_cutout") == derived_key(original.key, "removebg"):
+        cutout = store.get(st.session_state.bg_cutout)
+
+    if cutout is not None:
+        with col2:
+            st.subheader("Result")
+            st.image(store.preview(cutout, "bgforge"), use_column_width=True)
+        
+        # Download button for transparent PNG
+        st.download_button(
+            label="⬇️ Download Transparent PNG",
+            data=cutout.read,
+            file_name=f"no_background_{base_name}.png",
+            mime="image/png",
+            use_container_width=True
+        )
 
     # ── Replace background ────────────────────────────────────────────────
-    if option == "Replace background" and result_bytes is not None:
+    if option == "Replace background" and cutout is not None:
         st.markdown("### Choose or upload new background")
         
         bg_option = st.radio("Background source", 
@@ -127,7 +136,7 @@ if uploaded_file is not None:
         
         if bg_option == "Solid color":
             color = st.color_picker("Pick background color", "#00ff9d")
-            bg_image = Image.new("RGBA", processed_img.size, color + "ff")  # with alpha
+            bg_image = Image.new("RGBA", cutout.open().size, color + "ff")  # with alpha
         else:
             bg_upload = st.file_uploader("Upload background image", 
                                         type=["png","jpg","jpeg"], 
@@ -137,19 +146,17 @@ if uploaded_file is not None:
 
         if bg_image and st.button("🔄 Apply New Background"):
             with st.spinner("Compositing new background..."):
-                final_img = replace_background(result_bytes, bg_image)
+                final_img = replace_background(cutout.read(), bg_image)
                 if final_img:
-                    final_bytes = io.BytesIO()
-                    final_img.save(final_bytes, format="PNG")
-                    final_bytes = final_bytes.getvalue()
+                    final = store.put_image(final_img)
 
                     st.subheader("Final Result")
-                    st.image(final_img, use_column_width=True)
+                    st.image(store.preview(final, "bgforge"), use_column_width=True)
 
                     st.download_button(
                         label="⬇️ Download Final Image",
-                        data=final_bytes,
-                        file_name=f"with_new_bg_{uploaded_file.name.split('.')[0]}.png",
+                        data=final.read,
+                        file_name=f"with_new_bg_{base_name}.png",
                         mime="image/png",
                         use_container_width=True
                     )
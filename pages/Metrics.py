@@ -0,0 +1,169 @@
+import streamlit as st
+import pandas as pd
+from hub import metrics, profiling, resilience, routing
+from hub.admin import require_admin
+
+st.set_page_config(page_title="Metrics", page_icon="📈", layout="wide")
+profiling.start()
+
+require_admin()
+
+st.title("📈 Model & API Metrics")
+st.caption("Every Gemini, Replicate and remove.bg call made by this server process since it started (or since the last reset).")
+
+rows = metrics.summary_rows()
+if not rows:
+    st.info("No calls recorded yet. Use a few tools and refresh.")
+    if st.button("🔄 Refresh"):
+        st.rerun()
+    st.stop()
+
+df = pd.DataFrame(rows)
+
+# --------------------------------------------------
+# TOTALS
+# --------------------------------------------------
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Calls", f"{df['calls'].sum():,}")
+c2.metric("Errors", f"{df['errors'].sum():,}", f"{df['errors'].sum() / df['calls'].sum():.1%}", delta_color="inverse")
+c3.metric("Time in calls", f"{df['seconds_total'].sum():,.0f}s")
+c4.metric("Estimated spend", f"${df['cost_usd'].sum():,.4f}")
+
+# --------------------------------------------------
+# PER TOOL
+# --------------------------------------------------
+st.subheader("By tool")
+by_tool = df.groupby("tool").agg(
+    calls=("calls", "sum"),
+    errors=("errors", "sum"),
+    seconds_total=("seconds_total", "sum"),
+    input_tokens=("input_tokens", "sum"),
+    output_tokens=("output_tokens", "sum"),
+    bytes_sent=("bytes_sent", "sum"),
+    cost_usd=("cost_usd", "sum"),
+)
+by_tool["mean_s"] = by_tool["seconds_total"] / by_tool["calls"]
+by_tool["error_rate"] = by_tool["errors"] / by_tool["calls"]
+by_tool["latency_share"] = by_tool["seconds_total"] / by_tool["seconds_total"].sum()
+by_tool["cost_share"] = by_tool["cost_usd"] / max(by_tool["cost_usd"].sum(), 1e-12)
+by_tool["kb_sent"] = by_tool["bytes_sent"] / 1024
+by_tool = by_tool.sort_values("seconds_total", ascending=False)
+
+st.dataframe(
+    by_tool[["calls", "errors", "error_rate", "mean_s", "seconds_total", "latency_share",
+             "input_tokens", "output_tokens", "kb_sent", "cost_usd", "cost_share"]],
+    column_config={
+        "error_rate": st.column_config.NumberColumn("error rate", format="percent"),
+        "mean_s": st.column_config.NumberColumn("mean (s)", format="%.2f"),
+        "seconds_total": st.column_config.NumberColumn("total (s)", format="%.1f"),
+        "latency_share": st.column_config.ProgressColumn("share of latency", min_value=0, max_value=1, format="percent"),
+        "kb_sent": st.column_config.NumberColumn("KB sent", format="%.1f"),
+        "cost_usd": st.column_config.NumberColumn("cost ($)", format="%.4f"),
+        "cost_share": st.column_config.ProgressColumn("share of spend", min_value=0, max_value=1, format="percent"),
+    },
+    use_container_width=True,
+)
+
+st.subheader("By call site")
+st.dataframe(
+    df.sort_values("seconds_total", ascending=False),
+    column_config={
+        "p50_s": st.column_config.NumberColumn("p50 (s)", format="%.2f"),
+        "p95_s": st.column_config.NumberColumn("p95 (s)", format="%.2f"),
+        "seconds_total": st.column_config.NumberColumn("total (s)", format="%.1f"),
+        "cost_usd": st.column_config.NumberColumn("cost ($)", format="%.4f"),
+    },
+    hide_index=True,
+    use_container_width=True,
+)
+
+# --------------------------------------------------
+# LATENCY HISTOGRAM
+# --------------------------------------------------
+st.subheader("Latency histogram")
+series = {f"{s.tool} · {s.op} · {s.model}": s for s in metrics.REGISTRY.series()}
+choice = st.selectbox("Call site", ["All"] + sorted(series))
+selected = list(series.values()) if choice == "All" else [series[choice]]
+counts = [sum(s.bucket_counts[i] for s in selected) for i in range(len(metrics.BUCKETS))]
+histogram = pd.DataFrame({
+    "latency": [metrics.bucket_label(i) for i in range(len(metrics.BUCKETS))],
+    "calls": counts,
+})
+st.bar_chart(histogram, x="latency", y="calls", sort=False)
+
+# --------------------------------------------------
+# ERRORS AND CACHES
+# --------------------------------------------------
+col_errors, col_cache = st.columns(2)
+with col_errors:
+    st.subheader("Errors")
+    errors = [
+        {"tool": s.tool, "op": s.op, "model": s.model, "error": error, "count": count}
+        for s in metrics.REGISTRY.series()
+        for error, count in s.errors.items()
+    ]
+    if errors:
+        st.dataframe(pd.DataFrame(errors).sort_values("count", ascending=False), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No errors recorded.")
+
+with col_cache:
+    st.subheader("Caches")
+    cache_rows = [
+        {"cache": name, "key": tool, "hits": hits, "misses": misses, "hit_rate": hits / max(hits + misses, 1)}
+        for (name, tool), (hits, misses) in sorted(metrics.REGISTRY.cache.items())
+    ]
+    if cache_rows:
+        st.dataframe(
+            pd.DataFrame(cache_rows),
+            column_config={"hit_rate": st.column_config.NumberColumn("hit rate", format="percent")},
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("No cache lookups recorded.")
+
+# --------------------------------------------------
+# RESILIENCE
+# --------------------------------------------------
+st.subheader("Retries, hedges and circuit breakers")
+col_events, col_breakers = st.columns(2)
+with col_events:
+    event_rows = [
+        {"tool": tool, "event": event, "count": count}
+        for (event, tool), count in sorted(metrics.REGISTRY.events.items())
+    ]
+    if event_rows:
+        st.dataframe(pd.DataFrame(event_rows), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No retries, hedges or timeouts so far.")
+
+with col_breakers:
+    breakers = resilience.breaker_states()
+    if breakers:
+        st.dataframe(pd.DataFrame(breakers), hide_index=True, use_container_width=True)
+    else:
+        st.caption("No model calls yet.")
+
+# --------------------------------------------------
+# ROUTING
+# --------------------------------------------------
+st.subheader("Model routing")
+st.caption("Model each tool would use right now. Pin with HUB_MODEL_<TOOL> (a model or a tier).")
+st.dataframe(pd.DataFrame(routing.snapshot()), hide_index=True, use_container_width=True)
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+st.markdown("---")
+with st.expander("Prometheus text export"):
+    export = metrics.prometheus_text()
+    st.download_button("Download metrics.prom", export, file_name="metrics.prom", mime="text/plain")
+    st.code(export, language=None)
+
+col_refresh, col_reset = st.columns(2)
+if col_refresh.button("🔄 Refresh", use_container_width=True):
+    st.rerun()
+if col_reset.button("🗑️ Reset counters", use_container_width=True):
+    metrics.REGISTRY.reset()
+    st.rerun()
@@ -0,0 +1,93 @@
+from hub.archive import (
+    UNDATED, bucket, choose_freq, period_stats, sample, spread, take_evenly, text_entries, tweet_entries,
+)
+
+
+def entry(date, text, source="a.txt"):
+    return {"date": date, "text": text, "source": source}
+
+
+ENTRIES = [
+    entry("2019-02-01", "I love my great new job"),
+    entry("2019-03-15", "Work is awful and I hate the commute"),
+    entry(None, "An undated musing"),
+    entry("2018-11-30", "Great great day"),
+    entry("2019-07-04", "Fireworks tonight"),
+]
+
+
+def test_entries_from_tweets_and_dated_text():
+    tweets = tweet_entries([{"tweet": {"created_at": "Wed Oct 10 20:19:24 +0000 2018", "full_text": "hello world"}}, "junk"], "tweets.json")
+    assert tweets == [entry("2018-10-10", "hello world", "tweets.json")]
+    notes = text_entries("Undated paragraph long enough.\n\n## 2020-05-06\nA dated paragraph long enough.", "j.md")
+    assert [note["date"] for note in notes] == [None, "2020-05-06"]
+
+
+def test_choose_freq_switches_to_years_for_long_spans():
+    assert choose_freq(ENTRIES) == "Q"
+    assert choose_freq([entry("2010-01-01", "x"), entry("2020-01-01", "y")]) == "Y"
+    assert choose_freq([entry(None, "x")]) == "Q"
+
+
+def test_bucket_orders_periods_with_undated_last():
+    df = bucket(ENTRIES, "Q")
+    assert list(df["period"]) == ["2018Q4", "2019Q1", "2019Q1", "2019Q3", UNDATED]
+
+
+def test_period_stats():
+    stats = period_stats(bucket(ENTRIES, "Q"))
+    assert list(stats.index) == ["2018Q4", "2019Q1", "2019Q3", UNDATED]
+    assert list(stats["entries"]) == [1, 2, 1, 1]
+    assert stats.loc["2018Q4", "words"] == 3 and stats.loc["2018Q4", "vocabulary"] == 2
+    assert stats.loc["2018Q4", "variety"] == round(2 / 3, 3)
+    assert stats.loc["2018Q4", "sentiment"] > 0
+    assert stats.loc["2019Q3", "sentiment"] == 0
+
+
+def test_sample_spreads_entries_within_the_budget():
+    texts = [f"entry {n:03d}" for n in range(100)]
+    picked = sample(texts, max_chars=120).split("\n\n")
+    assert len("\n\n".join(picked)) <= 120
+    assert picked[0] == "entry 000" and picked[-1] > "entry 080"
+    assert sample(texts[:3]) == "entry 000\n\nentry 001\n\nentry 002"
+
+
+def test_spread_covers_the_range_coarse_to_fine():
+    assert list(spread(8)) == [0, 4, 2, 6, 1, 3, 5, 7]
+    assert sorted(spread(37)) == list(range(37))
+    assert list(spread(0)) == [] and list(spread(1)) == [0]
+
+
+def pages(source, count, chars=10):
+    """A lazy source that records how far it was read."""
+    source_entries = [entry(None, str(n).ljust(chars, "."), source) for n in range(count)]
+    read = []
+
+    def generate():
+        for n in spread(count):
+            read.append(n)
+            yield (n,), source_entries[n]
+
+    return generate(), read
+
+
+def test_take_evenly_stops_reading_at_the_per_source_budget():
+    big, big_read = pages("big.pdf", 500)
+    small, small_read = pages("small.txt", 3)
+    entries, complete = take_evenly([big, small], budget=10_000, per_source=100)
+    assert not complete
+    assert len(big_read) == 10 and len(small_read) == 3
+    big_pages = [int(e["text"].rstrip(".")) for e in entries if e["source"] == "big.pdf"]
+    assert big_pages == sorted(big_pages) and big_pages[-1] >= 400
+
+
+def test_take_evenly_shares_the_total_budget_between_sources():
+    sources = [pages(f"{n}.txt", 100)[0] for n in range(3)]
+    entries, complete = take_evenly(sources, budget=300, per_source=1000)
+    assert not complete and len(entries) == 30
+    assert [e["source"] for e in entries] == ["0.txt"] * 10 + ["1.txt"] * 10 + ["2.txt"] * 10
+
+
+def test_take_evenly_reads_small_uploads_completely():
+    entries, complete = take_evenly([pages("a.txt", 4)[0], pages("b.txt", 2)[0]])
+    assert complete and len(entries) == 6
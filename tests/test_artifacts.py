@@ -0,0 +1,49 @@
+import os
+import threading
+
+import pytest
+
+from hub.artifacts import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path / "artifacts"), max_bytes=10_000, preview_dir=str(tmp_path / "previews"))
+
+
+def test_concurrent_puts_of_one_key_count_once(store):
+    data = b"x" * 1000
+    barrier = threading.Barrier(8)
+
+    def put():
+        barrier.wait()
+        store.put("same", data)
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert store._total == len(data)
+
+
+def test_evicted_upload_reads_as_none(store):
+    artifact = store.put_bytes(b"upload")
+    os.remove(artifact.path)
+    assert artifact.read() is None
+
+
+def test_evicted_derived_artifact_is_rebuilt(store):
+    source = store.put_bytes(b"original")
+    builds = []
+
+    def build(artifact):
+        builds.append(1)
+        return artifact.read().upper()
+
+    derived = store.derive(source, "upper", build)
+    assert store.derive(source, "upper", build) == derived
+    os.remove(derived.path)
+    assert derived.read() == b"ORIGINAL"
+    assert len(builds) == 2
+    assert os.path.exists(derived.path)
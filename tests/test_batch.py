@@ -0,0 +1,62 @@
+import pytest
+
+from hub import batch
+from hub.batch import BatchStore, run_batch
+from hub.jobs import JobCancelled
+
+
+class FakeContext:
+    def __init__(self, cancel_after=None):
+        self.cancel_after = cancel_after
+        self.progress = []
+
+    def set_progress(self, fraction, message=""):
+        self.progress.append(fraction)
+
+    @property
+    def cancelled(self):
+        return self.cancel_after is not None and len(self.progress) > self.cancel_after
+
+    def check(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BatchStore(str(tmp_path / "batches.sqlite3"))
+
+
+ROWS = [{"product": f"Product {n}"} for n in range(6)]
+
+
+def test_every_row_is_saved_in_input_order(store):
+    result = run_batch(FakeContext(), "b1", ROWS, lambda row: row["product"].upper(), workers=3, per_minute=0, store=store)
+    assert (result["total"], result[batch.DONE], result[batch.FAILED]) == (6, 6, 0)
+    assert [row["output"] for row in store.rows("b1")] == [f"PRODUCT {n}" for n in range(6)]
+
+
+def test_failed_rows_are_recorded_and_retried_on_resubmit(store):
+    def flaky(row):
+        if row["product"] == "Product 2":
+            raise RuntimeError("quota")
+        return "ok"
+
+    first = run_batch(FakeContext(), "b1", ROWS, flaky, workers=2, per_minute=0, store=store)
+    assert (first[batch.DONE], first[batch.FAILED]) == (5, 1)
+    assert store.rows("b1")[2]["error"] == "quota"
+
+    seen = []
+    again = run_batch(FakeContext(), "b1", ROWS, lambda row: seen.append(row["product"]) or "ok", per_minute=0, store=store)
+    assert seen == ["Product 2"]
+    assert again[batch.DONE] == 6
+
+
+def test_cancel_stops_new_rows_and_resume_finishes_them(store):
+    ctx = FakeContext(cancel_after=2)
+    with pytest.raises(JobCancelled):
+        run_batch(ctx, "b1", ROWS, lambda row: "ok", workers=1, per_minute=0, store=store)
+    assert 0 < store.counts("b1")[batch.DONE] < 6
+
+    run_batch(FakeContext(), "b1", ROWS, lambda row: "ok", workers=1, per_minute=0, store=store)
+    assert store.counts("b1") == {batch.PENDING: 0, batch.DONE: 6, batch.FAILED: 0}
@@ -0,0 +1,20 @@
+from hub.export import markdown_to_html_fragment, render_html, render_pdf
+
+
+def test_raw_html_in_markdown_is_escaped():
+    text = "# Review <b>x</b>\n\n<script>alert(1)</script>\n\nClick <img src=x onerror=alert(1)> **now**"
+    page = render_html(text, "Review")
+    assert "<script>" not in page and "<img" not in page and "<b>" not in page
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in page
+    assert "<strong>now</strong>" in page
+
+
+def test_markdown_features_still_render():
+    fragment = markdown_to_html_fragment("| a | b |\n|---|---|\n| 1 | 2 |\n\nSee <https://example.com> and `<i>`")
+    assert "<table>" in fragment
+    assert '<a href="https://example.com">' in fragment
+    assert "<code>&lt;i&gt;</code>" in fragment
+
+
+def test_pdf_renders_escaped_html():
+    assert render_pdf("<script>alert(1)</script>\n\n**bold**", "Review").startswith(b"%PDF")
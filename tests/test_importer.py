@@ -0,0 +1,82 @@
+import io
+import zipfile
+
+import pytest
+
+from hub import importer
+from hub.importer import import_zip, split_markdown
+from hub.notes import NoteLog
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in files.items():
+            archive.writestr(name, text)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def log(tmp_path):
+    return NoteLog(str(tmp_path / "user.jsonl"))
+
+
+def test_dated_headings_split_and_date_what_follows():
+    text = "# Journal\n\n## 2023-01-02\nI want to move abroad next year.\n\n2023-06-10\nI no longer want to move abroad."
+    assert list(split_markdown(text, "2020-01-01")) == [
+        ("2023-01-02", "I want to move abroad next year."),
+        ("2023-06-10", "I no longer want to move abroad."),
+    ]
+
+
+def test_date_inside_prose_is_not_a_heading():
+    text = "Deadline moved to 2024-05-01 for the launch.\nWe should hire two more engineers before then."
+    assert list(split_markdown("Some earlier thought worth keeping.\n\n" + text, "2023-01-01")) == [
+        ("2023-01-01", "Some earlier thought worth keeping."),
+        ("2023-01-01", text),
+    ]
+
+
+def test_front_matter_date_is_the_fallback():
+    text = "---\ntitle: Ideas\ndate: 2023-04-05\n---\nRemote work is great for focus."
+    assert list(split_markdown(text, "2020-01-01")) == [("2023-04-05", "Remote work is great for focus.")]
+
+
+def test_reimport_skips_unchanged_files_and_duplicates(log):
+    files = {
+        "vault/2024-02-03.md": "Coffee every morning keeps me calm.\n\nRemote work is great for focus.",
+        "vault/ideas.md": "Remote work is great for focus.",
+    }
+    first = import_zip(log, make_zip(files))
+    assert (first["added"], first["duplicates"]) == (2, 1)
+    assert [note["date"] for note in log] == ["2024-02-03", "2024-02-03"]
+
+    again = import_zip(log, make_zip(files))
+    assert (again["unchanged_files"], again["thoughts"], again["added"]) == (2, 0, 0)
+
+    files["vault/ideas.md"] += "\n\nA brand new thought about learning Rust."
+    changed = import_zip(log, make_zip(files))
+    assert (changed["unchanged_files"], changed["added"], changed["duplicates"]) == (1, 1, 1)
+    assert len(log) == 3
+
+
+def test_failed_append_leaves_files_unrecorded(log, monkeypatch):
+    files = {"a.md": "A thought long enough to keep."}
+
+    def broken(notes):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(log, "append_many", broken)
+    with pytest.raises(OSError):
+        import_zip(log, make_zip(files))
+    monkeypatch.undo()
+
+    retried = import_zip(log, make_zip(files))
+    assert (retried["unchanged_files"], retried["added"]) == (0, 1)
+
+
+def test_oversized_members_are_skipped(log, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_FILE_BYTES", 100)
+    stats = import_zip(log, make_zip({"big.md": "x" * 500, "small.md": "A thought long enough to keep."}))
+    assert (stats["oversized_files"], stats["added"]) == (1, 1)
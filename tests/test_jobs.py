@@ -0,0 +1,41 @@
+import threading
+import time
+
+import pytest
+
+from hub.jobs import CANCELLED, DONE, JobRunner
+
+
+@pytest.fixture
+def runner(tmp_path):
+    return JobRunner(str(tmp_path / "jobs.sqlite3"), max_workers=1)
+
+
+def wait_for(runner, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while runner.get(job_id).status != status:
+        assert time.monotonic() < deadline, runner.get(job_id)
+        time.sleep(0.01)
+
+
+def test_cancelled_queued_job_is_forgotten(runner):
+    release = threading.Event()
+    busy = runner.submit("test", lambda ctx: release.wait(5))
+    queued = runner.submit("test", lambda ctx: "never")
+
+    runner.cancel(queued)
+    assert runner.get(queued).status == CANCELLED
+    assert queued not in runner._futures and queued not in runner._last_seen
+
+    release.set()
+    wait_for(runner, busy, DONE)
+    assert runner._futures == {} and runner._last_seen == {}
+
+
+def test_only_active_jobs_are_deduped(runner):
+    release = threading.Event()
+    first = runner.submit("test", lambda ctx: release.wait(5), key="k")
+    assert runner.submit("test", lambda ctx: None, key="k") == first
+    release.set()
+    wait_for(runner, first, DONE)
+    assert runner.submit("test", lambda ctx: None, key="k") != first
@@ -0,0 +1,62 @@
+import pytest
+
+from hub import notes
+from hub.notes import NoteLog, get_log
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = NoteLog(str(tmp_path / "user.jsonl"))
+    for date, text in [("2024-03-01", "march"), ("2023-01-05", "january"), ("2024-03-01", "march again"), ("2023-07-20", "july")]:
+        log.append(date, text)
+    return log
+
+
+def test_append_assigns_ids_in_insertion_order(log):
+    assert len(log) == 4
+    assert [note["id"] for note in log] == [0, 1, 2, 3]
+    assert log[1]["text"] == "january"
+
+
+def test_range_is_in_date_order_and_inclusive(log):
+    assert [n["text"] for n in log.range()] == ["january", "july", "march", "march again"]
+    assert [n["text"] for n in log.range("2023-07-20", "2024-03-01")] == ["july", "march", "march again"]
+    assert log.count("2024-01-01") == 2
+    assert (log.first_date(), log.last_date()) == ("2023-01-05", "2024-03-01")
+
+
+def test_range_pages_newest_first(log):
+    assert [n["text"] for n in log.range(newest_first=True, offset=1, limit=2)] == ["march", "july"]
+
+
+def test_since_returns_only_later_notes(log):
+    assert [n["text"] for n in log.since(2)] == ["march again", "july"]
+    assert log.since(4) == []
+
+
+def test_bulk_append_keeps_the_index_sorted_and_skips_known_hashes(log):
+    batch = [{"date": f"2022-01-{day:02d}", "text": f"day {day}", "hash": str(day)} for day in range(1, 29)] * 3
+    added = log.append_many(batch)
+    assert len(added) == 28
+    dates = [n["date"] for n in log.range()]
+    assert dates == sorted(dates) and len(dates) == 32
+    assert log.has_hash("5")
+
+
+def test_reopening_rebuilds_the_index_and_drops_a_torn_write(log):
+    with open(log.path, "ab") as fh:
+        fh.write(b'{"id": 4, "date": "2025')
+    reopened = NoteLog(log.path)
+    assert len(reopened) == 4
+    assert [n["text"] for n in reopened.range("2024-01-01")] == ["march", "march again"]
+    assert reopened.append("2025-01-01", "after the crash")["id"] == 4
+    assert reopened[4]["text"] == "after the crash"
+
+
+def test_get_log_is_one_instance_per_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(notes, "NOTES_DIR", str(tmp_path))
+    monkeypatch.setattr(notes, "_logs", {})
+    assert get_log("contramind", "alice") is get_log("contramind", "alice")
+    assert get_log("contramind", "alice") is not get_log("contramind", "bob")
+    with pytest.raises(ValueError):
+        get_log("contramind", "../etc")
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from hub import llm, metrics, providers, resilience, routing, structured
+from hub.resilience import CircuitBreaker, Policy
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    metrics.REGISTRY.reset()
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setitem(resilience.TOOL_POLICIES, "test", Policy(deadline=30.0, attempts=1, backoff=0.0, hedge=False))
+    monkeypatch.setenv("HUB_FAKE_LATENCY", "0")
+
+
+class Scripted(providers.FakeProvider):
+    """A fake provider under its own name that can be told to fail."""
+
+    def __init__(self, name, error=None):
+        super().__init__()
+        self.name = name
+        self.error = error
+        self.calls = []
+
+    def generate(self, model, contents, model_kwargs, call_kwargs, stream=False):
+        self.calls.append(model)
+        if self.error is not None:
+            raise self.error
+        return super().generate(model, contents, model_kwargs, call_kwargs, stream)
+
+
+def register(monkeypatch, name, error=None):
+    provider = Scripted(name, error)
+    monkeypatch.setitem(providers.PROVIDERS, name, provider)
+    monkeypatch.setitem(providers.MODELS, name, {"fast": f"{name}-fast", "heavy": f"{name}-heavy"})
+    return provider
+
+
+def record_deadlines(monkeypatch):
+    deadlines = []
+    call = resilience.call
+
+    def spy(tool, model, fn, **kwargs):
+        deadlines.append((model, kwargs["deadline"]))
+        return call(tool, model, fn, **kwargs)
+
+    monkeypatch.setattr(resilience, "call", spy)
+    return deadlines
+
+
+def run(plan, contents="hello", **kwargs):
+    return llm.Model("test")._call(plan, contents, "generate", False, kwargs)
+
+
+def series(model):
+    return next(s for s in metrics.REGISTRY.series() if s.model == model)
+
+
+def test_provider_trouble_fails_over_to_the_next_provider(monkeypatch):
+    primary = register(monkeypatch, "primary", ConnectionError("connection reset"))
+    backup = register(monkeypatch, "backup")
+    deadlines = record_deadlines(monkeypatch)
+
+    response = run([("primary", "primary-heavy"), ("backup", "backup-heavy")])
+
+    assert response.provider == "backup"
+    assert primary.calls == ["primary-heavy"]
+    assert backup.calls == ["backup-heavy"]
+    assert metrics.REGISTRY.events[("failover", "test")] == 1
+    assert series("primary-heavy").errors == {"ConnectionError": 1}
+    assert series("backup-heavy").calls == 1 and not series("backup-heavy").errors
+    # The first provider gets its share of the deadline; the last gets what is left
+    assert deadlines[0] == ("primary-heavy", 30.0 * llm.FAILOVER_SHARE)
+    assert deadlines[1][0] == "backup-heavy" and deadlines[1][1] > 29.0
+
+
+def test_request_errors_are_not_failed_over(monkeypatch):
+    register(monkeypatch, "primary", ValueError("bad request"))
+    backup = register(monkeypatch, "backup")
+    with pytest.raises(ValueError):
+        run([("primary", "primary-heavy"), ("backup", "backup-heavy")])
+    assert backup.calls == []
+    assert ("failover", "test") not in metrics.REGISTRY.events
+
+
+def test_last_provider_failure_is_raised(monkeypatch):
+    register(monkeypatch, "primary", ConnectionError("connection reset"))
+    register(monkeypatch, "backup", ConnectionError("connection reset"))
+    with pytest.raises(resilience.RetriesExhausted):
+        run([("primary", "primary-heavy"), ("backup", "backup-heavy")])
+    assert metrics.REGISTRY.events[("failover", "test")] == 1
+
+
+def test_plan_follows_the_provider_order(monkeypatch):
+    register(monkeypatch, "primary")
+    register(monkeypatch, "backup")
+    monkeypatch.setenv("HUB_PROVIDERS_TEST", "backup,missing,primary")
+    assert routing.plan("test") == [("backup", "backup-heavy"), ("primary", "primary-heavy")]
+
+
+def test_provider_with_open_breaker_is_skipped(monkeypatch):
+    primary = register(monkeypatch, "primary")
+    backup = register(monkeypatch, "backup")
+    monkeypatch.setenv("HUB_PROVIDERS_TEST", "primary,backup")
+    breaker = resilience._breakers["primary-heavy"] = CircuitBreaker("primary-heavy", threshold=1, cooldown=60)
+    breaker.failure()
+
+    plan = routing.plan("test")
+    assert plan == [("backup", "backup-heavy"), ("primary", "primary-heavy")]
+    assert run(plan).provider == "backup"
+    assert primary.calls == []
+
+    # Even when it is first in the plan, the open breaker sends the call on without trying it
+    assert run([("primary", "primary-heavy"), ("backup", "backup-heavy")]).provider == "backup"
+    assert primary.calls == []
+    assert metrics.REGISTRY.events[("circuit_rejected", "test")] == 1
+
+
+@dataclass
+class Verdict:
+    winner: str
+    reason: str
+
+
+def test_response_schema_becomes_json_mode_for_other_providers(monkeypatch):
+    sent = {}
+
+    def create(**request):
+        sent.update(request)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"winner": "a", "reason": "b"}'))],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=8),
+        )
+
+    openai = providers.OpenAIProvider()
+    openai._client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setitem(providers.PROVIDERS, "openai", openai)
+    config = {"response_mime_type": "application/json", "response_schema": structured.schema_for(Verdict), "temperature": 0.2}
+
+    response = llm.Model("test", system_instruction="Be brief.")._call(
+        [("openai", "gpt-4.1-mini")], "Who wins?", "generate", False, {"generation_config": config}
+    )
+
+    assert structured.build(Verdict, structured.parse_loose(response.text)[0]) == Verdict("a", "b")
+    assert sent["response_format"] == {"type": "json_object"}
+    assert sent["temperature"] == 0.2
+    assert sent["messages"] == [
+        {"role": "system", "content": "Be brief."},
+        {"role": "user", "content": "Who wins?"},
+    ]
+    assert "response_schema" not in sent
+    assert series("gpt-4.1-mini").input_tokens == 12
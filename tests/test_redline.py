@@ -0,0 +1,45 @@
+from hub.redline import ADDED, CHANGED, EQUAL, REMOVED, clause_key, diff_clauses, redline_html
+from hub.reviews import ReviewStore
+
+OLD = [
+    "1. Payment is due within 30 days.",
+    "2. Either party may terminate with 60 days notice.",
+    "3. This agreement is governed by English law.",
+]
+
+
+def statuses(changes):
+    return [(c.status, c.old, c.new) for c in changes]
+
+
+def test_renumbering_and_quote_style_are_not_changes():
+    assert clause_key("1. The “Client” pays.") == clause_key("Section 4  the \"client\" PAYS.")
+
+
+def test_inserted_clause_leaves_the_rest_unchanged():
+    new = [OLD[0], "2. The Supplier keeps all data in the EU.", "3. " + OLD[1][3:], "4. " + OLD[2][3:]]
+    assert statuses(diff_clauses(OLD, new)) == [
+        (EQUAL, 0, 0), (ADDED, None, 1), (EQUAL, 1, 2), (EQUAL, 2, 3),
+    ]
+
+
+def test_edits_and_removals():
+    new = [OLD[0], "2. Either party may terminate with 90 days notice."]
+    assert statuses(diff_clauses(OLD, new)) == [(EQUAL, 0, 0), (CHANGED, 1, 1), (REMOVED, 2, None)]
+
+
+def test_redline_marks_word_level_edits():
+    marked = redline_html("terminate with 60 days notice", "terminate with 90 days <written> notice")
+    assert '<del style="color:#c0392b">60</del>' in marked
+    assert '<ins style="color:#27ae60">90</ins>' in marked
+    assert "&lt;written&gt;" in marked and "terminate with" in marked
+
+
+def test_review_store_evicts_least_recently_used(tmp_path):
+    store = ReviewStore(str(tmp_path / "reviews.sqlite3"), max_rows=2)
+    store.put("a", {"risk": "Low"})
+    store.put("b", {"risk": "High"})
+    assert store.get("a") == {"risk": "Low"}
+    store.put("c", {"risk": "Medium"})
+    assert len(store) == 2
+    assert store.get("b") is None and store.get("a") == {"risk": "Low"}
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+
+from hub import metrics, resilience
+from hub.resilience import CallTimeout, CircuitBreaker, CircuitOpen, Policy, RetriesExhausted
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    metrics.REGISTRY.reset()
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "HEDGING", True)
+
+
+def use_policy(monkeypatch, **settings):
+    monkeypatch.setitem(resilience.TOOL_POLICIES, "test", Policy(backoff=0.0, **settings))
+
+
+def flaky(failures, exc=ConnectionError("connection reset")):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise exc
+        return "ok"
+
+    return fn, calls
+
+
+def seed_latency(seconds, op="generate", count=20):
+    for _ in range(count):
+        metrics.REGISTRY.record_call("llm", "test", "model-a", seconds, op=op)
+
+
+def test_retryable_failures_are_retried(monkeypatch):
+    use_policy(monkeypatch, hedge=False)
+    fn, calls = flaky(2)
+    assert resilience.call("test", "model-a", fn) == "ok"
+    assert len(calls) == 3
+
+
+def test_other_failures_are_raised_at_once(monkeypatch):
+    use_policy(monkeypatch, hedge=False)
+    fn, calls = flaky(1, ValueError("bad request"))
+    with pytest.raises(ValueError):
+        resilience.call("test", "model-a", fn)
+    assert len(calls) == 1
+
+
+def test_retries_give_up_after_the_policy_attempts(monkeypatch):
+    use_policy(monkeypatch, hedge=False, attempts=2)
+    fn, calls = flaky(5)
+    with pytest.raises(RetriesExhausted):
+        resilience.call("test", "model-a", fn)
+    assert len(calls) == 2
+
+
+def test_deadline_covers_the_whole_request(monkeypatch):
+    use_policy(monkeypatch, hedge=False)
+    started = time.monotonic()
+    with pytest.raises(CallTimeout):
+        resilience.call("test", "model-a", lambda: time.sleep(1), deadline=0.1)
+    assert time.monotonic() - started < 0.5
+
+
+def test_slow_attempt_is_hedged_and_first_success_wins(monkeypatch):
+    use_policy(monkeypatch, hedge_min_delay=0.05)
+    seed_latency(0.01)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "hedge"
+
+    assert resilience.call("test", "model-a", fn) == "hedge"
+    assert len(calls) == 2
+
+
+def test_hedge_delay_is_per_op_and_skips_long_calls(monkeypatch):
+    use_policy(monkeypatch, hedge_max_delay=5.0, hedge_max_bytes=1000)
+    policy = resilience.policy_for("test")
+    seed_latency(0.5, op="short")
+    seed_latency(30.0, op="long")
+
+    assert resilience._hedge_delay("test", "short", "model-a", policy) == policy.hedge_min_delay
+    assert resilience._hedge_delay("test", "long", "model-a", policy) is None
+    assert resilience._hedge_delay("test", "short", "model-a", policy, size=5000) is None
+    assert resilience._hedge_delay("test", "unseen", "model-a", policy) is None
+
+
+def test_op_policy_and_env_override(monkeypatch):
+    monkeypatch.setitem(resilience.OP_POLICIES, ("test", "big"), Policy(deadline=90.0, hedge=False))
+    assert resilience.policy_for("test", "big").deadline == 90.0
+    monkeypatch.setenv("HUB_DEADLINE_TEST_BIG", "12")
+    assert resilience.policy_for("test", "big").deadline == 12.0
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("model-a", threshold=2, ratio=0.5, window=60, cooldown=0.05)
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.allow()     # one probe at a time
+    breaker.success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
+
+
+def test_failed_probe_reopens_the_breaker():
+    breaker = CircuitBreaker("model-a", threshold=1, cooldown=0.05)
+    breaker.failure()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+
+def test_exhausted_requests_open_the_model_breaker(monkeypatch):
+    use_policy(monkeypatch, hedge=False, attempts=1)
+    breaker = CircuitBreaker("model-a", threshold=2, cooldown=60)
+    monkeypatch.setattr(resilience, "breaker_for", lambda model: breaker)
+    for _ in range(2):
+        with pytest.raises(RetriesExhausted):
+            resilience.call("test", "model-a", flaky(1)[0])
+    fn, calls = flaky(0)
+    with pytest.raises(CircuitOpen):
+        resilience.call("test", "model-a", fn)
+    assert calls == []
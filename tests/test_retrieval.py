@@ -0,0 +1,62 @@
+from hub.retrieval import Index, split_sections, tokenize
+
+CONTRACT = """MASTER SERVICES AGREEMENT
+
+1. Definitions
+"Services" means the consulting work described in each statement of work.
+
+2. Payment
+The Client shall pay every invoice within thirty days. Late payments accrue interest at 1% per month.
+
+3. Termination
+Either party may terminate this agreement with sixty days written notice. Termination for breach is immediate.
+
+4. Indemnification
+The Supplier indemnifies the Client against third-party claims arising from the Services.
+
+5. Governing Law
+This agreement is governed by the laws of England.
+"""
+
+
+def test_sections_split_at_clause_headings():
+    # A bare title stays with the clause after it
+    titles = [chunk.title for chunk in split_sections(CONTRACT, merge=False)]
+    assert titles == ["MASTER SERVICES AGREEMENT", "2. Payment", "3. Termination", "4. Indemnification", "5. Governing Law"]
+
+
+def test_short_sections_are_merged_into_the_previous_one():
+    assert len(split_sections(CONTRACT)) < len(split_sections(CONTRACT, merge=False))
+
+
+def test_long_sections_are_cut_and_marked_continued():
+    chunks = split_sections("7. Warranty\n" + "The goods are fit for purpose. " * 200, max_chars=500)
+    assert len(chunks) > 1
+    assert all(len(chunk.text) <= 500 for chunk in chunks)
+    assert chunks[1].title == "7. Warranty (cont.)"
+
+
+def test_tokenize_stems_and_drops_stopwords():
+    assert tokenize("The indemnities") == tokenize("indemnify") == ["indemni"]
+    assert "the" not in tokenize("the payment")
+
+
+def test_bm25_ranks_the_matching_clause_first():
+    index = Index(split_sections(CONTRACT, merge=False))
+    (score, best), = index.search("How much notice is needed to terminate?", k=1)
+    assert best.title == "3. Termination" and score > 0
+
+    results = index.search("invoice payment interest", k=2)
+    assert results[0][1].title == "2. Payment"
+    assert [chunk.number for _, chunk in results] == sorted(chunk.number for _, chunk in results)
+
+
+def test_rare_terms_outweigh_common_ones():
+    index = Index(split_sections(CONTRACT, merge=False))
+    (_, best), = index.search("agreement England", k=1)
+    assert best.title == "5. Governing Law"
+
+
+def test_no_match_falls_back_to_the_opening_chunks():
+    index = Index(split_sections(CONTRACT, merge=False))
+    assert [chunk.number for _, chunk in index.search("zebra", k=2)] == [1, 2]
@@ -0,0 +1,119 @@
+import pytest
+
+from hub import metrics, providers, resilience, routing
+from hub.resilience import CircuitBreaker
+
+FLASH_LITE, FLASH, PRO = "gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-2.5-pro"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    metrics.REGISTRY.reset()
+    monkeypatch.setattr(resilience, "_breakers", {})
+    for name in ("HUB_PROVIDERS", "HUB_PROVIDERS_GAME", "HUB_MODEL_CLEARPACT", "HUB_MODEL_GAME", "HUB_MODEL_GAME_RIDDLE"):
+        monkeypatch.delenv(name, raising=False)
+    configure(monkeypatch, "gemini")
+
+
+def configure(monkeypatch, *names):
+    """Make exactly `names` look configured, whatever keys this machine has."""
+    for name, provider in providers.PROVIDERS.items():
+        monkeypatch.setattr(provider, "available", lambda name=name: name in names)
+
+
+def seed(tool, model, seconds, count=20, error=None):
+    for _ in range(count):
+        metrics.REGISTRY.record_call("llm", tool, model, seconds, error=error)
+
+
+def open_breaker(model):
+    breaker = resilience._breakers[model] = CircuitBreaker(model, threshold=1, cooldown=60)
+    breaker.failure()
+
+
+@pytest.mark.parametrize("tool, op, tier", [
+    ("game", "generate", "fast"),               # 5-number JSON puzzle
+    ("assistforge", "generate", "fast"),        # a few sentences
+    ("clearpact", "generate", "heavy"),         # whole-contract rewrite
+    ("clearpact", "qa", "fast"),                # one question about it
+    ("person8", "generate", "heavy"),
+    ("person8", "planner", "fast"),
+    ("unlisted", "generate", "heavy"),
+])
+def test_tools_and_call_sites_map_to_tiers(tool, op, tier):
+    assert routing.tier_for(tool, op) == tier
+    assert routing.choose(tool, op, explore=False) in routing.TIERS[tier].models
+
+
+def test_fast_tier_follows_observed_latency():
+    assert routing.choose("game", explore=False) == FLASH_LITE
+    seed("game", FLASH_LITE, 10.0)
+    seed("game", FLASH, 0.5)
+    assert routing.choose("game", explore=False) == FLASH
+    # Observations are per tool
+    assert routing.choose("verdict", explore=False) == FLASH_LITE
+
+
+def test_fast_tier_penalises_errors():
+    seed("game", FLASH_LITE, 0.5, count=10)
+    seed("game", FLASH_LITE, 0.5, count=10, error="RetriesExhausted")
+    seed("game", FLASH, 1.5)
+    assert routing.choose("game", explore=False) == FLASH
+
+
+def test_heavy_tier_keeps_its_first_model_until_it_is_unhealthy():
+    seed("clearpact", FLASH, 30.0)
+    seed("clearpact", PRO, 5.0)
+    assert routing.choose("clearpact") == FLASH
+
+    seed("clearpact", FLASH, 1.0, error="CallTimeout")
+    assert routing.choose("clearpact") == PRO
+
+
+def test_open_breaker_is_skipped_in_both_tiers():
+    open_breaker(FLASH_LITE)
+    assert routing.choose("game", explore=False) == FLASH
+    open_breaker(FLASH)
+    assert routing.choose("clearpact") == PRO
+
+
+def test_pins_override_the_tier(monkeypatch):
+    monkeypatch.setenv("HUB_MODEL_CLEARPACT", "fast")
+    assert routing.choose("clearpact", explore=False) == FLASH_LITE
+    monkeypatch.setenv("HUB_MODEL_GAME_RIDDLE", PRO)
+    assert routing.choose("game", "riddle") == PRO
+    assert routing.choose("game", explore=False) == FLASH_LITE
+
+
+def test_plan_orders_providers_by_tier(monkeypatch):
+    configure(monkeypatch, "gemini", "openai", "groq")
+    assert routing.plan("game") == [
+        ("groq", "llama-3.1-8b-instant"), ("gemini", FLASH_LITE), ("openai", "gpt-4.1-mini"),
+    ]
+    assert routing.plan("clearpact") == [
+        ("gemini", FLASH), ("openai", "gpt-4.1"), ("groq", "llama-3.3-70b-versatile"),
+    ]
+    assert routing.plan("clearpact", "qa") == [
+        ("groq", "llama-3.1-8b-instant"), ("gemini", FLASH_LITE), ("openai", "gpt-4.1-mini"),
+    ]
+
+
+def test_plan_keeps_files_and_gemini_only_setups_on_gemini(monkeypatch):
+    assert routing.plan("game") == [("gemini", FLASH_LITE)]
+    configure(monkeypatch, "gemini", "groq")
+    assert routing.plan("clearpact", text_only=False) == [("gemini", FLASH)]
+
+
+def test_plan_overrides_and_pins(monkeypatch):
+    configure(monkeypatch, "gemini", "openai", "groq")
+    monkeypatch.setenv("HUB_PROVIDERS_GAME", "openai, gemini, mistral")
+    assert routing.plan("game") == [("openai", "gpt-4.1-mini"), ("gemini", FLASH_LITE)]
+    assert routing.plan("game", pinned="gpt-4.1") == [("openai", "gpt-4.1")]
+
+
+def test_plan_moves_failing_providers_last(monkeypatch):
+    configure(monkeypatch, "gemini", "openai", "groq")
+    open_breaker("llama-3.1-8b-instant")
+    assert routing.plan("game") == [
+        ("gemini", FLASH_LITE), ("openai", "gpt-4.1-mini"), ("groq", "llama-3.1-8b-instant"),
+    ]
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from hub.singleflight import Group
+
+CALLERS = 8
+
+
+def wait_for_waiters(group, key, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with group._lock:
+            call = group._calls.get(key)
+            if call is not None and call.waiters == count:
+                return
+        time.sleep(0.005)
+    raise AssertionError(f"{count} callers never joined the call")
+
+
+def run_together(group, key, fn):
+    """Start CALLERS threads at once on `key`; returns their (result, shared) or exception."""
+    barrier = threading.Barrier(CALLERS)
+    outcomes = [None] * CALLERS
+
+    def caller(index):
+        barrier.wait()
+        try:
+            outcomes[index] = group.do(key, fn)
+        except Exception as exc:
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def blocking(group, key, outcome):
+    """fn that counts its runs and holds the call open until every caller is waiting on it."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        wait_for_waiters(group, key, CALLERS - 1)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return fn, calls
+
+
+def test_concurrent_identical_calls_run_once():
+    group = Group()
+    fn, calls = blocking(group, "riddle", "answer")
+    threads, outcomes = run_together(group, "riddle", fn)
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(outcomes, key=lambda o: o[1]) == [("answer", False)] + [("answer", True)] * (CALLERS - 1)
+    assert group.in_flight() == 0
+
+
+def test_exception_reaches_every_waiter():
+    group = Group()
+    error = ConnectionError("connection reset")
+    fn, calls = blocking(group, "riddle", error)
+    threads, outcomes = run_together(group, "riddle", fn)
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert group.in_flight() == 0
+
+
+def test_finished_calls_are_not_reused():
+    group = Group()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return len(calls)
+
+    assert group.do("riddle", fn) == (1, False)
+    assert group.do("riddle", fn) == (2, False)
+    with pytest.raises(ValueError):
+        group.do("riddle", lambda: int("x"))
+    assert group.do("riddle", fn) == (3, False)
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from hub.structured import StructuredOutputError, build, generate_json, parse_loose, schema_for
+
+
+@dataclass
+class Question:
+    question: str
+    options: List[str]
+    answer: str
+    points: int = 1
+
+    def __post_init__(self):
+        if self.answer not in self.options:
+            raise ValueError("the answer is not one of the options")
+
+
+class ScriptedModel:
+    tool = "test"
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def generate_content(self, prompt, op=None, generation_config=None):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.replies.pop(0))
+
+
+GOOD = '{"question": "2+2?", "options": ["3", "4"], "answer": "4"}'
+
+
+def test_schema_lists_required_fields_and_item_types():
+    schema = schema_for(Question)
+    assert schema["required"] == ["question", "options", "answer"]
+    assert schema["properties"]["options"] == {"type": "array", "items": {"type": "string"}}
+    assert schema["properties"]["points"] == {"type": "integer"}
+
+
+@pytest.mark.parametrize("text", [
+    "```json\n" + GOOD + "\n```",
+    "Sure! Here it is: " + GOOD + " Hope that helps.",
+    GOOD[:-1] + ",}",
+    GOOD.replace('"', "'"),
+])
+def test_loose_replies_are_repaired_locally(text):
+    data, repaired = parse_loose(text)
+    assert repaired and data["answer"] == "4"
+
+
+def test_build_coerces_types_and_runs_post_init():
+    assert build(Question, {"question": "q", "options": ["a", "b"], "answer": "a", "points": "3"}).points == 3
+    with pytest.raises(StructuredOutputError, match="missing"):
+        build(Question, {"question": "q", "options": ["a"]})
+    with pytest.raises(StructuredOutputError, match="not one of the options"):
+        build(Question, {"question": "q", "options": ["a", "b"], "answer": "c"})
+
+
+def test_reasks_once_with_the_validation_error():
+    model = ScriptedModel('{"question": "2+2?", "options": ["3", "4"], "answer": "5"}', GOOD)
+    assert generate_json(model, "Ask me", Question).answer == "4"
+    assert len(model.prompts) == 2 and "not one of the options" in model.prompts[1]
+
+
+def test_gives_up_after_the_reask():
+    model = ScriptedModel("no idea", "still no idea")
+    with pytest.raises(StructuredOutputError, match="unusable answer"):
+        generate_json(model, "Ask me", Question)
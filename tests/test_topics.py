@@ -0,0 +1,60 @@
+from hub.notes import NoteLog
+from hub.topics import TopicTracker, charted, sentiment, stance
+
+ABROAD = [
+    ("2022-01-10", "I love the idea of moving abroad to Lisbon next year"),
+    ("2022-04-02", "Moving abroad to Lisbon next year would be great for my career"),
+    ("2022-08-15", "Still excited about moving abroad to Lisbon next year"),
+    ("2023-02-01", "I no longer want to move abroad to Lisbon, it feels risky and isolating"),
+]
+COFFEE = [
+    ("2022-02-01", "Morning coffee routine keeps my focus sharp"),
+    ("2022-05-01", "My morning coffee routine helps my focus"),
+    ("2022-09-01", "The morning coffee routine is good for focus"),
+]
+
+
+def tracker_for(entries):
+    tracker = TopicTracker()
+    for n, (date, text) in enumerate(entries):
+        tracker.add({"id": n, "date": date, "text": text})
+    return tracker
+
+
+def test_stance_and_sentiment_follow_negation_and_lexicon():
+    assert sentiment("great fun") > 0 > sentiment("awful waste")
+    assert stance("I want to move abroad") > 0 > stance("I don't want to move abroad")
+
+
+def test_related_notes_share_a_topic():
+    tracker = tracker_for(ABROAD + COFFEE)
+    topics = [row["topic"] for row in tracker.rows]
+    assert len(set(topics[:4])) == 1 and len(set(topics[4:])) == 1
+    assert topics[0] != topics[4]
+    assert "lisbon" in tracker.label(topics[0])
+
+
+def test_a_reversal_is_flagged_as_drift():
+    tracker = tracker_for(ABROAD + COFFEE)
+    drift = tracker.drift_points()
+    assert list(drift["id"]) == [3]
+    assert tracker.frame()["drift"].sum() == 1
+
+
+def test_small_topics_are_not_charted():
+    tracker = tracker_for(ABROAD[:2] + COFFEE)
+    frame = tracker.frame()
+    assert set(frame["id"]) == {2, 3, 4}
+    assert set(charted(frame, top=1)["id"]) == {2, 3, 4}
+
+
+def test_topic_history_returns_earlier_notes_of_the_topic(tmp_path):
+    log = NoteLog(str(tmp_path / "user.jsonl"))
+    for date, text in ABROAD + COFFEE:
+        log.append(date, text)
+    tracker = TopicTracker()
+    tracker.sync(log)
+    tracker.sync(log)
+    assert len(tracker) == 7
+    history = tracker.topic_history(tracker.rows[3]["topic"], 3, log)
+    assert [note["id"] for note in history] == [1, 2]
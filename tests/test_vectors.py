@@ -0,0 +1,49 @@
+import numpy as np
+
+from hub.vectors import NoteIndex, embed, negated
+
+NOTES = [
+    "I want to move abroad next year",
+    "Coffee every morning keeps me calm",
+    "I no longer want to move abroad next year",
+    "Remote work is great for focus",
+    "Remote work is terrible for focus",
+]
+
+
+def test_embedding_is_deterministic_and_order_aware():
+    assert np.array_equal(embed("remote work helps"), embed("remote work helps"))
+    assert not np.array_equal(embed("work remote helps"), embed("remote work helps"))
+
+
+def test_negation_is_detected():
+    assert negated("I no longer want to move abroad")
+    assert negated("I don't like coffee")
+    assert not negated("I want to move abroad")
+
+
+def test_similar_finds_the_closest_note():
+    index = NoteIndex()
+    index.extend(NOTES)
+    (score, best), *_ = index.similar("moving abroad next year", k=2)
+    assert best in (0, 2) and score > 0
+
+
+def test_candidate_pairs_prefer_opposing_similar_notes():
+    index = NoteIndex()
+    index.extend(NOTES)
+    pairs = index.candidate_pairs(k=2)
+    assert (pairs[0][1], pairs[0][2]) == (0, 2)
+    assert all(i < j for _, i, j in pairs)
+
+
+def test_near_duplicates_and_unrelated_notes_are_skipped():
+    index = NoteIndex()
+    index.extend(["Coffee keeps me calm", "Coffee keeps me calm", "Quantum chromodynamics lecture notes"])
+    assert index.candidate_pairs() == []
+
+
+def test_index_grows_past_its_initial_capacity():
+    index = NoteIndex(dim=64)
+    index.extend(f"note number {n} about topic {n % 7}" for n in range(200))
+    assert len(index) == 200 and index.vectors().shape == (200, 64)
@@ -0,0 +1,363 @@
+"""
+Page-load and rerun benchmark for Home.py and every pages/*.py script.
+
+Each page is measured three ways, with st.secrets and every external
+client stubbed (see tools/stubs.py):
+
+  import_ms       cold import of the page's top-level imports, in a fresh
+                  interpreter (what a new server process pays)
+  first_render_ms first script run for a new session (AppTest)
+  interactions    rerun time per scripted interaction: a plain rerun,
+                  filling the inputs, and pressing the page's main button
+
+Results are written as JSON and compared against a stored baseline;
+the exit status is 1 when any metric regressed past the tolerance.
+
+    python tools/bench_pages.py                      # compare to baseline
+    python tools/bench_pages.py --pages Verdict Game # substring filter
+    python tools/bench_pages.py --update-baseline    # accept current numbers
+
+With --cassette, Gemini calls are replayed from (or, with --record,
+recorded into) a cassette instead of the instant fake; see
+tools/cassette.py.
+"""
+import argparse
+import ast
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(TOOLS_DIR)
+sys.path[:0] = [REPO_ROOT, TOOLS_DIR]
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from cassette import Cassette, pinned_routing  # noqa: E402
+from stubs import patched_clients  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(TOOLS_DIR, "bench_baseline.json")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "tmp", "bench_results.json")
+RUN_TIMEOUT = 30
+SAMPLE_TEXT = "I took the job offer in 2021 because the pay was better."
+
+# Main action per page: label of the button (or form submit) to press.
+# Pages without one (uploads only, or nothing to submit) just rerun.
+MAIN_BUTTONS = {
+    "Affili8": "Generate Review",
+    "AfroForge": "Forge Designs",
+    "AssistForge": "Post Task",
+    "BubbleScope": "Scope My Bubble",
+    "ContraMind": "Save Thought",
+    "FailForward": "Generate Reverse Resume",
+    "Game": "Generate Riddle",
+    "Ghostly": "Generate GhostReply",
+    "KillShot": "🔫 Fire KillShot",
+    "Person8": "Forge My Product",
+    "RegretFix": "Consult FutureYou",
+    "RetroMirror": "Show Me the Mirror",
+    "SkillGuard": "Add Skill",
+    "Summarily": "Generate Summary",
+    "Survy": "Create Survey",
+    "ToneBridge": "Translate Tone",
+    "Verdict": "Get Verdict",
+}
+
+
+def page_scripts() -> List[str]:
+    return [os.path.join(REPO_ROOT, "Home.py")] + sorted(glob.glob(os.path.join(REPO_ROOT, "pages", "*.py")))
+
+
+def page_name(path: str) -> str:
+    """'pages/20_⚖️_Verdict.py' -> 'Verdict'."""
+    return os.path.splitext(os.path.basename(path))[0].split("_")[-1]
+
+
+# --------------------------------------------------
+# COLD IMPORT
+# --------------------------------------------------
+IMPORT_PROBE = """
+import sys, time
+sys.path.insert(0, {root!r})
+source = {source!r}
+start = time.perf_counter()
+exec(compile(source, "<imports>", "exec"), {{}})
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_source(path: str) -> str:
+    """Only the module-level import statements of a page script."""
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def cold_import_ms(path: str) -> float:
+    probe = IMPORT_PROBE.format(root=REPO_ROOT, source=import_source(path))
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+# --------------------------------------------------
+# RENDER AND RERUNS
+# --------------------------------------------------
+def _timed(fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _fill_inputs(at: AppTest) -> None:
+    for widget in list(at.text_area) + list(at.text_input):
+        if not widget.value:
+            widget.set_value(SAMPLE_TEXT)
+
+
+def _find_button(at: AppTest, label: str):
+    for button in at.button:
+        if button.label == label:
+            return button
+    return None
+
+
+@contextmanager
+def shared_script_cache() -> Iterator[ScriptCache]:
+    """
+    One ScriptCache for every AppTest run, as a server keeps one for all
+    sessions. AppTest builds a new cache per run, so each rerun would
+    otherwise re-parse and recompile the page (a cost that grows with
+    the page's length and that a running server never pays again).
+    """
+    cache = ScriptCache()
+    with mock.patch("streamlit.testing.v1.app_test.ScriptCache", return_value=cache), \
+            mock.patch("streamlit.testing.v1.local_script_runner.ScriptCache", return_value=cache):
+        yield cache
+
+
+def measure_session(path: str, secrets: Dict[str, str]) -> Dict:
+    """One fresh session: first render, then each interaction in turn."""
+    at = AppTest.from_file(path, default_timeout=RUN_TIMEOUT)
+    for key, value in secrets.items():
+        at.secrets[key] = value
+
+    first_render = _timed(at.run)
+    timings = {}
+    errors = []
+    try:
+        timings["rerun"] = _timed(at.run)
+
+        if at.text_area or at.text_input:
+            _fill_inputs(at)
+            timings["fill_inputs"] = _timed(at.run)
+
+        label = MAIN_BUTTONS.get(page_name(path))
+        button = _find_button(at, label) if label else None
+        if button is not None:
+            button.click()
+            timings["submit"] = _timed(at.run)
+            timings["after_submit"] = _timed(at.run)
+    except Exception as exc:
+        # Some widgets are not drivable from AppTest; keep what was measured
+        errors.append(f"interaction stopped: {type(exc).__name__}: {exc}")
+
+    errors += [str(exc.message)[:200] for exc in at.exception]
+    return {"first_render_ms": first_render, "interactions": timings, "errors": errors}
+
+
+def _median(values: List[float]) -> float:
+    return round(statistics.median(values), 2)
+
+
+def bench_page(path: str, secrets: Dict[str, str], repeat: int) -> Dict:
+    imports = [cold_import_ms(path) for _ in range(repeat)]
+    # Import cost is measured above; keep it out of first render so the
+    # numbers do not depend on which pages ran earlier in this process
+    exec(compile(import_source(path), path, "exec"), {})
+    sessions = [measure_session(path, secrets) for _ in range(repeat)]
+
+    interactions = {}
+    for name in sessions[0]["interactions"]:
+        values = [s["interactions"][name] for s in sessions if name in s["interactions"]]
+        interactions[name] = _median(values)
+
+    return {
+        "script": os.path.relpath(path, REPO_ROOT),
+        "import_ms": _median(imports),
+        "first_render_ms": _median([s["first_render_ms"] for s in sessions]),
+        "interactions": interactions,
+        "errors": sorted({err for s in sessions for err in s["errors"]}),
+    }
+
+
+# --------------------------------------------------
+# BASELINE
+# --------------------------------------------------
+def _flatten(page: Dict) -> Dict[str, float]:
+    metrics = {"import_ms": page["import_ms"], "first_render_ms": page["first_render_ms"]}
+    for name, value in page["interactions"].items():
+        metrics[f"rerun.{name}_ms"] = value
+    return metrics
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[Dict]:
+    """Metrics slower than baseline by more than `tolerance` and `min_delta_ms`."""
+    regressions = []
+    for name, page in results["pages"].items():
+        base_page = baseline.get("pages", {}).get(name)
+        if not base_page:
+            continue
+        base_metrics = _flatten(base_page)
+        for metric, value in _flatten(page).items():
+            base = base_metrics.get(metric)
+            if base is None:
+                continue
+            if value > base * (1 + tolerance) and value - base > min_delta_ms:
+                regressions.append({
+                    "page": name, "metric": metric,
+                    "baseline": base, "current": value,
+                    "change": f"{(value - base) / base:+.0%}" if base else "new",
+                })
+    return regressions
+
+
+def print_table(results: Dict, baseline: Optional[Dict]) -> None:
+    base_pages = (baseline or {}).get("pages", {})
+    print(f"{'page':<14}{'import':>10}{'first':>10}{'rerun':>10}{'submit':>10}   vs baseline (first render)")
+    for name, page in results["pages"].items():
+        inter = page["interactions"]
+        delta = ""
+        if name in base_pages and base_pages[name]["first_render_ms"]:
+            base = base_pages[name]["first_render_ms"]
+            delta = f"{(page['first_render_ms'] - base) / base:+.0%}"
+        submit = inter.get("submit")
+        print(
+            f"{name:<14}{page['import_ms']:>10.1f}{page['first_render_ms']:>10.1f}"
+            f"{inter.get('rerun', 0):>10.1f}{(f'{submit:.1f}' if submit is not None else '-'):>10}   {delta}"
+        )
+        for err in page["errors"]:
+            print(f"{'':<14}! {err}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page import, first render and reruns.")
+    parser.add_argument("--pages", nargs="*", help="only pages whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page; medians are reported")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown ratio (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--cassette", help="replay Gemini calls from this cassette")
+    parser.add_argument("--record", action="store_true", help="record live Gemini calls into --cassette")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="replayed latency multiplier (0 = instant)")
+    args = parser.parse_args()
+
+    # Deprecation chatter from every rerun would bury the table
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    scripts = page_scripts()
+    if args.pages:
+        scripts = [p for p in scripts if any(f.lower() in page_name(p).lower() for f in args.pages)]
+
+    # Fresh job DB and artifact store per run: results cached by an earlier
+    # run would skip the work being measured (and point at a dead server).
+    # User data (ContraMind notes) goes there too, never into the real data dir.
+    state_dir = tempfile.mkdtemp(prefix="hub_bench_")
+    os.environ["HUB_JOB_DB"] = os.path.join(state_dir, "jobs.sqlite3")
+    os.environ["HUB_ARTIFACT_DIR"] = os.path.join(state_dir, "artifacts")
+    os.environ["HUB_DATA_DIR"] = os.path.join(state_dir, "data")
+    os.environ.pop("HUB_NOTES_DIR", None)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "pages": {},
+    }
+    cassette = None
+    model_class = None
+    if args.cassette:
+        import google.generativeai as genai
+
+        mode = "record" if args.record else "replay"
+        cassette = Cassette(args.cassette, mode, args.latency_scale)
+        model_class = cassette.model_class(genai.GenerativeModel)
+    elif args.record:
+        parser.error("--record needs --cassette")
+
+    with patched_clients(model_class, live_gemini=args.record) as secrets, ExitStack() as stack:
+        stack.enter_context(shared_script_cache())
+        if cassette is not None:
+            # Cassette keys include the model name, so routing must not vary between runs
+            stack.enter_context(pinned_routing())
+        # Discarded run: the first AppTest in a process pays runtime setup
+        measure_session(page_scripts()[0], secrets)
+        for path in scripts:
+            print(f"... {page_name(path)}", file=sys.stderr)
+            results["pages"][page_name(path)] = bench_page(path, secrets, args.repeat)
+
+    if cassette is not None:
+        results["cassette"] = {"path": args.cassette, "mode": cassette.mode, "latency_scale": args.latency_scale}
+        if cassette.mode == "record":
+            cassette.save()
+            print(f"Recorded {len(cassette.entries)} call(s) into {args.cassette}", file=sys.stderr)
+        elif cassette.misses:
+            print(f"{cassette.misses} call(s) had no recording in {args.cassette}", file=sys.stderr)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms) if baseline else []
+    results["regressions"] = regressions
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, ensure_ascii=False)
+
+    print_table(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+    if args.update_baseline:
+        if baseline and args.pages:
+            # Partial run: only replace the pages that were measured
+            baseline["pages"].update(results["pages"])
+            results = {**results, "pages": baseline["pages"]}
+        results.pop("regressions", None)
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("No baseline found; run with --update-baseline to store one.")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+        for reg in regressions:
+            print(f"  {reg['page']:<14}{reg['metric']:<24}{reg['baseline']:>9.1f} -> {reg['current']:>9.1f} ms ({reg['change']})")
+        return 1
+    print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
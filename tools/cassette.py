@@ -0,0 +1,334 @@
+"""
+Record/replay cassettes for Gemini calls.
+
+Record mode wraps the real google.generativeai.GenerativeModel and saves
+every prompt -> response pair to a JSON cassette: the reply text, token
+usage, total latency and, for `stream=True` calls, each chunk with its
+offset from the start of the call. Replay mode serves those pairs back
+without the network, sleeping the original latency times `latency_scale`
+(1.0 = as recorded, 0 = instant), so prompt building, parsing and
+rendering can be timed reproducibly offline.
+
+Calls are matched on model name, prompt parts and generation config.
+Because the key includes the model, routing is pinned while a cassette is
+in use (`pinned_routing`): no exploration, and models are ranked by their
+prior latency only, so recording and replay pick the same model.
+Uploaded files match on MIME type only (their URIs change per upload).
+Repeated identical calls replay their recordings in order.
+
+    # record against the live API (GEMINI_API_KEY in the environment)
+    python tools/bench_pages.py --pages KillShot ToneBridge --cassette tools/cassettes/pages.json --record
+
+    # replay, at recorded speed or instantly
+    python tools/bench_pages.py --cassette tools/cassettes/pages.json
+    python tools/bench_pages.py --cassette tools/cassettes/pages.json --latency-scale 0
+
+    python tools/cassette.py tools/cassettes/pages.json   # list entries
+
+In code: `with use_cassette(path, mode="replay"): ...`.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from unittest import mock
+
+from stubs import FakeGenerativeModel, FakeUsage
+
+CASSETTE_VERSION = 1
+PREVIEW_CHARS = 300
+
+
+class CassetteMiss(KeyError):
+    """A replayed call has no recording."""
+
+
+def _part_signature(part: Any) -> Any:
+    if isinstance(part, str):
+        return part
+    if isinstance(part, dict):
+        return json.dumps(part, sort_keys=True, default=str)
+    mime_type = getattr(part, "mime_type", None)
+    if mime_type:
+        return f"<file {mime_type}>"
+    return f"<{type(part).__name__}>"
+
+
+def _config_signature(config: Any) -> Any:
+    if config is None:
+        return None
+    if isinstance(config, dict):
+        return json.loads(json.dumps(config, sort_keys=True, default=str))
+    return repr(config)
+
+
+def call_key(model_name: str, contents: Any, generation_config: Any = None) -> str:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    payload = json.dumps(
+        [model_name, [_part_signature(p) for p in parts], _config_signature(generation_config)],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _prompt_preview(contents: Any) -> str:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    text = "\n".join(str(_part_signature(p)) for p in parts)
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS] + "…"
+
+
+def _usage(response: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_token_count": getattr(usage, "prompt_token_count", 0) or 0,
+        "candidates_token_count": getattr(usage, "candidates_token_count", 0) or 0,
+        "total_token_count": getattr(usage, "total_token_count", 0) or 0,
+    }
+
+
+# --------------------------------------------------
+# CASSETTE
+# --------------------------------------------------
+class Cassette:
+    """A file of recorded calls plus the replay cursor for each call key."""
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 1.0, on_miss: str = "error"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+        self.entries: List[Dict] = []
+        self.calls = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                for entry in json.load(fh).get("interactions", []):
+                    self._add(entry)
+
+    def _add(self, entry: Dict) -> None:
+        self.entries.append(entry)
+        self._by_key.setdefault(entry["key"], []).append(entry)
+
+    def append(self, entry: Dict) -> None:
+        with self._lock:
+            self._add(entry)
+
+    def next_entry(self, key: str) -> Optional[Dict]:
+        """The next recording for `key`; the last one repeats once exhausted."""
+        with self._lock:
+            self.calls += 1
+            recorded = self._by_key.get(key)
+            if not recorded:
+                self.misses += 1
+                return None
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            return recorded[min(index, len(recorded) - 1)]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            payload = {
+                "version": CASSETTE_VERSION,
+                "recorded": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "interactions": list(self.entries),
+            }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def model_class(self, real_class: Optional[type] = None) -> type:
+        """GenerativeModel replacement for this cassette's mode."""
+        if self.mode == "record":
+            return _recording_class(self, real_class)
+        return _replaying_class(self)
+
+
+# --------------------------------------------------
+# RECORD
+# --------------------------------------------------
+class RecordedStream:
+    """Passes a streamed response through, timing each chunk as it arrives."""
+
+    def __init__(self, response, entry: Dict, started: float, cassette: Cassette):
+        self._response = response
+        self._entry = entry
+        self._started = started
+        self._cassette = cassette
+
+    def __iter__(self):
+        for chunk in self._response:
+            self._entry["chunks"].append({
+                "offset": round(time.perf_counter() - self._started, 4),
+                "text": getattr(chunk, "text", ""),
+            })
+            yield chunk
+        self._entry["duration"] = round(time.perf_counter() - self._started, 4)
+        self._entry["text"] = "".join(c["text"] for c in self._entry["chunks"])
+        self._entry["usage"] = _usage(self._response)
+        self._cassette.append(self._entry)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+def _recording_class(cassette: Cassette, real_class: type) -> type:
+    class RecordingModel:
+        def __init__(self, model_name: str = "gemini-2.5-flash", **kwargs):
+            self.model_name = model_name
+            self._model = real_class(model_name, **kwargs)
+
+        def generate_content(self, contents, *, stream: bool = False, generation_config=None, **kwargs):
+            entry = {
+                "key": call_key(self.model_name, contents, generation_config),
+                "model": self.model_name,
+                "prompt": _prompt_preview(contents),
+                "stream": stream,
+                "chunks": [],
+            }
+            started = time.perf_counter()
+            try:
+                response = self._model.generate_content(
+                    contents, stream=stream, generation_config=generation_config, **kwargs
+                )
+            except Exception as exc:
+                entry.update(duration=round(time.perf_counter() - started, 4), error=f"{type(exc).__name__}: {exc}")
+                cassette.append(entry)
+                raise
+            if stream:
+                return RecordedStream(response, entry, started, cassette)
+            entry.update(
+                duration=round(time.perf_counter() - started, 4),
+                text=response.text,
+                usage=_usage(response),
+            )
+            cassette.append(entry)
+            return response
+
+    return RecordingModel
+
+
+# --------------------------------------------------
+# REPLAY
+# --------------------------------------------------
+class ReplayChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ReplayResponse:
+    """Looks like a GenerateContentResponse; iterating replays the chunks."""
+
+    def __init__(self, entry: Dict, latency_scale: float, streamed: bool):
+        self._entry = entry
+        self._scale = latency_scale
+        self._streamed = streamed
+        self.text = entry.get("text", "")
+        usage = entry.get("usage") or {}
+        self.usage_metadata = FakeUsage(usage.get("prompt_token_count", 0), usage.get("candidates_token_count", 0))
+
+    def __iter__(self):
+        chunks = self._entry.get("chunks") or [{"offset": 0.0, "text": self.text}]
+        if not self._streamed:
+            # Already waited for the whole call in generate_content
+            for chunk in chunks:
+                yield ReplayChunk(chunk["text"])
+            return
+        started = time.perf_counter()
+        for chunk in chunks:
+            wait = chunk["offset"] * self._scale - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+            yield ReplayChunk(chunk["text"])
+
+    def resolve(self) -> None:
+        for _ in self:
+            pass
+
+
+def _replaying_class(cassette: Cassette) -> type:
+    class ReplayingModel:
+        def __init__(self, model_name: str = "gemini-2.5-flash", **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, contents, *, stream: bool = False, generation_config=None, **kwargs):
+            key = call_key(self.model_name, contents, generation_config)
+            entry = cassette.next_entry(key)
+            if entry is None:
+                if cassette.on_miss == "fake":
+                    return FakeGenerativeModel(self.model_name).generate_content(contents)
+                raise CassetteMiss(f"No recording for {self.model_name} call: {_prompt_preview(contents)[:80]!r}")
+
+            if not stream or entry.get("error"):
+                delay = entry.get("duration", 0.0) * cassette.latency_scale
+                if delay > 0:
+                    time.sleep(delay)
+            if entry.get("error"):
+                raise RuntimeError(entry["error"])
+            return ReplayResponse(entry, cassette.latency_scale, streamed=stream)
+
+    return ReplayingModel
+
+
+@contextmanager
+def pinned_routing() -> Iterator[None]:
+    """Deterministic hub.routing choices: no random exploration, no live latency stats."""
+    from hub import routing
+
+    prior_only = lambda tool, model: routing.PRIOR_LATENCY.get(model, 5.0)  # noqa: E731
+    with mock.patch.object(routing, "EXPLORE_RATE", 0.0), mock.patch.object(routing, "_expected_latency", prior_only):
+        yield
+
+
+@contextmanager
+def use_cassette(
+    path: str,
+    mode: str = "replay",
+    latency_scale: float = 1.0,
+    on_miss: str = "error",
+) -> Iterator[Cassette]:
+    """Patch GenerativeModel with a recorder or replayer for the duration."""
+    import google.generativeai as genai
+
+    cassette = Cassette(path, mode, latency_scale, on_miss)
+    with pinned_routing(), mock.patch("google.generativeai.GenerativeModel", cassette.model_class(genai.GenerativeModel)):
+        try:
+            yield cassette
+        finally:
+            if mode == "record":
+                cassette.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the calls recorded in a cassette.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.path)
+    print(f"{len(cassette.entries)} recorded call(s) in {args.path}\n")
+    for entry in cassette.entries:
+        usage = entry.get("usage") or {}
+        status = entry.get("error") or f"{len(entry.get('text', ''))} chars"
+        chunks = f", {len(entry['chunks'])} chunks" if entry.get("stream") else ""
+        print(
+            f"{entry['key'][:10]}  {entry['model']:<22}{entry.get('duration', 0):>7.2f}s  "
+            f"in {usage.get('prompt_token_count', '-')} / out {usage.get('candidates_token_count', '-')} tok  "
+            f"{status}{chunks}"
+        )
+        print(f"            {entry['prompt'][:100]!r}")
+
+
+if __name__ == "__main__":
+    main()
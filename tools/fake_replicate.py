@@ -0,0 +1,244 @@
+"""
+Local stand-in for the Replicate predictions API.
+
+Serves just enough of the HTTP API for hub.predictions: creating a
+prediction, polling it, cancelling it, and downloading the generated
+PNGs. Predictions advance on wall-clock time and emit tqdm-style logs so
+progress/ETA parsing is exercised.
+
+Run it and point the app at it through Streamlit secrets:
+
+    python tools/fake_replicate.py --port 8787 --duration 6
+
+    # .streamlit/secrets.toml
+    REPLICATE_API_TOKEN = "fake"
+    REPLICATE_BASE_URL = "http://127.0.0.1:8787"
+
+It can also be started in-process: `with FakeReplicateServer() as url: ...`.
+"""
+import argparse
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageDraw
+
+ASPECT_SIZES = {
+    "1:1": (1024, 1024),
+    "9:16": (768, 1344),
+    "16:9": (1344, 768),
+}
+STEPS = 28
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts else None
+
+
+def render_png(seed: str, size) -> bytes:
+    """Deterministic gradient + shapes so outputs differ per prediction."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", size)
+    draw = ImageDraw.Draw(img)
+    top = tuple(rng.randrange(256) for _ in range(3))
+    bottom = tuple(rng.randrange(256) for _ in range(3))
+    for y in range(size[1]):
+        t = y / max(1, size[1] - 1)
+        draw.line([(0, y), (size[0], y)], fill=tuple(int(a + (b - a) * t) for a, b in zip(top, bottom)))
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        r = rng.randrange(20, size[0] // 4)
+        draw.ellipse([x - r, y - r, x + r, y + r], outline=tuple(rng.randrange(256) for _ in range(3)), width=6)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeReplicate:
+    """In-memory prediction state shared by the request handlers."""
+
+    def __init__(self, duration=6.0, boot=1.0, fail_rate=0.0):
+        self.duration = duration
+        self.boot = boot
+        self.fail_rate = fail_rate
+        self.base_url = ""
+        self.lock = threading.Lock()
+        self.predictions = {}
+        self.files = {}
+
+    def create(self, model, payload):
+        prediction_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        record = {
+            "id": prediction_id,
+            "model": model,
+            "version": "fake",
+            "input": payload.get("input", {}),
+            "created": now,
+            "canceled": None,
+            "fails": random.random() < self.fail_rate,
+        }
+        with self.lock:
+            self.predictions[prediction_id] = record
+        return self.view(prediction_id)
+
+    def cancel(self, prediction_id):
+        with self.lock:
+            record = self.predictions.get(prediction_id)
+            if record and record["canceled"] is None:
+                record["canceled"] = time.time()
+        return self.view(prediction_id)
+
+    def view(self, prediction_id):
+        with self.lock:
+            record = self.predictions.get(prediction_id)
+        if record is None:
+            return None
+
+        elapsed = time.time() - record["created"]
+        running = max(0.0, elapsed - self.boot)
+        status, logs, output, error, completed = "starting", "", None, None, None
+
+        if record["canceled"] is not None:
+            status, completed = "canceled", record["canceled"]
+        elif running <= 0:
+            status = "starting"
+        elif running < self.duration:
+            status = "processing"
+            step = int(STEPS * running / self.duration)
+            pct = int(100 * step / STEPS)
+            bar = "█" * (pct // 10)
+            logs = f"Using seed: 42\n{pct:3d}%|{bar:<10}| {step}/{STEPS} [00:{int(running):02d}<00:10, 3.1it/s]"
+        elif record["fails"]:
+            status, error, completed = "failed", "Fake model failure", record["created"] + self.boot + self.duration
+        else:
+            status, completed = "succeeded", record["created"] + self.boot + self.duration
+            logs = f"100%|██████████| {STEPS}/{STEPS} [00:10<00:00, 3.1it/s]"
+            count = int(record["input"].get("num_outputs", 1))
+            size = ASPECT_SIZES.get(record["input"].get("aspect_ratio", "1:1"), ASPECT_SIZES["1:1"])
+            output = []
+            for idx in range(count):
+                name = f"{prediction_id}_{idx}.png"
+                with self.lock:
+                    if name not in self.files:
+                        self.files[name] = render_png(name, size)
+                output.append(f"{self.base_url}/files/{name}")
+
+        return {
+            "id": prediction_id,
+            "model": record["model"],
+            "version": record["version"],
+            "status": status,
+            "input": record["input"],
+            "output": output,
+            "logs": logs,
+            "error": error,
+            "metrics": {"predict_time": self.duration} if status == "succeeded" else {},
+            "created_at": _iso(record["created"]),
+            "started_at": _iso(record["created"] + self.boot) if running > 0 else None,
+            "completed_at": _iso(completed),
+            "urls": {
+                "get": f"{self.base_url}/v1/predictions/{prediction_id}",
+                "cancel": f"{self.base_url}/v1/predictions/{prediction_id}/cancel",
+            },
+        }
+
+
+def make_handler(state: FakeReplicate):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_POST(self):
+            model_match = re.fullmatch(r"/v1/models/([^/]+)/([^/]+)/predictions", self.path)
+            cancel_match = re.fullmatch(r"/v1/predictions/([^/]+)/cancel", self.path)
+            if model_match:
+                model = f"{model_match.group(1)}/{model_match.group(2)}"
+                self._send_json(state.create(model, self._read_json()), 201)
+            elif self.path == "/v1/predictions":
+                payload = self._read_json()
+                self._send_json(state.create(payload.get("version", "unknown"), payload), 201)
+            elif cancel_match:
+                view = state.cancel(cancel_match.group(1))
+                self._send_json(view or {"detail": "Not found"}, 200 if view else 404)
+            else:
+                self._send_json({"detail": "Not found"}, 404)
+
+        def do_GET(self):
+            get_match = re.fullmatch(r"/v1/predictions/([^/]+)", self.path)
+            file_match = re.fullmatch(r"/files/([\w.]+)", self.path)
+            if get_match:
+                view = state.view(get_match.group(1))
+                self._send_json(view or {"detail": "Not found"}, 200 if view else 404)
+            elif file_match and file_match.group(1) in state.files:
+                body = state.files[file_match.group(1)]
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send_json({"detail": "Not found"}, 404)
+
+    return Handler
+
+
+class FakeReplicateServer:
+    """Run the stand-in on a background thread; yields its base URL."""
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.state = FakeReplicate(**options)
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.state.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return self.state.base_url
+
+    def __enter__(self) -> str:
+        self._thread.start()
+        return self.url
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--duration", type=float, default=6.0, help="seconds spent 'processing'")
+    parser.add_argument("--boot", type=float, default=1.0, help="seconds spent 'starting'")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeReplicateServer(args.host, args.port, duration=args.duration, boot=args.boot, fail_rate=args.fail_rate)
+    print(f"Fake Replicate listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Concurrent-session load test for the hub pages.
+
+Drives many simulated users at once, each an AppTest session running a
+scripted visit (fill the form, submit, wait for the result) against
+Verdict, ClearPact or the Game page. Gemini is replaced by a local fake
+with a configurable latency distribution, error rate and response size
+(see tools/stubs.py), so the numbers reflect the app and Streamlit, not
+the network.
+
+Sessions run on their own threads in one process, the way a Streamlit
+server runs each session's script on its own thread, and share one
+runtime (so st.cache_data / st.cache_resource are shared as in
+production).
+
+    python tools/load_test.py --sessions 100 --duration 60
+    python tools/load_test.py --sessions 200 --pages verdict game \\
+        --latency lognormal:2,0.6 --error-rate 0.02 --response-size 6000
+
+With --cassette, replies (and their recorded latency, times
+--latency-scale) come from a cassette recorded by tools/cassette.py;
+prompts it does not cover fall back to the fake.
+
+Reports throughput, p50/p95/p99 per interaction, error counts, and peak
+thread count and resident memory; --output also writes them as JSON.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(TOOLS_DIR)
+sys.path[:0] = [REPO_ROOT, TOOLS_DIR]
+
+import streamlit as st  # noqa: E402
+from streamlit.components.v2.component_manager import BidiComponentManager  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager  # noqa: E402
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager  # noqa: E402
+from streamlit.runtime.media_file_manager import MediaFileManager  # noqa: E402
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage  # noqa: E402
+from streamlit.runtime.secrets import Secrets  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from cassette import Cassette  # noqa: E402
+from stubs import configured, patched_clients  # noqa: E402
+
+RUN_TIMEOUT = 300
+JOB_POLL_SECONDS = 0.5
+
+SAMPLE_CONTRACT = """SERVICES AGREEMENT
+
+1. Term. This Agreement starts on the Effective Date and renews automatically for successive one-year terms.
+2. Fees. Client shall pay all invoices within 15 days. Late payments accrue interest at 2% per month.
+3. Termination. Provider may terminate at any time without notice. Client may terminate with 90 days' notice.
+4. Liability. Provider's total liability is limited to fees paid in the prior month.
+5. Confidentiality. Both parties keep the other's confidential information secret for five years.
+"""
+
+
+def page_path(fragment: str) -> str:
+    for name in sorted(os.listdir(os.path.join(REPO_ROOT, "pages"))):
+        if name.endswith(f"_{fragment}.py"):
+            return os.path.join(REPO_ROOT, "pages", name)
+    raise FileNotFoundError(fragment)
+
+
+# --------------------------------------------------
+# SCENARIOS
+# --------------------------------------------------
+class Visit:
+    """One simulated user's session on a page; records timed interactions."""
+
+    def __init__(self, page: str, record: Callable[[str, str, float, bool], None]):
+        self.page = page
+        self.record = record
+        self.at = AppTest.from_file(page_path(SCENARIO_PAGES[page]), default_timeout=RUN_TIMEOUT)
+
+    def step(self, name: str, prepare: Optional[Callable[[AppTest], None]] = None) -> bool:
+        """Apply `prepare` to the widgets, rerun, and record how long it took."""
+        if prepare:
+            prepare(self.at)
+        start = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - start
+        if not self.at.main.children:
+            # AppTest resets some module-level state on every run; under heavy
+            # concurrency a run occasionally comes back empty. Not the app's doing.
+            self.record(self.page, "harness_retry", 0.0, True)
+            start = time.perf_counter()
+            self.at.run()
+            elapsed = time.perf_counter() - start
+        ok = not self.at.exception and not self.at.error
+        self.record(self.page, name, elapsed, ok)
+        return ok
+
+    def button(self, label: str) -> Callable[[AppTest], None]:
+        return lambda at: next(b for b in at.button if b.label == label).click()
+
+
+def visit_verdict(visit: Visit) -> None:
+    def fill(at):
+        at.text_area[0].set_value("I took the job offer in 2021")
+        at.text_input[0].set_value("2021")
+        at.text_area[1].set_value("The company folded a year later")
+        at.text_area[2].set_value("Good salary, small startup, friends advised against it")
+        at.text_area[3].set_value("Grow faster, avoid stagnating")
+        visit.button("Get Verdict")(at)
+
+    visit.step("load")
+    visit.step("submit", fill)
+
+
+def visit_game(visit: Visit) -> None:
+    visit.step("load")
+    visit.step("username", lambda at: at.text_input[0].set_value(f"player{random.randrange(10_000)}"))
+    if not visit.step("generate_riddle", visit.button("Generate Riddle")):
+        return
+    if len(visit.at.text_input) < 2:
+        return  # The riddle did not parse; nothing to answer
+
+    def answer(at):
+        at.text_input[1].set_value("stub")
+        visit.button("Submit Answer")(at)
+
+    visit.step("answer", answer)
+    visit.step("next_round", visit.button("Next ▶️"))
+
+
+def visit_clearpact(visit: Visit) -> None:
+    visit.step("load")
+    # A unique contract per visit so the job runner cannot dedupe the work
+    contract = SAMPLE_CONTRACT + f"\nReference: {random.getrandbits(64):x}\n"
+
+    def upload(at):
+        at.file_uploader[0].set_value(("contract.txt", contract.encode("utf-8"), "text/plain"))
+
+    start = time.perf_counter()
+    if not visit.step("upload", upload):
+        return
+    # The analysis runs as a background job; poll like the page's fragment does
+    while not any("Analysis complete" in str(s.value) for s in visit.at.success):
+        if visit.at.error or visit.at.exception or time.perf_counter() - start > RUN_TIMEOUT:
+            visit.record(visit.page, "analysis", time.perf_counter() - start, False)
+            return
+        time.sleep(JOB_POLL_SECONDS)
+        visit.step("poll")
+    visit.record(visit.page, "analysis", time.perf_counter() - start, True)
+
+
+SCENARIO_PAGES = {"verdict": "Verdict", "game": "Game", "clearpact": "ClearPact"}
+SCENARIOS = {"verdict": visit_verdict, "game": visit_game, "clearpact": visit_clearpact}
+
+
+# --------------------------------------------------
+# SHARED RUNTIME
+# --------------------------------------------------
+def shared_runtime():
+    """
+    AppTest installs a fresh mock Runtime per run and clears it afterwards,
+    which breaks sessions running at the same time. Pin one for everybody.
+    """
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    components = BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    runtime.bidi_component_registry = components
+    return mock.patch.multiple(
+        Runtime,
+        instance=classmethod(lambda cls: runtime),
+        exists=classmethod(lambda cls: True),
+    )
+
+
+def use_global_secrets(secrets: Dict[str, str]) -> None:
+    # Secrets set per AppTest are swapped into st.secrets around each run,
+    # which races between threads; install them once instead
+    shared = Secrets()
+    shared._secrets = dict(secrets)
+    st.secrets = shared
+
+
+# --------------------------------------------------
+# MEASUREMENT
+# --------------------------------------------------
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.resources = []
+        self.crashes = {}
+
+    def record(self, page: str, name: str, seconds: float, ok: bool) -> None:
+        with self.lock:
+            self.samples[(page, name)].append(seconds)
+            if not ok:
+                self.errors[(page, name)] += 1
+
+    def sample_resources(self, stop: threading.Event, interval: float = 0.5) -> None:
+        while not stop.is_set():
+            self.resources.append((time.perf_counter(), threading.active_count(), rss_bytes()))
+            stop.wait(interval)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(recorder: Recorder, elapsed: float, llm_calls: int, visits: int, failed_visits: int) -> Dict:
+    interactions = {}
+    for (page, name), values in sorted(recorder.samples.items()):
+        interactions[f"{page}.{name}"] = {
+            "count": len(values),
+            "errors": recorder.errors[(page, name)],
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1),
+        }
+    total = sum(len(v) for v in recorder.samples.values())
+    threads = [t for _, t, _ in recorder.resources] or [threading.active_count()]
+    memory = [m for _, _, m in recorder.resources] or [rss_bytes()]
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "visits": visits,
+        "failed_visits": failed_visits,
+        "interactions_total": total,
+        "throughput_per_s": round(total / elapsed, 2) if elapsed else 0.0,
+        "visits_per_s": round(visits / elapsed, 2) if elapsed else 0.0,
+        "llm_calls": llm_calls,
+        "llm_calls_per_s": round(llm_calls / elapsed, 2) if elapsed else 0.0,
+        "threads_peak": max(threads),
+        "threads_mean": round(sum(threads) / len(threads), 1),
+        "rss_peak_mb": round(max(memory) / 2**20, 1),
+        "rss_start_mb": round(memory[0] / 2**20, 1),
+        "interactions": interactions,
+        "crashes": recorder.crashes,
+    }
+
+
+def print_report(report: Dict, args) -> None:
+    print(
+        f"\n{args.sessions} sessions · {report['elapsed_s']}s · pages={','.join(args.pages)} "
+        f"· latency={args.latency} · error_rate={args.error_rate} · response_size={args.response_size}"
+    )
+    print(f"{'interaction':<28}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report["interactions"].items():
+        print(
+            f"{name:<28}{stats['count']:>7}{stats['errors']:>8}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+    print(
+        f"\nthroughput {report['throughput_per_s']} interactions/s · {report['visits_per_s']} visits/s "
+        f"({report['visits']} visits, {report['failed_visits']} failed) · {report['llm_calls_per_s']} LLM calls/s"
+    )
+    print(
+        f"threads peak {report['threads_peak']} (mean {report['threads_mean']}) · "
+        f"RSS {report['rss_start_mb']} MB -> peak {report['rss_peak_mb']} MB"
+    )
+    for name, trace in report["crashes"].items():
+        print(f"\ncrash {name}:\n{trace}")
+
+
+# --------------------------------------------------
+# DRIVER
+# --------------------------------------------------
+def run_session(pages: List[str], deadline: float, think_time: float, recorder: Recorder, counts: Dict) -> None:
+    while time.perf_counter() < deadline:
+        page = random.choice(pages)
+        try:
+            SCENARIOS[page](Visit(page, recorder.record))
+            outcome = "visits"
+        except Exception as exc:
+            recorder.record(page, f"crash:{type(exc).__name__}", 0.0, False)
+            with recorder.lock:
+                recorder.crashes.setdefault(f"{page}: {type(exc).__name__}", traceback.format_exc(limit=-3))
+            outcome = "failed_visits"
+        with recorder.lock:
+            counts[outcome] += 1
+        if think_time:
+            time.sleep(random.uniform(0, 2 * think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test with a local LLM stand-in.")
+    parser.add_argument("--sessions", type=int, default=50, help="simulated concurrent users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to keep starting visits")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which sessions start")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between visits (s)")
+    parser.add_argument("--pages", nargs="+", default=sorted(SCENARIOS), choices=sorted(SCENARIOS))
+    parser.add_argument("--latency", default="lognormal:1.5,0.5", help="const:S | uniform:A,B | exp:MEAN | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of LLM calls that fail")
+    parser.add_argument("--response-size", type=int, default=3000, help="minimum reply length in characters")
+    parser.add_argument("--cassette", help="replay replies from this cassette instead of the fake")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="replayed latency multiplier")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    # Simulated sessions write jobs, artifacts and notes; keep all of it out of the real data dir
+    state_dir = tempfile.mkdtemp(prefix="hub_load_")
+    os.environ["HUB_JOB_DB"] = os.path.join(state_dir, "jobs.sqlite3")
+    os.environ["HUB_ARTIFACT_DIR"] = os.path.join(state_dir, "artifacts")
+    os.environ["HUB_DATA_DIR"] = os.path.join(state_dir, "data")
+    os.environ.pop("HUB_NOTES_DIR", None)
+
+    model_class = configured(args.latency, args.error_rate, args.response_size)
+    cassette = None
+    if args.cassette:
+        cassette = Cassette(args.cassette, "replay", args.latency_scale, on_miss="fake")
+        model_class = cassette.model_class()
+    recorder = Recorder()
+    counts = {"visits": 0, "failed_visits": 0}
+    stop = threading.Event()
+
+    with patched_clients(model_class) as secrets, shared_runtime():
+        use_global_secrets(secrets)
+        sampler = threading.Thread(target=recorder.sample_resources, args=(stop,), daemon=True)
+        sampler.start()
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        workers = []
+        for index in range(args.sessions):
+            worker = threading.Thread(
+                target=run_session,
+                args=(args.pages, deadline, args.think_time, recorder, counts),
+                name=f"session-{index}",
+                daemon=True,
+            )
+            worker.start()
+            workers.append(worker)
+            time.sleep(args.ramp_up / max(1, args.sessions))
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+
+    llm_calls = cassette.calls if cassette else model_class.calls
+    report = summarize(recorder, elapsed, llm_calls, counts["visits"], counts["failed_visits"])
+    report["config"] = vars(args)
+    print_report(report, args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Offline stand-ins for the external clients used by the pages.
+
+`patched_clients()` swaps google.generativeai, remove.bg (requests.post)
+and Replicate (via tools/fake_replicate.py and the REPLICATE_BASE_URL
+secret) for local fakes, and returns the secrets a page needs. It is
+shared by the benchmark, load-test and cassette tools.
+"""
+import io
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from unittest import mock
+
+import requests
+from PIL import Image
+
+from fake_replicate import FakeReplicateServer
+
+REMOVE_BG_URL = "https://api.remove.bg/v1.0/removebg"
+
+MARKDOWN_REPLY = """## Summary
+
+This is a **stubbed** response used for offline runs.
+
+- First point with some detail
+- Second point with some detail
+- Third point with some detail
+
+**Risk: Medium** | **Favors: Balanced** | Reason: Placeholder text.
+"""
+
+JSON_TEMPLATE = re.compile(r"\{.*\}", re.S)
+
+
+def latency_distribution(spec: str) -> Callable[[], float]:
+    """
+    Parse a latency spec into a sampler returning seconds:
+
+        const:0.8          always 0.8s
+        uniform:0.5,3      uniform between 0.5s and 3s
+        exp:1.2            exponential with mean 1.2s
+        lognormal:1.5,0.6  log-normal with median 1.5s and sigma 0.6
+                           (the long tail real LLM calls show)
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "const":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+def _schema_value(schema: Dict) -> object:
+    kind = str(schema.get("type", "string")).lower()
+    if kind == "object":
+        return {name: _schema_value(sub) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_schema_value(schema.get("items", {})) for _ in range(3)]
+    return {"integer": 5, "number": 0.5, "boolean": True}.get(kind, "stub")
+
+
+def fake_reply(prompt: str, size: int = 0, schema: Optional[Dict] = None) -> str:
+    """
+    Plausible reply for a prompt. Prompts that spell out a JSON shape
+    ("Return ONLY valid JSON: {...}") get that shape with placeholders
+    filled in, so the Game page can complete its rounds; otherwise a
+    response_schema, if given, is filled with placeholder values.
+    """
+    if "JSON" in prompt:
+        match = JSON_TEMPLATE.search(prompt)
+        if match:
+            template = match.group(0)
+            filled = template.replace('"..."', '"stub"').replace("..", "1").replace(":int", ":5")
+            try:
+                json.loads(filled)
+                return filled
+            except ValueError:
+                pass
+    if schema:
+        return json.dumps(_schema_value(schema))
+    text = MARKDOWN_REPLY
+    while len(text) < size:
+        text += "\n" + MARKDOWN_REPLY
+    return text
+
+
+def _prompt_text(contents) -> str:
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(part for part in contents if isinstance(part, str))
+    return str(contents)
+
+
+class FakeUsage:
+    def __init__(self, prompt_tokens: int, output_tokens: int):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str = ""):
+        self.text = text
+        self.usage_metadata = FakeUsage(len(prompt) // 4, len(text) // 4)
+
+    def __iter__(self):
+        # stream=True callers iterate chunks
+        for start in range(0, len(self.text), 64):
+            yield FakeResponse(self.text[start:start + 64])
+
+
+class FakeGenerativeModel:
+    """
+    Drop-in for google.generativeai.GenerativeModel.
+
+    `latency` returns seconds to sleep per call, `error_rate` is the share
+    of calls that raise, `response_size` pads Markdown replies to at least
+    that many characters. Use `configured()` for a tuned subclass.
+    """
+
+    latency: Callable[[], float] = staticmethod(lambda: 0.0)
+    error_rate: float = 0.0
+    response_size: int = 0
+    calls: int = 0
+    _calls_lock = threading.Lock()
+
+    def __init__(self, model_name: str = "gemini-2.5-flash", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, contents, **kwargs):
+        with self._calls_lock:
+            type(self).calls += 1
+        delay = self.latency()
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError("503 Service Unavailable (fake)")
+        prompt = _prompt_text(contents)
+        config = kwargs.get("generation_config") or {}
+        schema = config.get("response_schema") if isinstance(config, dict) else None
+        return FakeResponse(fake_reply(prompt, self.response_size, schema), prompt)
+
+
+def configured(latency: str = "const:0", error_rate: float = 0.0, response_size: int = 0) -> type:
+    """A FakeGenerativeModel subclass with its own settings and call counter."""
+    return type("ConfiguredFakeModel", (FakeGenerativeModel,), {
+        "latency": staticmethod(latency_distribution(latency)),
+        "error_rate": error_rate,
+        "response_size": response_size,
+        "calls": 0,
+    })
+
+
+class FakeUploadedFile:
+    def __init__(self, mime_type: str):
+        self.mime_type = mime_type
+        self.name = "files/fake"
+        self.uri = "https://generativelanguage.googleapis.com/v1beta/files/fake"
+
+
+def _fake_remove_bg(image_file) -> bytes:
+    img = Image.open(io.BytesIO(image_file[1])).convert("RGBA")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@contextmanager
+def patched_clients(
+    model_class: Optional[type] = None,
+    replicate_duration: float = 0.2,
+    live_gemini: bool = False,
+) -> Iterator[Dict[str, str]]:
+    """
+    Patch every external client; yields the secrets to hand to AppTest.
+    With `live_gemini` (cassette recording) configure/upload_file stay real
+    and GEMINI_API_KEY is taken from the environment. Other LLM providers
+    are switched off unless HUB_PROVIDERS is already set, so failover never
+    reaches a real API whose key happens to be in the environment.
+    """
+    model_class = model_class or FakeGenerativeModel
+    real_post = requests.post
+
+    def fake_post(url, *args, **kwargs):
+        if url == REMOVE_BG_URL:
+            response = requests.Response()
+            response.status_code = 200
+            response._content = _fake_remove_bg(kwargs["files"]["image_file"])
+            return response
+        return real_post(url, *args, **kwargs)
+
+    with ExitStack() as stack:
+        replicate_url = stack.enter_context(FakeReplicateServer(duration=replicate_duration, boot=0.0))
+        stack.enter_context(mock.patch("google.generativeai.GenerativeModel", model_class))
+        stack.enter_context(mock.patch("requests.post", fake_post))
+        stack.enter_context(mock.patch.dict(os.environ, {"HUB_PROVIDERS": os.environ.get("HUB_PROVIDERS", "gemini")}))
+        if live_gemini:
+            api_key = os.environ["GEMINI_API_KEY"]
+        else:
+            api_key = "fake"
+            stack.enter_context(mock.patch("google.generativeai.configure"))
+            stack.enter_context(mock.patch(
+                "google.generativeai.upload_file",
+                lambda *a, mime_type=None, **k: FakeUploadedFile(mime_type),
+            ))
+        yield {
+            "GEMINI_API_KEY": api_key,
+            "REPLICATE_API_TOKEN": "fake",
+            "REPLICATE_BASE_URL": replicate_url,
+        }